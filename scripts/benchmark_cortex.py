@@ -353,6 +353,16 @@ class Benchmarker:
         assert count == self.workfactor
         return count
 
+    @benchmark({'official', 'remote'})
+    async def do02LiftFilterCompound(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        Filter heavy query which may not be pushed down into the lift
+        '''
+        q = 'inet:ipv4 +(:asn>10 or #even) -:loc=us +(#all and not :type=unicast)'
+        count = await acount(prox.eval(q, opts=self.opts))
+        assert count == self.workfactor // 2
+        return self.workfactor
+
     @benchmark({'official', 'remote'})
     async def do03LiftBySecondaryAbsent(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
         count = await acount(prox.eval('inet:dns:a:fqdn=newp', opts=self.opts))
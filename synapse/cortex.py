@@ -628,6 +628,40 @@ class CoreApi(s_cell.CellApi):
         '''
         return await self.cell.getTypeNorm(name, valu)
 
+    async def getPropNorms(self, prop, valus):
+        '''
+        Normalize a list of values for a property based on the Cortex data model.
+
+        Args:
+            prop (str): The property to normalize.
+            valus (list): The values to normalize.
+
+        Yields:
+            (tuple): A (True, (norm, info)) or (False, (errname, errinfo)) tuple for each value.
+
+        Raises:
+            s_exc.NoSuchProp: If the prop does not exist.
+        '''
+        async for retn in self.cell.getPropNorms(prop, valus):
+            yield retn
+
+    async def getTypeNorms(self, name, valus):
+        '''
+        Normalize a list of values for a type based on the Cortex data model.
+
+        Args:
+            name (str): The type to normalize.
+            valus (list): The values to normalize.
+
+        Yields:
+            (tuple): A (True, (norm, info)) or (False, (errname, errinfo)) tuple for each value.
+
+        Raises:
+            s_exc.NoSuchType: If the type does not exist.
+        '''
+        async for retn in self.cell.getTypeNorms(name, valus):
+            yield retn
+
     async def addFormProp(self, form, prop, tdef, info):
         '''
         Add an extended property to the given form.
@@ -793,6 +827,11 @@ class Cortex(s_cell.Cell):  # type: ignore
             'description': 'The max number of spare processes to keep around in the storm spawn pool.',
             'type': 'integer'
         },
+        'spawn:normprocs': {
+            'default': 0,
+            'description': 'The number of processes used to normalize bulk node adds (0 to normalize in the Cortex process).',
+            'type': 'integer'
+        },
         'storm:log': {
             'default': False,
             'description': 'Log storm queries via system logger.',
@@ -833,6 +872,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.stormcmds = {}
 
         self.spawnpool = None
+        self.normpool = None
 
         self.storm_cmd_ctors = {}
         self.storm_cmd_cdefs = {}
@@ -922,6 +962,13 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.onfini(self.spawnpool)
         self.on('user:mod', self._onEvtBumpSpawnPool)
 
+        normprocs = self.conf.get('spawn:normprocs')
+        if normprocs > 0:
+            self.normpool = await s_spawn.NormPool.anit(self, normprocs)
+            self.onfini(self.normpool)
+            self.on('core:module:load', self._onEvtBumpNormPool)
+            self.on('core:extmodel:change', self._onEvtBumpNormPool)
+
         self.dynitems.update({
             'cron': self.agenda,
             'cortex': self,
@@ -956,6 +1003,10 @@ class Cortex(s_cell.Cell):  # type: ignore
         if self.spawnpool is not None:
             await self.spawnpool.bump()
 
+    async def _onEvtBumpNormPool(self, evnt):
+        # norm pool processes must use the current data model
+        await self.normpool.bump()
+
     async def addCoreQueue(self, name, info):
 
         if self.multiqueue.exists(name):
@@ -1693,6 +1744,7 @@ class Cortex(s_cell.Cell):  # type: ignore
             raise s_exc.BadPropDef(name=name, mesg=mesg)
 
         self.model.addUnivProp(name, tdef, info)
+        await self._setLayrRefProps()
 
         await self.extunivs.set(name, (name, tdef, info))
         await self.fire('core:extmodel:change', prop=name, act='add', type='univ')
@@ -1704,6 +1756,7 @@ class Cortex(s_cell.Cell):  # type: ignore
             raise s_exc.BadPropDef(prop=prop, mesg=mesg)
 
         self.model.addFormProp(form, prop, tdef, info)
+        await self._setLayrRefProps()
         await self.extprops.set(f'{form}:{prop}', (form, prop, tdef, info))
         await self.fire('core:extmodel:change',
                         form=form, prop=prop, act='add', type='formprop')
@@ -1736,6 +1789,7 @@ class Cortex(s_cell.Cell):  # type: ignore
                 raise s_exc.CantDelProp(mesg=mesg)
 
         self.model.delFormProp(form, prop)
+        await self._setLayrRefProps()
         await self.extprops.pop(full, None)
         await self.fire('core:extmodel:change',
                         form=form, prop=prop, act='del', type='formprop')
@@ -1765,6 +1819,7 @@ class Cortex(s_cell.Cell):  # type: ignore
                 raise s_exc.CantDelUniv(mesg=mesg)
 
         self.model.delUnivProp(prop)
+        await self._setLayrRefProps()
         await self.extunivs.pop(prop, None)
         await self.fire('core:extmodel:change', name=prop, act='del', type='univ')
         await self.bumpSpawnPool()
@@ -1933,8 +1988,11 @@ class Cortex(s_cell.Cell):  # type: ignore
         '''
         self.addStormCmd(s_storm.MaxCmd)
         self.addStormCmd(s_storm.MinCmd)
+        self.addStormCmd(s_storm.SortCmd)
+        self.addStormCmd(s_storm.AggCmd)
         self.addStormCmd(s_storm.TeeCmd)
         self.addStormCmd(s_storm.TreeCmd)
+        self.addStormCmd(s_storm.ParallelCmd)
         self.addStormCmd(s_storm.HelpCmd)
         self.addStormCmd(s_storm.IdenCmd)
         self.addStormCmd(s_storm.SpinCmd)
@@ -2035,6 +2093,7 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         self.addHttpApi('/api/v1/model', s_httpapi.ModelV1, {'cell': self})
         self.addHttpApi('/api/v1/model/norm', s_httpapi.ModelNormV1, {'cell': self})
+        self.addHttpApi('/api/v1/model/norms', s_httpapi.ModelNormsV1, {'cell': self})
 
     async def getCellApi(self, link, user, path):
 
@@ -2514,6 +2573,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         Instantiate a Layer() instance via the provided layer info HiveDict.
         '''
         layr = await self._ctorLayr(layrinfo)
+        await layr.setRefProps(self._getRefProps())
 
         self.layers[layr.iden] = layr
         self.dynitems[layr.iden] = layr
@@ -2536,6 +2596,32 @@ class Cortex(s_cell.Cell):  # type: ignore
         mirror = self.conf.get('mirror')
         return await s_layer.Layer.anit(layrinfo, path, nexsroot=self.nexsroot, allow_upstream=not mirror)
 
+    def _getRefProps(self):
+        '''
+        Return a dict of (form, prop) tuples to the form referenced by each prop for layer reference indexes.
+        '''
+        refs = {}
+        for form in self.model.forms.values():
+
+            if form.isrunt:
+                continue
+
+            for prop in form.props.values():
+
+                typename = prop.type.name
+                if prop.type.isarray:
+                    typename = prop.type.arraytype.name
+
+                if typename in self.model.forms:
+                    refs[(form.name, prop.name)] = typename
+
+        return refs
+
+    async def _setLayrRefProps(self):
+        refs = self._getRefProps()
+        for layr in self.layers.values():
+            await layr.setRefProps(refs)
+
     async def _initCoreLayers(self):
         node = await self.hive.open(('cortex', 'layers'))
         for _, node in node:
@@ -3115,6 +3201,8 @@ class Cortex(s_cell.Cell):  # type: ignore
         mdefs = modu.getModelDefs()
         self.model.addDataModels(mdefs)
 
+        await self._setLayrRefProps()
+
         cmds = modu.getStormCmds()
         [self.addStormCmd(c) for c in cmds]
 
@@ -3245,6 +3333,68 @@ class Cortex(s_cell.Cell):  # type: ignore
         norm, info = tobj.norm(valu)
         return norm, info
 
+    async def getPropNorms(self, prop, valus):
+        '''
+        Normalize a list or async generator of values for a property.
+
+        Args:
+            prop (str): The property to normalize.
+            valus (list): A list or async generator of values to normalize.
+
+        Yields:
+            (tuple): A (True, (norm, info)) or (False, (errname, errinfo)) tuple for each value.
+
+        Raises:
+            s_exc.NoSuchProp: If the prop does not exist.
+        '''
+        pobj = self.model.prop(prop)
+        if pobj is None:
+            raise s_exc.NoSuchProp(mesg=f'The property {prop} does not exist.',
+                                   prop=prop)
+
+        async for retn in self._iterTypeNorms(pobj.type, valus):
+            yield retn
+
+    async def getTypeNorms(self, name, valus):
+        '''
+        Normalize a list or async generator of values for a type.
+
+        Args:
+            name (str): The type to normalize.
+            valus (list): A list or async generator of values to normalize.
+
+        Yields:
+            (tuple): A (True, (norm, info)) or (False, (errname, errinfo)) tuple for each value.
+
+        Raises:
+            s_exc.NoSuchType: If the type does not exist.
+        '''
+        tobj = self.model.type(name)
+        if tobj is None:
+            raise s_exc.NoSuchType(mesg=f'The type {name} does not exist.',
+                                   name=name)
+
+        async for retn in self._iterTypeNorms(tobj, valus):
+            yield retn
+
+    async def _iterTypeNorms(self, tobj, valus):
+
+        count = 0
+        async for valu in s_coro.agen(valus):
+
+            try:
+                retn = (True, tobj.norm(valu))
+            except asyncio.CancelledError: # pragma: no cover
+                raise
+            except Exception as e:
+                retn = s_common.retnexc(e)
+
+            yield retn
+
+            count += 1
+            if not count % 1000:
+                await asyncio.sleep(0)
+
     @staticmethod
     def _convert_reqdict(reqdict):
         return {s_agenda.TimeUnit.fromString(k): v for (k, v) in reqdict.items()}
@@ -246,6 +246,7 @@ class Form:
 
         self.props = {}     # name: Prop()
         self.refsout = None
+        self.addplan = None
 
     def getStorNode(self, form):
 
@@ -277,13 +278,57 @@ class Form:
 
     def setProp(self, name, prop):
         self.refsout = None
+        self.addplan = None
         self.props[name] = prop
 
     def delProp(self, name):
         self.refsout = None
+        self.addplan = None
         prop = self.props.pop(name, None)
         return prop
 
+    def getAddPlan(self):
+        '''
+        Return the compiled plan used to construct node edits for this form.
+
+        Returns:
+            (dict): A dictionary of prop name to (type, stortype, isndef, arrayform, propform, subprops) tuples.
+
+        Notes:
+            The subprops value is a dictionary of sub name to (propname, type, stortype) tuples
+            for the secondary props which are set from the subs of the prop value.
+        '''
+        if self.addplan is None:
+
+            addplan = {}
+
+            for name, prop in self.props.items():
+
+                assert prop.type.stortype is not None
+
+                isndef = isinstance(prop.type, s_types.Ndef)
+
+                arrayform = None
+                if isinstance(prop.type, s_types.Array):
+                    arrayform = self.modl.form(prop.type.arraytype.name)
+
+                subprops = {}
+
+                pref = prop.full + ':'
+                for subprop in self.props.values():
+                    if subprop.full.startswith(pref):
+                        assert subprop.type.stortype is not None
+                        subname = subprop.full[len(pref):]
+                        subprops[subname] = (subprop.name, subprop.type, subprop.type.stortype)
+
+                propform = self.modl.form(prop.type.name)
+
+                addplan[name] = (prop.type, prop.type.stortype, isndef, arrayform, propform, subprops)
+
+            self.addplan = addplan
+
+        return self.addplan
+
     def getRefsOut(self):
 
         if self.refsout is None:
@@ -455,7 +500,7 @@ class Model:
         item = s_types.Guid(self, 'guid', info, {})
         self.addBaseType(item)
 
-        info = {'doc': 'The base type for a synapse tag.'}
+        info = {'doc': 'The base type for a synapse tag.', 'normcache': True}
         item = s_types.Tag(self, 'syn:tag', info, {})
         self.addBaseType(item)
 
@@ -643,6 +688,10 @@ class Model:
 
         form = Form(self, formname, forminfo)
 
+        # props of existing forms may now create nodes of the new form
+        for item in self.forms.values():
+            item.addplan = None
+
         self.forms[formname] = form
         self.props[formname] = form
 
@@ -752,6 +801,20 @@ class Model:
         '''
         return self.types.get(name)
 
+    def getNormCacheStats(self):
+        '''
+        Get the norm cache statistics for each type which caches norm() results.
+
+        Returns:
+            (dict): A dictionary of type name to norm cache stats.
+        '''
+        retn = {}
+        for name, item in self.types.items():
+            stats = item.getNormCacheStats()
+            if stats is not None:
+                retn[name] = stats
+        return retn
+
     def prop(self, name):
         return self.props.get(name)
 
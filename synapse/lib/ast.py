@@ -24,15 +24,38 @@ from synapse.lib.stormtypes import tobool, toint, toprim, tostr
 
 logger = logging.getLogger(__name__)
 
+# the number of inbound nodes collected by pivot operators per batch lift
+PIVOT_WINDOW = 256
+
+# the number of subquery filter results memoized per runtime
+SUBQ_MEMO_SIZE = 10000
+
+# the number of inbound nodes whose edits are coalesced by an edit block
+EDIT_WINDOW = 256
+
 def parseNumber(x):
     return float(x) if '.' in x else s_stormtypes.intify(x)
 
+def isConstValu(astn):
+    '''
+    Return True if the AST node is a constant value which may be computed once per query.
+    '''
+    if isinstance(astn, Const):
+        return True
+
+    if isinstance(astn, List):
+        return all(isinstance(k, Const) for k in astn.kids)
+
+    return False
+
 class AstNode:
     '''
     Base class for all nodes in the STORM abstract syntax tree.
     '''
 
     def __init__(self, kids=()):
+        self.parent = None
+        self.pindex = None
         self.kids = []
         [self.addKid(k) for k in kids]
 
@@ -132,9 +155,157 @@ class Query(AstNode):
         # for options parsed from the query itself
         self.opts = {}
 
+        # conservative until prepare() inspects the query
+        self.usespath = True
+
+    def prepare(self):
+
+        # path variables and nodes are only observable via these operations
+        self.usespath = self.hasAstClass(pathuse)
+
+        if self.plan():
+            plan = '\n'.join(f'    {line}' for line in self.getPlanLines())
+            logger.debug(f'Storm query plan for {self.text!r}:\n{plan}')
+
+    def plan(self):
+        '''
+        Rewrite the operators of the query into a cheaper equivalent plan.
+
+        Returns:
+            (bool): True if the query operators were changed.
+        '''
+        changed = self._planFiltOrder()
+
+        for oper in list(self.kids):
+
+            if not isinstance(oper, LiftProp):
+                continue
+
+            lift = oper.getFiltLift()
+            if lift is None:
+                continue
+
+            self._setKid(oper.pindex, lift)
+            changed = True
+
+        if self._planLiftLimit():
+            changed = True
+
+        if self._planEditBlocks():
+            changed = True
+
+        return changed
+
+    def _setKid(self, indx, astn):
+        self.kids[indx] = astn
+        astn.parent = self
+        astn.pindex = indx
+
+    def _planLiftLimit(self):
+        # let lifts which feed directly into a limit command stop early
+        changed = False
+
+        for oper in self.kids:
+
+            if not isinstance(oper, CmdOper):
+                continue
+
+            limit = oper.getConstLimit()
+            if limit is None:
+                continue
+
+            for lift in reversed(self.kids[:oper.pindex]):
+
+                if not isinstance(lift, LiftOper):
+                    break
+
+                if lift.limit is None or limit < lift.limit:
+                    lift.limit = limit
+                    changed = True
+
+        return changed
+
+    def _planEditBlocks(self):
+        # coalesce the node edits from runs of edit operations
+        if not planEditBlocks(self):
+            return False
+
+        for oper in self.kids:
+
+            if not isinstance(oper, EditBlock):
+                continue
+
+            # the nodes yielded by a subquery may not all be consumed
+            if self.parent is not None:
+                oper.limit = 1
+                continue
+
+            # do not edit nodes which a later operator may stop before consuming
+            stops = [k for k in self.kids[oper.pindex + 1:] if isinstance(k, stopopers)]
+            if not stops:
+                continue
+
+            limit = None
+            if stops == [oper.sibling()]:
+                limit = stops[0].getConstLimit()
+
+            oper.limit = 1 if limit is None else limit
+
+        return True
+
+    def _planFiltOrder(self):
+        # move cheap filters ahead of subquery filters within a run of filters
+        changed = False
+
+        runs = []
+        for oper in self.kids:
+
+            if not isinstance(oper, FiltOper):
+                runs.append([])
+                continue
+
+            if not runs:
+                runs.append([])
+
+            runs[-1].append(oper)
+
+        for filts in runs:
+
+            if len(filts) < 2:
+                continue
+
+            if not all(f.isPure() for f in filts):
+                continue
+
+            cheap = [f for f in filts if not f.hasAstClass(SubqCond)]
+            subqs = [f for f in filts if f.hasAstClass(SubqCond)]
+
+            order = cheap + subqs
+            if order == filts:
+                continue
+
+            indx = filts[0].pindex
+            for offs, filt in enumerate(order):
+                self._setKid(indx + offs, filt)
+
+            changed = True
+
+        return changed
+
+    def getPlanLines(self):
+        '''
+        Return a list of lines describing the planned operators.
+        '''
+        return [repr(oper) for oper in self.kids]
+
     async def run(self, runt, genr):
 
         for oper in self.kids:
+
+            if runt.prof is not None:
+                genr = runt.prof.run(oper, runt, genr)
+                continue
+
             genr = oper.run(runt, genr)
 
         async for node, path in genr:
@@ -680,6 +851,27 @@ async def pullone(genr):
 
 class CmdOper(Oper):
 
+    def getConstLimit(self):
+        '''
+        Return the count for a limit command with a constant argument or None.
+        '''
+        if self.kids[0].value() != 'limit':
+            return None
+
+        argv = self.kids[1]
+        if not isConstValu(argv) or len(argv.kids) != 1:
+            return None
+
+        try:
+            limit = int(argv.kids[0].value())
+        except ValueError:
+            return None
+
+        if limit < 1:
+            return None
+
+        return limit
+
     async def run(self, runt, genr):
 
         name = self.kids[0].value()
@@ -892,6 +1084,16 @@ class CaseEntry(AstNode):
 
 class LiftOper(Oper):
 
+    def __init__(self, kids=()):
+        Oper.__init__(self, kids)
+        # the maximum number of nodes a downstream limit will consume
+        self.limit = None
+
+    def repr(self):
+        if self.limit is not None:
+            return f'{self.__class__.__name__}: {self.kids}, limit={self.limit}'
+        return f'{self.__class__.__name__}: {self.kids}'
+
     async def run(self, runt, genr):
 
         if self.isRuntSafe(runt):
@@ -1002,12 +1204,12 @@ class LiftTag(LiftOper):
             cmpr = await self.kids[1].compute(runt)
             valu = await self.kids[2].compute(runt)
 
-            async for node in runt.snap.nodesByTagValu(tag, cmpr, valu):
+            async for node in runt.snap.nodesByTagValu(tag, cmpr, valu, limit=self.limit):
                 yield node
 
             return
 
-        async for node in runt.snap.nodesByTag(tag):
+        async for node in runt.snap.nodesByTag(tag, limit=self.limit):
             yield node
 
 class LiftByArray(LiftOper):
@@ -1020,7 +1222,7 @@ class LiftByArray(LiftOper):
         cmpr = await self.kids[1].compute(runt)
         valu = await self.kids[2].compute(runt)
 
-        async for node in runt.snap.nodesByPropArray(name, cmpr, valu):
+        async for node in runt.snap.nodesByPropArray(name, cmpr, valu, limit=self.limit):
             yield node
 
 class LiftTagProp(LiftOper):
@@ -1036,12 +1238,12 @@ class LiftTagProp(LiftOper):
             cmpr = await self.kids[1].compute(runt)
             valu = await self.kids[2].compute(runt)
 
-            async for node in runt.snap.nodesByTagPropValu(None, tag, prop, cmpr, valu):
+            async for node in runt.snap.nodesByTagPropValu(None, tag, prop, cmpr, valu, limit=self.limit):
                 yield node
 
             return
 
-        async for node in runt.snap.nodesByTagProp(None, tag, prop):
+        async for node in runt.snap.nodesByTagProp(None, tag, prop, limit=self.limit):
             yield node
 
 class LiftFormTagProp(LiftOper):
@@ -1058,12 +1260,12 @@ class LiftFormTagProp(LiftOper):
             cmpr = await self.kids[1].compute(runt)
             valu = await self.kids[2].compute(runt)
 
-            async for node in runt.snap.nodesByTagPropValu(form, tag, prop, cmpr, valu):
+            async for node in runt.snap.nodesByTagPropValu(form, tag, prop, cmpr, valu, limit=self.limit):
                 yield node
 
             return
 
-        async for node in runt.snap.nodesByTagProp(form, tag, prop):
+        async for node in runt.snap.nodesByTagProp(form, tag, prop, limit=self.limit):
             yield node
 
 class LiftTagTag(LiftOper):
@@ -1130,12 +1332,12 @@ class LiftFormTag(LiftOper):
             cmpr = self.kids[2].value()
             valu = await self.kids[3].compute(runt)
 
-            async for node in runt.snap.nodesByTagValu(tag, cmpr, valu, form=form):
+            async for node in runt.snap.nodesByTagValu(tag, cmpr, valu, form=form, limit=self.limit):
                 yield node
 
             return
 
-        async for node in runt.snap.nodesByTag(tag, form=form):
+        async for node in runt.snap.nodesByTag(tag, form=form, limit=self.limit):
             yield node
 
 class LiftProp(LiftOper):
@@ -1155,11 +1357,11 @@ class LiftProp(LiftOper):
             for hint in self.getRightHints():
                 if hint[0] == 'tag':
                     tagname = hint[1].get('name')
-                    async for node in runt.snap.nodesByTag(tagname, form=name):
+                    async for node in runt.snap.nodesByTag(tagname, form=name, limit=self.limit):
                         yield node
                     return
 
-        async for node in runt.snap.nodesByProp(name):
+        async for node in runt.snap.nodesByProp(name, limit=self.limit):
             yield node
 
     def getRightHints(self):
@@ -1177,6 +1379,94 @@ class LiftProp(LiftOper):
 
         return []
 
+    def getFiltLift(self):
+        '''
+        Return a LiftPropBy for a form lift filtered by a simple secondary prop
+        comparison or None. The filters remain in place to handle inbound nodes.
+        '''
+        kid = self.kids[0]
+        if not isinstance(kid, Const):
+            return None
+
+        form = self.core.model.form(kid.value())
+        if form is None or form.isrunt:
+            return None
+
+        hints = []
+        for oper in self.iterright():
+
+            if not isinstance(oper, FiltOper):
+                break
+
+            hints.extend(oper.getLiftHints())
+
+        best = None
+        for hint in hints:
+
+            if hint[0] != 'relprop':
+                continue
+
+            info = hint[1]
+            cmpr = info.get('cmpr')
+
+            prop = form.props.get(info.get('name'))
+            if prop is None or prop.type.isarray:
+                continue
+
+            if cmpr not in planlifts or cmpr not in prop.type.storlifts:
+                continue
+
+            ctor = prop.type.getCmprCtor(cmpr)
+            if ctor is None:
+                continue
+
+            # leave invalid comparison values for the filter to report
+            valu = info.get('valu')
+            if isinstance(valu, List):
+                valu = [k.value() for k in valu.kids]
+            else:
+                valu = valu.value()
+
+            try:
+                ctor(valu)
+                prop.type.getStorCmprs(cmpr, valu)
+            except asyncio.CancelledError: # pragma: no cover
+                raise
+            except Exception:
+                continue
+
+            if cmpr == '=':
+                best = (prop, info)
+                break
+
+            if best is None:
+                best = (prop, info)
+
+        if best is None:
+            return None
+
+        prop, info = best
+
+        # an equality lift by tag is likely as good as a prop range lift
+        if info.get('cmpr') != '=':
+            if any(hint[0] == 'tag' for hint in self.getRightHints()):
+                return None
+
+        valu = info.get('valu')
+        if isinstance(valu, List):
+            valu = List(None, kids=[Const(k.value()) for k in valu.kids])
+        else:
+            valu = Const(valu.value())
+
+        lift = LiftPropBy(kids=(
+            Const(prop.full),
+            Const(info.get('cmpr')),
+            valu,
+        ))
+
+        lift.init(self.core)
+        return lift
+
 class LiftPropBy(LiftOper):
 
     async def lift(self, runt):
@@ -1185,15 +1475,152 @@ class LiftPropBy(LiftOper):
         name = await self.kids[0].compute(runt)
         valu = await self.kids[2].compute(runt)
 
-        async for node in runt.snap.nodesByPropValu(name, cmpr, valu):
+        async for node in runt.snap.nodesByPropValu(name, cmpr, valu, limit=self.limit):
             yield node
 
+class PivotBatch:
+    '''
+    Collect the pivots for a window of inbound nodes so they may be lifted together.
+
+    Target values are normalized once per distinct value and lifted using one
+    ordered multi-value lift per target prop. Each pivot node is yielded once
+    for each inbound path which pivoted to its value.
+    '''
+    def __init__(self, runt):
+        self.runt = runt
+        self.misc = []
+        self.warned = False
+        self.todo = collections.defaultdict(dict)
+
+    def add(self, full, valu, path, skip=None):
+        '''
+        Add a pivot from path to nodes where full=valu.
+
+        Args:
+            full (str): The full name of the destination form or prop.
+            valu (obj): The (un-normalized) destination value.
+            path (s_node.Path): The path of the inbound node.
+            skip (bytes): An optional buid which is not a valid pivot destination.
+        '''
+        try:
+            paths = self.todo[full].get(valu)
+        except TypeError:
+            # unhashable values are lifted individually
+            self.misc.append((full, valu, path, skip))
+            return
+
+        if paths is None:
+            paths = self.todo[full][valu] = []
+
+        paths.append((path, skip))
+
+    async def _warnPivotErr(self, e, valu):
+        if not self.warned:
+            logger.warning(f'Caught error during pivot: {e.items()}')
+            self.warned = True
+        items = e.items()
+        mesg = items.pop('mesg', '')
+        mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
+        await self.runt.snap.fire('warn', mesg=mesg, **items)
+
+    async def execute(self):
+        '''
+        Lift the collected pivots and yield (node, path) tuples.
+        '''
+        todo = self.todo
+        self.todo = collections.defaultdict(dict)
+
+        misc = self.misc
+        self.misc = []
+
+        for full, valu, path, skip in misc:
+            try:
+                async for pivo in self.runt.snap.nodesByPropValu(full, '=', valu):
+                    if pivo.buid != skip:
+                        yield pivo, path.fork(pivo)
+            except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
+                await self._warnPivotErr(e, valu)
+
+        for full, valus in todo.items():
+
+            prop = self.runt.model.prop(full)
+            if prop is None:
+                continue
+
+            norms = {}
+            for valu, paths in valus.items():
+
+                try:
+                    cmprvals = prop.type.getStorCmprs('=', valu)
+
+                    # values such as wildcards do not lift by a single index key
+                    if len(cmprvals) != 1 or cmprvals[0][0] != '=':
+                        async for pivo in self.runt.snap.nodesByPropValu(full, '=', valu):
+                            for path, skip in paths:
+                                if pivo.buid != skip:
+                                    yield pivo, path.fork(pivo)
+                        continue
+
+                except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
+                    await self._warnPivotErr(e, valu)
+                    continue
+
+                norm = cmprvals[0][1]
+
+                normpaths = norms.get(norm)
+                if normpaths is None:
+                    norms[norm] = paths
+                    continue
+
+                normpaths.extend(paths)
+
+            if not norms:
+                continue
+
+            async for pivo in self.runt.snap.nodesByPropValus(full, list(norms.keys())):
+
+                if prop.isform:
+                    pval = pivo.ndef[1]
+                else:
+                    pval = pivo.get(prop.name)
+
+                for path, skip in norms.get(pval, ()):
+                    if pivo.buid != skip:
+                        yield pivo, path.fork(pivo)
+
 class PivotOper(Oper):
 
     def __init__(self, kids=(), isjoin=False):
         Oper.__init__(self, kids=kids)
         self.isjoin = isjoin
 
+    def getPivotWindow(self, runt):
+        '''
+        Return the number of inbound nodes to collect for each batch of pivots.
+        '''
+        # joins and path tracking keep each inbound node's pivots with it
+        if self.isjoin or runt.getOpt('path'):
+            return 1
+
+        # pulling a window ahead must not run edits on nodes which may never be consumed
+        if runt.piped or not self.hasPureInput():
+            return 1
+
+        return PIVOT_WINDOW
+
+    def hasPureInput(self):
+        '''
+        Return True if the inbound nodes come from operations which have no side effects.
+        '''
+        if not isinstance(self.parent, Query) or self.parent.parent is not None:
+            return False
+
+        for oper in self.parent.kids[:self.pindex]:
+            if isinstance(oper, impure) or oper.hasAstClass(impure):
+                return False
+
+        return True
+
     def repr(self):
         return f'{self.__class__.__name__}: {self.kids}, isjoin={self.isjoin}'
 
@@ -1229,15 +1656,22 @@ class PivotOut(PivotOper):
     '''
     async def run(self, runt, genr):
 
-        async for node, path in genr:
+        batch = PivotBatch(runt)
 
-            if self.isjoin:
-                yield node, path
+        async for window in s_coro.chunks(genr, self.getPivotWindow(runt)):
+
+            for node, path in window:
+
+                if self.isjoin:
+                    yield node, path
+
+                async for item in self.getPivsOut(runt, node, path, batch):
+                    yield item
 
-            async for item in self.getPivsOut(runt, node, path):
+            async for item in batch.execute():
                 yield item
 
-    async def getPivsOut(self, runt, node, path):
+    async def getPivsOut(self, runt, node, path, batch):
 
         # <syn:tag> -> * is "from tags to nodes with tags"
         if node.form.name == 'syn:tag':
@@ -1249,12 +1683,7 @@ class PivotOut(PivotOper):
 
         if isinstance(node.form.type, s_types.Edge):
             n2def = node.get('n2')
-            pivo = await runt.snap.getNodeByNdef(n2def)
-            if pivo is None:  # pragma: no cover
-                logger.warning(f'Missing node corresponding to ndef {n2def} on edge')
-                return
-
-            yield pivo, path.fork(pivo)
+            batch.add(n2def[0], n2def[1], path)
             return
 
         for name, prop in node.form.props.items():
@@ -1265,52 +1694,46 @@ class PivotOut(PivotOper):
 
             # if the outbound prop is an ndef...
             if isinstance(prop.type, s_types.Ndef):
-                pivo = await runt.snap.getNodeByNdef(valu)
-                if pivo is None:
-                    continue
-
-                yield pivo, path.fork(pivo)
+                batch.add(valu[0], valu[1], path)
                 continue
 
             if isinstance(prop.type, s_types.Array):
                 typename = prop.type.opts.get('type')
                 if runt.model.forms.get(typename) is not None:
                     for item in valu:
-                        async for pivo in runt.snap.nodesByPropValu(typename, '=', item):
-                            yield pivo, path.fork(pivo)
+                        batch.add(typename, item, path)
 
             form = runt.model.forms.get(prop.type.name)
             if form is None:
                 continue
 
             if prop.isrunt:
-                async for pivo in runt.snap.nodesByPropValu(form.name, '=', valu):
-                    yield pivo, path.fork(pivo)
-                continue
-
-            pivo = await runt.snap.getNodeByNdef((form.name, valu))
-            if pivo is None:  # pragma: no cover
+                batch.add(form.name, valu, path)
                 continue
 
             # avoid self references
-            if pivo.buid == node.buid:
-                continue
-
-            yield pivo, path.fork(pivo)
+            batch.add(form.name, valu, path, skip=node.buid)
 
 class N1WalkNPivo(PivotOut):
 
     async def run(self, runt, genr):
 
-        async for node, path in genr:
+        batch = PivotBatch(runt)
+
+        async for window in s_coro.chunks(genr, self.getPivotWindow(runt)):
+
+            for node, path in window:
+                async for item in self.getPivsOut(runt, node, path, batch):
+                    yield item
 
-            async for item in self.getPivsOut(runt, node, path):
+            async for item in batch.execute():
                 yield item
 
-            async for (verb, iden) in node.iterEdgesN1():
-                wnode = await runt.snap.getNodeByBuid(s_common.uhex(iden))
-                if wnode is not None:
-                    yield wnode, path.fork(wnode)
+            for node, path in window:
+                async for (verb, iden) in node.iterEdgesN1():
+                    wnode = await runt.snap.getNodeByBuid(s_common.uhex(iden))
+                    if wnode is not None:
+                        yield wnode, path.fork(wnode)
 
 class PivotToTags(PivotOper):
     '''
@@ -1408,6 +1831,24 @@ class PivotIn(PivotOper):
 
         name, valu = node.ndef
 
+        if runt.snap.hasRefIndx():
+
+            async for pivo in runt.snap.nodesByRefs(node.ndef):
+                yield pivo, path.fork(pivo)
+
+            # runt props are not present in the layer reference indexes
+            for prop in runt.model.propsbytype.get(name, ()):
+                if prop.isrunt:
+                    async for pivo in runt.snap.nodesByPropValu(prop.full, '=', valu):
+                        yield pivo, path.fork(pivo)
+
+            for prop in runt.model.arraysbytype.get(name, ()):
+                if prop.isrunt:
+                    async for pivo in runt.snap.nodesByPropArray(prop.full, '=', valu):
+                        yield pivo, path.fork(pivo)
+
+            return
+
         for prop in runt.model.propsbytype.get(name, ()):
             async for pivo in runt.snap.nodesByPropValu(prop.full, '=', valu):
                 yield pivo, path.fork(pivo)
@@ -1485,64 +1926,43 @@ class FormPivot(PivotOper):
     '''
 
     async def run(self, runt, genr):
-        warned = False
+
         name = self.kids[0].value()
 
         prop = runt.model.props.get(name)
         if prop is None:
             raise s_exc.NoSuchProp(name=name)
 
-        # -> baz:ndef
-        if isinstance(prop.type, s_types.Ndef):
+        batch = PivotBatch(runt)
 
-            async for node, path in genr:
+        async for window in s_coro.chunks(genr, self.getPivotWindow(runt)):
+
+            for node, path in window:
 
                 if self.isjoin:
                     yield node, path
 
-                async for pivo in runt.snap.nodesByPropValu(prop.full, '=', node.ndef):
-                    yield pivo, path.fork(pivo)
+                async for item in self.getPivsTo(runt, prop, node, path, batch):
+                    yield item
+
+            async for item in batch.execute():
+                yield item
 
+    async def getPivsTo(self, runt, prop, node, path, batch):
+
+        # -> baz:ndef
+        if isinstance(prop.type, s_types.Ndef):
+            batch.add(prop.full, node.ndef, path)
             return
 
         if not prop.isform:
-
             # plain old pivot...
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
-
-                valu = node.ndef[1]
-
-                # TODO cache/bypass normalization in loop!
-                try:
-                    async for pivo in runt.snap.nodesByPropValu(prop.full, '=', valu):
-                        yield pivo, path.fork(pivo)
-                except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
-                    if not warned:
-                        logger.warning(f'Caught error during pivot: {e.items()}')
-                        warned = True
-                    items = e.items()
-                    mesg = items.pop('mesg', '')
-                    mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
-                    await runt.snap.fire('warn', mesg=mesg, **items)
-
+            batch.add(prop.full, node.ndef[1], path)
             return
 
         # if dest form is a subtype of a graph "edge", use N1 automatically
         if isinstance(prop.type, s_types.Edge):
-
-            full = prop.name + ':n1'
-
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
-
-                async for pivo in runt.snap.nodesByPropValu(full, '=', node.ndef):
-                    yield pivo, path.fork(pivo)
-
+            batch.add(prop.name + ':n1', node.ndef, path)
             return
 
         # form -> form pivot is nonsensical. Lets help out...
@@ -1550,111 +1970,97 @@ class FormPivot(PivotOper):
         # form name and type name match
         destform = prop
 
-        async for node, path in genr:
+        # <syn:tag> -> <form> is "from tags to nodes" pivot
+        if node.form.name == 'syn:tag' and prop.isform:
+            async for pivo in runt.snap.nodesByTag(node.ndef[1], form=prop.name):
+                yield pivo, path.fork(pivo)
 
-            if self.isjoin:
-                yield node, path
+            return
 
-            # <syn:tag> -> <form> is "from tags to nodes" pivot
-            if node.form.name == 'syn:tag' and prop.isform:
-                async for pivo in runt.snap.nodesByTag(node.ndef[1], form=prop.name):
-                    yield pivo, path.fork(pivo)
+        # if the source node is a graph edge, use n2
+        if isinstance(node.form.type, s_types.Edge):
 
-                continue
+            n2def = node.get('n2')
+            if n2def[0] != destform.name:
+                return
 
-            # if the source node is a graph edge, use n2
-            if isinstance(node.form.type, s_types.Edge):
+            batch.add(n2def[0], n2def[1], path)
+            return
 
-                n2def = node.get('n2')
-                if n2def[0] != destform.name:
-                    continue
+        #########################################################################
+        # regular "-> form" pivot (ie inet:dns:a -> inet:fqdn)
 
-                pivo = await runt.snap.getNodeByNdef(node.get('n2'))
-                if pivo:
-                    yield pivo, path.fork(pivo)
+        found = False   # have we found a ref/pivot?
+        refs = node.form.getRefsOut()
+        for refsname, refsform in refs.get('prop'):
 
+            if refsform != destform.name:
                 continue
 
-            #########################################################################
-            # regular "-> form" pivot (ie inet:dns:a -> inet:fqdn)
-
-            found = False   # have we found a ref/pivot?
-            refs = node.form.getRefsOut()
-            for refsname, refsform in refs.get('prop'):
-
-                if refsform != destform.name:
-                    continue
-
-                found = True
+            found = True
 
-                refsvalu = node.get(refsname)
-                if refsvalu is not None:
-                    async for pivo in runt.snap.nodesByPropValu(refsform, '=', refsvalu):
-                        yield pivo, path.fork(pivo)
+            refsvalu = node.get(refsname)
+            if refsvalu is not None:
+                batch.add(refsform, refsvalu, path)
 
-            for refsname, refsform in refs.get('array'):
+        for refsname, refsform in refs.get('array'):
 
-                if refsform != destform.name:
-                    continue
+            if refsform != destform.name:
+                continue
 
-                found = True
+            found = True
 
-                refsvalu = node.get(refsname)
-                if refsvalu is not None:
-                    for refselem in refsvalu:
-                        async for pivo in runt.snap.nodesByPropValu(destform.name, '=', refselem):
-                            yield pivo, path.fork(pivo)
+            refsvalu = node.get(refsname)
+            if refsvalu is not None:
+                for refselem in refsvalu:
+                    batch.add(destform.name, refselem, path)
 
-            for refsname in refs.get('ndef'):
+        for refsname in refs.get('ndef'):
 
-                found = True
+            found = True
 
-                refsvalu = node.get(refsname)
-                if refsvalu is not None and refsvalu[0] == destform.name:
-                    pivo = await runt.snap.getNodeByNdef(refsvalu)
-                    if pivo is not None:
-                        yield pivo, path.fork(pivo)
+            refsvalu = node.get(refsname)
+            if refsvalu is not None and refsvalu[0] == destform.name:
+                batch.add(refsvalu[0], refsvalu[1], path)
 
-            #########################################################################
-            # reverse "-> form" pivots (ie inet:fqdn -> inet:dns:a)
-            refs = destform.getRefsOut()
+        #########################################################################
+        # reverse "-> form" pivots (ie inet:fqdn -> inet:dns:a)
+        refs = destform.getRefsOut()
 
-            # "reverse" property references...
-            for refsname, refsform in refs.get('prop'):
+        # "reverse" property references...
+        for refsname, refsform in refs.get('prop'):
 
-                if refsform != node.form.name:
-                    continue
+            if refsform != node.form.name:
+                continue
 
-                found = True
+            found = True
 
-                refsprop = destform.props.get(refsname)
-                async for pivo in runt.snap.nodesByPropValu(refsprop.full, '=', node.ndef[1]):
-                    yield pivo, path.fork(pivo)
+            refsprop = destform.props.get(refsname)
+            batch.add(refsprop.full, node.ndef[1], path)
 
-            # "reverse" array references...
-            for refsname, refsform in refs.get('array'):
+        # "reverse" array references...
+        for refsname, refsform in refs.get('array'):
 
-                if refsform != node.form.name:
-                    continue
+            if refsform != node.form.name:
+                continue
 
-                found = True
+            found = True
 
-                destprop = destform.props.get(refsname)
-                async for pivo in runt.snap.nodesByPropArray(destprop.full, '=', node.ndef[1]):
-                    yield pivo, path.fork(pivo)
+            destprop = destform.props.get(refsname)
+            async for pivo in runt.snap.nodesByPropArray(destprop.full, '=', node.ndef[1]):
+                yield pivo, path.fork(pivo)
 
-            # "reverse" ndef references...
-            for refsname in refs.get('ndef'):
+        # "reverse" ndef references...
+        for refsname in refs.get('ndef'):
 
-                found = True
+            found = True
 
-                refsprop = destform.props.get(refsname)
-                async for pivo in runt.snap.nodesByPropValu(refsprop.full, '=', node.ndef):
-                    yield pivo, path.fork(pivo)
+            refsprop = destform.props.get(refsname)
+            batch.add(refsprop.full, node.ndef, path)
 
-            if not found:
-                mesg = f'No pivot found for {node.form.name} -> {destform.name}.'
-                raise s_exc.NoSuchPivot(n1=node.form.name, n2=destform.name, mesg=mesg)
+        if not found:
+            mesg = f'No pivot found for {node.form.name} -> {destform.name}.'
+            raise s_exc.NoSuchPivot(n1=node.form.name, n2=destform.name, mesg=mesg)
 
 class PropPivotOut(PivotOper):
     '''
@@ -1663,61 +2069,60 @@ class PropPivotOut(PivotOper):
     async def run(self, runt, genr):
 
         warned = False
-        async for node, path in genr:
-            name = await self.kids[0].compute(path)
+        batch = PivotBatch(runt)
 
-            prop = node.form.props.get(name)
-            if prop is None:
-                # all filters must sleep
-                await asyncio.sleep(0)
-                continue
+        async for window in s_coro.chunks(genr, self.getPivotWindow(runt)):
 
-            valu = node.get(name)
-            if valu is None:
-                # all filters must sleep
-                await asyncio.sleep(0)
-                continue
+            for node, path in window:
 
-            if prop.type.isarray:
-                fname = prop.type.arraytype.name
-                if runt.model.forms.get(fname) is None:
-                    if not warned:
-                        mesg = f'The source property "{name}" array type "{fname}" is not a form. Cannot pivot.'
-                        await runt.snap.warn(mesg)
-                        warned = True
+                name = await self.kids[0].compute(path)
+
+                prop = node.form.props.get(name)
+                if prop is None:
+                    # all filters must sleep
+                    await asyncio.sleep(0)
                     continue
 
-                for item in valu:
-                    async for pivo in runt.snap.nodesByPropValu(fname, '=', item):
-                        yield pivo, path.fork(pivo)
+                valu = node.get(name)
+                if valu is None:
+                    # all filters must sleep
+                    await asyncio.sleep(0)
+                    continue
+
+                if prop.type.isarray:
+                    fname = prop.type.arraytype.name
+                    if runt.model.forms.get(fname) is None:
+                        if not warned:
+                            mesg = f'The source property "{name}" array type "{fname}" is not a form. Cannot pivot.'
+                            await runt.snap.warn(mesg)
+                            warned = True
+                        continue
+
+                    for item in valu:
+                        batch.add(fname, item, path)
 
-                continue
+                    continue
 
-            # ndef pivot out syntax...
-            # :ndef -> *
-            if isinstance(prop.type, s_types.Ndef):
-                pivo = await runt.snap.getNodeByNdef(valu)
-                if pivo is None:
-                    logger.warning(f'Missing node corresponding to ndef {valu}')
+                # ndef pivot out syntax...
+                # :ndef -> *
+                if isinstance(prop.type, s_types.Ndef):
+                    batch.add(valu[0], valu[1], path)
                     continue
-                yield pivo, path.fork(pivo)
-                continue
 
-            # :prop -> *
-            fname = prop.type.name
-            if prop.modl.form(fname) is None:
-                if warned is False:
-                    await runt.snap.warn(f'The source property "{name}" type "{fname}" is not a form. Cannot pivot.')
-                    warned = True
-                continue
+                # :prop -> *
+                fname = prop.type.name
+                if prop.modl.form(fname) is None:
+                    if warned is False:
+                        await runt.snap.warn(f'The source property "{name}" type "{fname}" is not a form. Cannot pivot.')
+                        warned = True
+                    continue
 
-            ndef = (fname, valu)
-            pivo = await runt.snap.getNodeByNdef(ndef)
-            # A node explicitly deleted in the graph or missing from a underlying layer
-            # could cause this lift to return None.
-            if pivo:
-                yield pivo, path.fork(pivo)
+                # A node explicitly deleted in the graph or missing from a underlying layer
+                # will not be present in the lift.
+                batch.add(fname, valu, path)
 
+            async for item in batch.execute():
+                yield item
 
 class PropPivot(PivotOper):
     '''
@@ -1725,48 +2130,42 @@ class PropPivot(PivotOper):
     '''
 
     async def run(self, runt, genr):
-        warned = False
+
         name = self.kids[1].value()
 
         prop = runt.model.props.get(name)
         if prop is None:
             raise s_exc.NoSuchProp(name=name)
 
+        batch = PivotBatch(runt)
+
         # TODO if we are pivoting to a form, use ndef!
 
-        async for node, path in genr:
+        async for window in s_coro.chunks(genr, self.getPivotWindow(runt)):
 
-            if self.isjoin:
-                yield node, path
+            for node, path in window:
 
-            srcprop, valu = await self.kids[0].getPropAndValu(path)
-            if valu is None:
-                # all filters must sleep
-                await asyncio.sleep(0)
-                continue
+                if self.isjoin:
+                    yield node, path
+
+                srcprop, valu = await self.kids[0].getPropAndValu(path)
+                if valu is None:
+                    # all filters must sleep
+                    await asyncio.sleep(0)
+                    continue
 
-            # TODO cache/bypass normalization in loop!
-            try:
                 # pivoting from an array prop to a non-array prop needs an extra loop
                 if srcprop.type.isarray and not prop.type.isarray:
 
                     for arrayval in valu:
-                        async for pivo in runt.snap.nodesByPropValu(prop.full, '=', arrayval):
-                            yield pivo, path.fork(pivo)
+                        batch.add(prop.full, arrayval, path)
 
                     continue
 
-                async for pivo in runt.snap.nodesByPropValu(prop.full, '=', valu):
-                    yield pivo, path.fork(pivo)
+                batch.add(prop.full, valu, path)
 
-            except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
-                if not warned:
-                    logger.warning(f'Caught error during pivot: {e.items()}')
-                    warned = True
-                items = e.items()
-                mesg = items.pop('mesg', '')
-                mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
-                await runt.snap.fire('warn', mesg=mesg, **items)
+            async for item in batch.execute():
+                yield item
 
 class Cond(AstNode):
 
@@ -1777,7 +2176,13 @@ class Cond(AstNode):
         raise s_exc.NoSuchImpl(name=f'{self.__class__.__name__}.getCondEval()')
 
 class SubqCond(Cond):
+    '''
+    Filter nodes by the number of results yielded by a subquery.
 
+    Subqueries without side effects are memoized per runtime using the node
+    and the values of the variables they reference.  A subquery which is a
+    single form pivot is counted using the layer indexes when possible.
+    '''
     def __init__(self, kids=()):
         Cond.__init__(self, kids=kids)
         self.funcs = {
@@ -1789,112 +2194,204 @@ class SubqCond(Cond):
             '!=': self._subqCondNe,
         }
 
-    async def _runSubQuery(self, runt, node, path):
-        size = 1
-        genr = s_common.agen((node, path))
-        async for item in self.kids[0].run(runt, genr):
-            yield size, item
-            size += 1
+    def prepare(self):
 
-    def _subqCondEq(self, runt):
+        subq = self.kids[0]
 
-        async def cond(node, path):
+        self.pure = not subq.hasAstClass(impure)
+
+        names = set()
+        todo = [subq]
+        while todo:
+            astn = todo.pop()
+            if isinstance(astn, VarValue):
+                names.add(astn.name)
+            todo.extend(astn.kids)
+
+        # the node itself is part of the memo key
+        names.discard('node')
+        self.varnames = tuple(sorted(names))
+
+    def _getMemoKey(self, node, path):
+
+        valus = tuple(path.getVar(name) for name in self.varnames)
+        memokey = (node.buid, valus)
+
+        try:
+            hash(memokey)
+        except TypeError:
+            return None
+
+        return memokey
+
+    async def _getSubqSize(self, runt, memo, node, path, maxsize):
+        '''
+        Return the number of results yielded by the subquery, counting no more than maxsize.
+        '''
+        memokey = None
+        if memo is not None:
+
+            memokey = self._getMemoKey(node, path)
+            if memokey is not None:
+
+                item = memo.get(memokey)
+                if item is not None:
+                    seqn, size, done = item
+                    if seqn == runt.snap.editseqn and (done or size >= maxsize):
+                        return min(size, maxsize)
+
+        seqn = runt.snap.editseqn
+
+        done = True
+        size = await self._getPivotSize(runt, node, path, maxsize)
+        if size is None:
 
             size = 0
-            valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            async for item in self.kids[0].run(runt, s_common.agen((node, path))):
+                size += 1
+                if size >= maxsize:
+                    done = False
+                    break
 
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size > valu:
-                    return False
+        elif size >= maxsize:
+            done = False
 
-            return size == valu
+        if memokey is not None and seqn == runt.snap.editseqn:
+            memo[memokey] = (seqn, size, done)
 
-        return cond
+        return size
 
-    def _subqCondGt(self, runt):
+    async def _getPivotSize(self, runt, node, path, maxsize):
+        '''
+        Count the results of a "{ -> form }" subquery using the layer indexes.
 
-        async def cond(node, path):
+        Returns:
+            (int): The count or None if the subquery must be run.
+        '''
+        if not self.pure:
+            return None
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(path))
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size > valu:
-                    return True
+        opers = self.kids[0].kids
+        if len(opers) != 1:
+            return None
 
-            return False
+        pivot = opers[0]
+        if not isinstance(pivot, FormPivot) or pivot.isjoin:
+            return None
 
-        return cond
+        prop = runt.model.prop(pivot.kids[0].value())
+        if prop is None:
+            return None
 
-    def _subqCondLt(self, runt):
+        if maxsize <= 0:
+            return 0
 
-        async def cond(node, path):
+        # pivots which do not lift by value yield their results directly
+        direct = False
+        batch = PivotBatch(runt)
+        async for item in pivot.getPivsTo(runt, prop, node, path, batch):
+            direct = True
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(path))
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size >= valu:
-                    return False
+        if direct or batch.misc:
+            return None
 
-            return True
+        size = 0
+        for full, valus in batch.todo.items():
 
-        return cond
+            dest = runt.model.prop(full)
+            if dest is None:
+                continue
 
-    def _subqCondGe(self, runt):
+            for valu, paths in valus.items():
 
-        async def cond(node, path):
+                try:
+                    cmprvals = dest.type.getStorCmprs('=', valu)
+                except (s_exc.BadTypeValu, s_exc.BadLiftValu):
+                    return None
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(path))
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size >= valu:
-                    return True
+                if len(cmprvals) != 1 or cmprvals[0][0] != '=':
+                    return None
 
-            return False
+                count = await runt.snap.getPropValuCount(full, cmprvals[0][1], maxsize=maxsize - size)
+                if count is None:
+                    return None
 
-        return cond
+                size += count * len(paths)
+                if size >= maxsize:
+                    return size
 
-    def _subqCondLe(self, runt):
+        return size
+
+    def _subqCondEq(self, runt, memo):
 
         async def cond(node, path):
+            valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            size = await self._getSubqSize(runt, memo, node, path, valu + 1)
+            return size == valu
+
+        return cond
+
+    def _subqCondGt(self, runt, memo):
 
+        async def cond(node, path):
             valu = s_stormtypes.intify(await self.kids[2].compute(path))
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size > valu:
-                    return False
+            size = await self._getSubqSize(runt, memo, node, path, valu + 1)
+            return size > valu
+
+        return cond
 
-            return True
+    def _subqCondLt(self, runt, memo):
+
+        async def cond(node, path):
+            valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            size = await self._getSubqSize(runt, memo, node, path, valu)
+            return size < valu
 
         return cond
 
-    def _subqCondNe(self, runt):
+    def _subqCondGe(self, runt, memo):
 
         async def cond(node, path):
+            valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            size = await self._getSubqSize(runt, memo, node, path, valu)
+            return size >= valu
 
-            size = 0
+        return cond
+
+    def _subqCondLe(self, runt, memo):
+
+        async def cond(node, path):
             valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            size = await self._getSubqSize(runt, memo, node, path, valu + 1)
+            return size <= valu
 
-            async for size, item in self._runSubQuery(runt, node, path):
-                if size > valu:
-                    return True
+        return cond
+
+    def _subqCondNe(self, runt, memo):
 
+        async def cond(node, path):
+            valu = s_stormtypes.intify(await self.kids[2].compute(path))
+            size = await self._getSubqSize(runt, memo, node, path, valu + 1)
             return size != valu
 
         return cond
 
     async def getCondEval(self, runt):
 
+        memo = None
+        if self.pure:
+            memo = s_cache.LruDict(size=SUBQ_MEMO_SIZE)
+
         if len(self.kids) == 3:
             cmpr = self.kids[1].value()
             ctor = self.funcs.get(cmpr)
             if ctor is None:
                 raise s_exc.NoSuchCmpr(cmpr=cmpr, type='subquery')
 
-            return ctor(runt)
-
-        subq = self.kids[0]
+            return ctor(runt, memo)
 
         async def cond(node, path):
-            genr = s_common.agen((node, path))
-            async for _ in subq.run(runt, genr):
-                return True
-            return False
+            return await self._getSubqSize(runt, memo, node, path, 1) > 0
 
         return cond
 
@@ -1923,7 +2420,7 @@ class AndCond(Cond):
     def getLiftHints(self):
         h0 = self.kids[0].getLiftHints()
         h1 = self.kids[1].getLiftHints()
-        return h0 + h1
+        return list(h0) + list(h1)
 
     async def getCondEval(self, runt):
 
@@ -2093,6 +2590,11 @@ class ArrayCond(Cond):
         name = self.kids[0].value()
         cmpr = self.kids[1].value()
 
+        isconst = isConstValu(self.kids[2])
+
+        # comparison functions by prop for constant values
+        funcs = {}
+
         async def cond(node, path):
 
             prop = node.form.props.get(name)
@@ -2104,15 +2606,23 @@ class ArrayCond(Cond):
                 mesg = f'Array filter syntax is invalid for non-array prop {name}.'
                 raise s_exc.BadCmprType(mesg=mesg)
 
-            ctor = prop.type.arraytype.getCmprCtor(cmpr)
-
             items = node.get(name)
             if items is None:
                 return False
 
-            val2 = await self.kids[2].compute(path)
+            func = funcs.get(prop.full)
+            if func is None:
+
+                ctor = prop.type.arraytype.getCmprCtor(cmpr)
+
+                val2 = await self.kids[2].compute(path)
+                func = ctor(val2)
+
+                if isconst:
+                    funcs[prop.full] = func
+
             for item in items:
-                if ctor(val2)(item):
+                if func(item):
                     return True
 
             return False
@@ -2134,6 +2644,9 @@ class AbsPropCond(Cond):
         if ctor is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
 
+        if isConstValu(self.kids[2]):
+            return self._getConstCond(prop, ctor(self.kids[2].value()))
+
         if prop.isform:
 
             async def cond(node, path):
@@ -2158,6 +2671,29 @@ class AbsPropCond(Cond):
 
         return cond
 
+    def _getConstCond(self, prop, func):
+
+        if prop.isform:
+
+            async def cond(node, path):
+
+                if node.ndef[0] != prop.name:
+                    return False
+
+                return func(node.ndef[1])
+
+            return cond
+
+        async def cond(node, path):
+
+            valu = node.get(prop.name)
+            if valu is None:
+                return False
+
+            return func(valu)
+
+        return cond
+
 class TagValuCond(Cond):
 
     async def getCondEval(self, runt):
@@ -2203,10 +2739,38 @@ class RelPropCond(Cond):
     '''
     :foo:bar <cmpr> <value>
     '''
+    def getLiftHints(self):
+
+        relp = self.kids[0]
+        if not isinstance(relp, RelPropValue):
+            return []
+
+        name = relp.kids[0]
+        if not isinstance(name, RelProp) or not name.isconst:
+            return []
+
+        if name.value().find('::') != -1:
+            return []
+
+        valu = self.kids[2]
+        if not isConstValu(valu):
+            return []
+
+        return (
+            ('relprop', {'name': name.value(), 'cmpr': self.kids[1].value(), 'valu': valu}),
+        )
+
     async def getCondEval(self, runt):
 
         cmpr = self.kids[1].value()
 
+        relp = self.kids[0].kids[0]
+        if isinstance(relp, RelProp) and relp.isconst and isConstValu(self.kids[2]):
+
+            name = relp.value()
+            if name.find('::') == -1:
+                return self._getConstCond(name, cmpr, self.kids[2].value())
+
         async def cond(node, path):
 
             prop, valu = await self.kids[0].getPropAndValu(path)
@@ -2223,37 +2787,88 @@ class RelPropCond(Cond):
 
         return cond
 
+    def _getConstCond(self, name, cmpr, xval):
+
+        # comparison functions by prop for nodes of different forms
+        funcs = {}
+
+        def getCmprFunc(prop):
+            ctor = prop.type.getCmprCtor(cmpr)
+            if ctor is None:
+                raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
+
+            func = funcs[prop.full] = ctor(xval)
+            return func
+
+        async def cond(node, path):
+
+            prop = node.form.props.get(name)
+            if prop is None:
+                raise s_exc.NoSuchProp(name=name, form=node.form.name)
+
+            valu = node.get(name)
+            if valu is None:
+                return False
+
+            func = funcs.get(prop.full)
+            if func is None:
+                func = getCmprFunc(prop)
+
+            return func(valu)
+
+        return cond
+
 class TagPropCond(Cond):
 
     async def getCondEval(self, runt):
 
         cmpr = self.kids[1].value()
 
+        isconst = isConstValu(self.kids[2])
+
+        # comparison functions by tag prop for constant values
+        funcs = {}
+
         async def cond(node, path):
 
             tag, name = await self.kids[0].compute(path)
 
-            prop = path.runt.model.getTagProp(name)
-            if prop is None:
-                mesg = f'No such tag property: {name}'
-                raise s_exc.NoSuchTagProp(name=name, mesg=mesg)
+            curv = node.getTagProp(tag, name)
 
-            # TODO cache on (cmpr, valu) for perf?
-            valu = await self.kids[2].compute(path)
+            func = funcs.get(name)
+            if func is None:
 
-            ctor = prop.type.getCmprCtor(cmpr)
-            if ctor is None:
-                raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
+                prop = path.runt.model.getTagProp(name)
+                if prop is None:
+                    mesg = f'No such tag property: {name}'
+                    raise s_exc.NoSuchTagProp(name=name, mesg=mesg)
+
+                valu = await self.kids[2].compute(path)
+
+                ctor = prop.type.getCmprCtor(cmpr)
+                if ctor is None:
+                    raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
+
+                if curv is None:
+                    return False
+
+                func = ctor(valu)
+                if isconst:
+                    funcs[name] = func
 
-            curv = node.getTagProp(tag, name)
             if curv is None:
                 return False
-            return ctor(valu)(curv)
+            return func(curv)
 
         return cond
 
 class FiltOper(Oper):
 
+    def __init__(self, kids=()):
+        Oper.__init__(self, kids=kids)
+        # the (runt, cond) compiled by the last run
+        self.condcache = None
+
     def getLiftHints(self):
 
         if self.kids[0].value() != '+':
@@ -2261,10 +2876,29 @@ class FiltOper(Oper):
 
         return self.kids[1].getLiftHints()
 
+    def isPure(self):
+        '''
+        Return True if the filter may not edit nodes or set variables.
+        '''
+        return not self.hasAstClass(impure)
+
+    async def getCondEval(self, runt):
+        '''
+        Return the condition function, compiled once per runtime.
+
+        NOTE: Filters within subqueries run once per inbound node.
+        '''
+        if self.condcache is not None and self.condcache[0] is runt:
+            return self.condcache[1]
+
+        cond = await self.kids[1].getCondEval(runt)
+        self.condcache = (runt, cond)
+        return cond
+
     async def run(self, runt, genr):
 
         must = self.kids[0].value() == '+'
-        cond = await self.kids[1].getCondEval(runt)
+        cond = await self.getCondEval(runt)
 
         async for node, path in genr:
             answ = await cond(node, path)
@@ -2709,8 +3343,124 @@ class AbsProp(Value):
 class Edit(Oper):
     pass
 
+def planEditBlocks(astn, offs=0):
+    '''
+    Group runs of edit operations in the kids of an AST node into EditBlock operations.
+
+    Args:
+        astn (AstNode): The AST node whose kids are a list of operations.
+        offs (int): The offset of the first kid which may be grouped.
+
+    Returns:
+        (bool): True if any edit operations were grouped.
+    '''
+    kids = []
+    block = None
+    changed = False
+
+    for indx, oper in enumerate(astn.kids):
+
+        if indx < offs or not isinstance(oper, blockedits):
+            block = None
+            kids.append(oper)
+            continue
+
+        if block is None:
+            block = EditBlock()
+            block.core = oper.core
+            kids.append(block)
+            changed = True
+
+        block.addKid(oper)
+
+    if changed:
+        astn.kids = []
+        [astn.addKid(k) for k in kids]
+
+    return changed
+
+class EditBlock(Edit):
+    '''
+    A run of edit operations which buffer their node edits across a window of nodes.
+    '''
+    def __init__(self, kids=()):
+        Edit.__init__(self, kids=kids)
+        self.limit = None
+
+    def getEditWindow(self, runt):
+        '''
+        Return the initial and maximum number of inbound nodes to edit for each set of
+        buffered node edits and the number of inbound nodes which may be consumed ( or None ).
+        '''
+        # the nodes yielded to another pipeline may not all be consumed
+        if runt.piped:
+            return 1, 1, None
+
+        limit = self.limit
+
+        optlimit = runt.getOpt('limit')
+        if optlimit is not None and optlimit > 0:
+
+            # later operations may filter or multiply the nodes counted by the limit
+            if self.sibling() is not None:
+                return 1, 1, None
+
+            limit = optlimit if limit is None else min(limit, optlimit)
+
+        if limit is not None and limit <= EDIT_WINDOW:
+            return limit, limit, limit
+
+        return 1, EDIT_WINDOW, limit
+
+    async def run(self, runt, genr):
+
+        # grow the window so the first nodes are not delayed by upstream operations
+        size, window, limit = self.getEditWindow(runt)
+
+        count = 0
+        items = []
+        async for item in genr:
+
+            items.append(item)
+            if len(items) < size:
+                continue
+
+            count += len(items)
+
+            async for edited in self._editItems(runt, items):
+                yield edited
+
+            items = []
+            size = min(size * 2, window)
+
+            # never pull a window past the nodes which may be consumed
+            if limit is not None:
+                size = max(1, min(size, limit - count))
+
+        async for edited in self._editItems(runt, items):
+            yield edited
+
+    async def _editItems(self, runt, items):
+
+        if not items:
+            return
+
+        async with runt.snap.bufferNodeEdits():
+
+            editgenr = s_common.agen(*items)
+            for oper in self.kids:
+                editgenr = oper.run(runt, editgenr)
+
+            items = [item async for item in editgenr]
+
+        for item in items:
+            yield item
+
 class EditParens(Edit):
 
+    def prepare(self):
+        planEditBlocks(self, offs=1)
+
     async def run(self, runt, genr):
 
         nodeadd = self.kids[0]
@@ -3442,3 +4192,49 @@ class Function(AstNode):
                 yield node
 
         return nodegenr()
+
+# comparisons which may be pushed from a filter into a prop lift by the planner
+planlifts = ('=', '<', '>', '<=', '>=', 'range=')
+
+# operations which prevent the planner from reordering a filter
+impure = (
+    Edit,
+    CmdOper,
+    FuncCall,
+    SetVarOper,
+    SetItemOper,
+    VarListSetOper,
+    VarEvalOper,
+    BreakOper,
+    ContinueOper,
+    Return,
+)
+
+# operations which may stop consuming their inbound nodes early
+stopopers = (
+    CmdOper,
+    Return,
+)
+
+# edit operations which only edit their inbound nodes and may be grouped into an EditBlock
+blockedits = (
+    EditPropSet,
+    EditPropDel,
+    EditUnivDel,
+    EditTagAdd,
+    EditTagDel,
+    EditTagPropSet,
+    EditTagPropDel,
+)
+
+# operations which may observe or modify the variables or nodes of a path
+pathuse = (
+    CmdOper,
+    ForLoop,
+    Function,
+    VarValue,
+    SetVarOper,
+    SetItemOper,
+    VarListSetOper,
+    VarEvalOper,
+)
@@ -32,6 +32,29 @@ async def agen(item):
     for x in item:
         yield x
 
+async def chunks(genr, size):
+    '''
+    Divide an async generator into lists of up to size items.
+
+    Args:
+        genr: An async generator ( or generator ) to consume.
+        size (int): Maximum chunk size.
+
+    Yields:
+        list: Lists containing up to "size" number of items.
+    '''
+    chunk = []
+    async for item in agen(genr):
+
+        chunk.append(item)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
 def executor(func, *args, **kwargs):
     '''
     Execute a non-coroutine function in the ioloop executor pool.
@@ -768,6 +768,60 @@ class ModelNormV1(Handler):
         else:
             self.sendRestRetn({'norm': valu, 'info': info})
 
+class ModelNormsV1(Handler):
+
+    async def post(self):
+        return await self.get()
+
+    async def get(self):
+
+        if not await self.reqAuthUser():
+            return
+
+        body = self.getJsonBody()
+        if body is None:
+            return
+
+        propname = body.get('prop')
+        typename = body.get('type')
+        valus = body.get('values')
+
+        if propname is None and typename is None:
+            self.sendRestErr('MissingField', 'The normalization API requires a prop or type name.')
+            return
+
+        if not isinstance(valus, list):
+            self.sendRestErr('BadArg', 'The normalization API requires a list of values.')
+            return
+
+        if propname is not None:
+            genr = self.cell.getPropNorms(propname, valus)
+        else:
+            genr = self.cell.getTypeNorms(typename, valus)
+
+        # results are streamed as newline delimited JSON in the order of the values
+        count = 0
+        try:
+            async for ok, retn in genr:
+
+                if ok:
+                    norm, info = retn
+                    mesg = {'status': 'ok', 'result': {'norm': norm, 'info': info}}
+                else:
+                    name, info = retn
+                    mesg = {'status': 'err', 'code': name, 'mesg': info.get('mesg', '')}
+
+                self.write(json.dumps(mesg) + '\n')
+
+                count += 1
+                if not count % 1000:
+                    await self.flush()
+
+        except s_exc.NoSuchProp:
+            return self.sendRestErr('NoSuchProp', f'The property {propname} does not exist.')
+        except s_exc.NoSuchType:
+            return self.sendRestErr('NoSuchType', f'The type {typename} does not exist.')
+
 class ModelV1(Handler):
 
     async def get(self):
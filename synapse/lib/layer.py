@@ -62,6 +62,7 @@ import shutil
 import struct
 import asyncio
 import logging
+import itertools
 import ipaddress
 import contextlib
 import collections
@@ -75,6 +76,7 @@ import synapse.telepath as s_telepath
 
 import synapse.lib.gis as s_gis
 import synapse.lib.cell as s_cell
+import synapse.lib.coro as s_coro
 import synapse.lib.cache as s_cache
 import synapse.lib.nexus as s_nexus
 import synapse.lib.queue as s_queue
@@ -96,6 +98,7 @@ reqValidLdef = s_config.getJsValidator({
         'lockmemory': {'type': 'boolean'},
         'logedits': {'type': 'boolean'}, 'default': True,
         'name': {'type': 'string'},
+        'trigrams': {'type': 'array', 'items': {'type': 'string'}},
     },
     'additionalProperties': True,
     'required': ['iden', 'creator', 'lockmemory'],
@@ -171,6 +174,8 @@ class LayerApi(s_cell.CellApi):
         return self.layr.iden
 
 BUID_CACHE_SIZE = 10000
+STOR_NODE_WINDOW = 256
+STOR_NODE_WINDOW_MIN = 16
 
 STOR_TYPE_UTF8 = 1
 
@@ -401,6 +406,15 @@ class StorType:
     def indx(self, valu):
         raise NotImplementedError
 
+# characters which always match themselves outside of groups and sets
+REGX_LITERALS = ' _-,:;/@=!%&\'"~`'
+
+def getTrigrams(text):
+    '''
+    Return the set of utf8 encoded trigrams for a string.
+    '''
+    return set(text[i:i + 3].encode('utf8', 'surrogatepass') for i in range(len(text) - 2))
+
 class StorTypeUtf8(StorType):
 
     def __init__(self, layr):
@@ -428,7 +442,11 @@ class StorTypeUtf8(StorType):
         regx = regex.compile(valu)
         lastbuid = None
 
-        for buid in liftby.buidsByPref():
+        genr = self.layr.iterTrigramBuids(liftby, valu)
+        if genr is None:
+            genr = liftby.buidsByPref()
+
+        for buid in genr:
             if buid == lastbuid:
                 continue
 
@@ -452,6 +470,137 @@ class StorTypeUtf8(StorType):
         for item in liftby.buidsByPref(indx):
             yield item
 
+    @staticmethod
+    def getRegxTrigrams(text):
+        '''
+        Return the set of trigrams which any string matching the regex must contain.
+
+        Returns None if the pattern can not be reduced to literal trigrams.
+
+        Notes:
+            Only a conservative subset of the syntax shared by the re and regex
+            modules is parsed. Only literals outside of groups and sets which are
+            not followed by a quantifier are required, and patterns which use
+            inline flags or top level alternation are not reduced.
+        '''
+        # inline flags ( such as (?i) or (?V1) ) may change the meaning of the pattern
+        if '(?' in text:
+            return None
+
+        runs = []
+        chars = []
+
+        def endrun():
+            runs.append(''.join(chars))
+            chars.clear()
+
+        def skipto(i, char):
+            while i < size and text[i] != char:
+                if text[i] == '\\':
+                    i += 1
+                i += 1
+            return i + 1
+
+        i = 0
+        depth = 0
+        size = len(text)
+
+        while i < size:
+
+            c = text[i]
+            i += 1
+
+            if c == '\\':
+
+                if i >= size:
+                    return None
+
+                c = text[i]
+                i += 1
+
+                if depth == 0 and not c.isalnum():
+                    chars.append(c)
+                    continue
+
+                # escapes such as \d, \x41, \p{L} or \L<name> are not literals
+                endrun()
+                while i < size and text[i].isalnum():
+                    i += 1
+
+                if i < size and text[i] in '{<':
+                    i = skipto(i, '}' if text[i] == '{' else '>')
+
+                continue
+
+            if c == '[':
+
+                if i < size and text[i] == '^':
+                    i += 1
+
+                if i < size and text[i] == ']':
+                    i += 1
+
+                i = skipto(i, ']')
+                if i > size:
+                    return None
+
+                endrun()
+                continue
+
+            if c == '(':
+                depth += 1
+                endrun()
+                continue
+
+            if c == ')':
+                depth -= 1
+                if depth < 0:
+                    return None
+                continue
+
+            if c == '|':
+                if depth == 0:
+                    return None
+                continue
+
+            if depth:
+                continue
+
+            if c.isalnum() or c in REGX_LITERALS:
+                chars.append(c)
+                continue
+
+            if c in '*+?{':
+
+                # the previous literal is optional ( or fuzzy ) when quantified
+                if chars:
+                    chars.pop()
+
+                endrun()
+
+                if c == '{':
+                    i = skipto(i, '}')
+                    if i > size:
+                        return None
+
+                continue
+
+            endrun()
+
+        if depth:
+            return None
+
+        endrun()
+
+        trigrams = set()
+        for run in runs:
+            trigrams.update(getTrigrams(run))
+
+        if not trigrams:
+            return None
+
+        return trigrams
+
     def _getIndxByts(self, valu):
 
         # include a byte as a "type" of string index value
@@ -930,47 +1079,147 @@ class StorTypeLatLon(StorType):
 
         (lat, lon), dist = valu
 
-        # latscale = (lat * self.scale) + self.latspace
-        # lonscale = (lon * self.scale) + self.lonspace
+        latmin, latmax, lonmin, lonmax = self._getNearBbox(lat, lon, dist)
+
+        latminindx = (round(latmin * self.scale) + self.latspace).to_bytes(5, 'big')
+        latmaxindx = (round(latmax * self.scale) + self.latspace).to_bytes(5, 'big')
+
+        # split the bbox if it crosses the antimeridian
+        boxes = []
+        if lonmin < -180:
+            boxes.append((latmin, latmax, lonmin + 360, 180))
+            lonmin = -180
+
+        if lonmax > 180:
+            boxes.append((latmin, latmax, -180, lonmax - 360))
+            lonmax = 180
+
+        boxes.append((latmin, latmax, lonmin, lonmax))
+
+        # scan the z-order cell ranges covering the bbox and down-select the results to matches.
+        for zmin, zmax in self._getZRanges(boxes):
+
+            todo = []
+            for lkey, buid in liftby.scanByRange(zmin.to_bytes(8, 'big'), zmax.to_bytes(8, 'big')):
+
+                # lkey = <abrv> <zorder> <lonindx> <latindx>
+                latbyts = lkey[-5:]
+
+                # limit results to the bounding box before unpacking...
+                if latbyts > latmaxindx:
+                    continue
+
+                if latbyts < latminindx:
+                    continue
+
+                todo.append((lkey[-10:-5], latbyts, buid))
+
+            for lonbyts, latbyts, buid in todo:
+
+                latvalu = (int.from_bytes(latbyts, 'big') - self.latspace) / self.scale
+                lonvalu = (int.from_bytes(lonbyts, 'big') - self.lonspace) / self.scale
+
+                if s_gis.haversine((lat, lon), (latvalu, lonvalu)) <= dist:
+                    yield buid
+
+            await asyncio.sleep(0)
+
+    def _getNearBbox(self, lat, lon, dist):
+
+        latd = math.degrees(dist / s_gis.r_mm)
+
+        latmin = lat - latd
+        latmax = lat + latd
+
+        # every longitude is in range if the circle covers a pole
+        if latmin <= -90 or latmax >= 90:
+            return max(latmin, -90), min(latmax, 90), -180, 180
 
         latmin, latmax, lonmin, lonmax = s_gis.bbox(lat, lon, dist)
+        if lonmax - lonmin >= 360:
+            return latmin, latmax, -180, 180
 
-        lonminindx = (round(lonmin * self.scale) + self.lonspace).to_bytes(5, 'big')
-        lonmaxindx = (round(lonmax * self.scale) + self.lonspace).to_bytes(5, 'big')
+        return latmin, latmax, lonmin, lonmax
 
-        latminindx = (round(latmin * self.scale) + self.latspace).to_bytes(5, 'big')
-        latmaxindx = (round(latmax * self.scale) + self.latspace).to_bytes(5, 'big')
+    def _getZRanges(self, boxes, maxcells=16):
+        '''
+        Return a sorted list of (zmin, zmax) tuples for the z-order cells covering the given bboxes.
 
-        # scan by lon range and down-select the results to matches.
-        for lkey, buid in liftby.scanByRange(lonminindx, lonmaxindx):
+        The cell level is the most precise one which covers the bboxes in no more than maxcells cells.
+        '''
+        quants = [(self._getLatQuant(b[0]), self._getLatQuant(b[1]), self._getLonQuant(b[2]), self._getLonQuant(b[3]))
+                  for b in boxes]
 
-            # lkey = <abrv> <lonindx> <latindx>
+        level = 0
+        for nextlevel in range(1, 33):
 
-            # limit results to the bounding box before unpacking...
-            latbyts = lkey[13:18]
+            shift = 32 - nextlevel
 
-            if latbyts > latmaxindx:
-                continue
+            count = 0
+            for latq0, latq1, lonq0, lonq1 in quants:
+                count += ((latq1 >> shift) - (latq0 >> shift) + 1) * ((lonq1 >> shift) - (lonq0 >> shift) + 1)
+
+            if count > maxcells:
+                break
+
+            level = nextlevel
+
+        shift = 32 - level
+        ranges = []
+        for latq0, latq1, lonq0, lonq1 in quants:
+            for latc in range(latq0 >> shift, (latq1 >> shift) + 1):
+                for lonc in range(lonq0 >> shift, (lonq1 >> shift) + 1):
+                    zmin = self._getZOrder(latc, lonc) << (shift * 2)
+                    ranges.append((zmin, zmin + (1 << (shift * 2)) - 1))
+
+        ranges.sort()
+
+        retn = []
+        for zmin, zmax in ranges:
 
-            if latbyts < latminindx:
+            if retn and zmin <= retn[-1][1] + 1:
+                retn[-1] = (retn[-1][0], max(zmax, retn[-1][1]))
                 continue
 
-            lonbyts = lkey[8:13]
+            retn.append((zmin, zmax))
+
+        return retn
 
-            latvalu = (int.from_bytes(latbyts, 'big') - self.latspace) / self.scale
-            lonvalu = (int.from_bytes(lonbyts, 'big') - self.lonspace) / self.scale
+    def _getLatQuant(self, lat):
+        # quantize a latitude to 32 bits
+        latint = round(lat * self.scale) + self.latspace
+        return (latint << 32) // (self.latspace * 2 + 1)
 
-            if s_gis.haversine((lat, lon), (latvalu, lonvalu)) <= dist:
-                yield buid
+    def _getLonQuant(self, lon):
+        # quantize a longitude to 32 bits
+        lonint = round(lon * self.scale) + self.lonspace
+        return (lonint << 32) // (self.lonspace * 2 + 1)
+
+    @staticmethod
+    def _spreadBits(x):
+        x = (x | (x << 16)) & 0x0000ffff0000ffff
+        x = (x | (x << 8)) & 0x00ff00ff00ff00ff
+        x = (x | (x << 4)) & 0x0f0f0f0f0f0f0f0f
+        x = (x | (x << 2)) & 0x3333333333333333
+        x = (x | (x << 1)) & 0x5555555555555555
+        return x
+
+    def _getZOrder(self, latq, lonq):
+        # interleave the quantized lat/lon bits ( lat in the odd bits )
+        return (self._spreadBits(latq) << 1) | self._spreadBits(lonq)
 
     def _getLatLonIndx(self, latlong):
-        # yield index bytes in lon/lat order to allow cheap optimal indexing
+        # yield index bytes in z-order followed by lon/lat to allow cheap optimal indexing
+        zorder = self._getZOrder(self._getLatQuant(latlong[0]), self._getLonQuant(latlong[1]))
+        return zorder.to_bytes(8, 'big') + self._getLonLatIndx(latlong)
+
+    def _getLonLatIndx(self, latlong):
+        # the index bytes used prior to the z-order index
         latindx = (round(latlong[0] * self.scale) + self.latspace).to_bytes(5, 'big')
         lonindx = (round(latlong[1] * self.scale) + self.lonspace).to_bytes(5, 'big')
         return lonindx + latindx
 
     def indx(self, valu):
-        # yield index bytes in lon/lat order to allow cheap optimal indexing
         return (self._getLatLonIndx(valu),)
 
 class Layer(s_nexus.Pusher):
@@ -1002,8 +1251,6 @@ class Layer(s_nexus.Pusher):
 
         self.fresh = not os.path.exists(path)
 
-        await self._initLayerStorage()
-
         self.stortypes = [
 
             None,
@@ -1040,6 +1287,12 @@ class Layer(s_nexus.Pusher):
             StorTypeHugeNum(self, STOR_TYPE_HUGENUM),
         ]
 
+        # (form, prop) -> form for each prop which references a form ( see setRefProps() )
+        self.refprops = {}
+        self.hasrefindx = False
+
+        await self._initLayerStorage()
+
         self.editors = [
             self._editNodeAdd,
             self._editNodeDel,
@@ -1148,6 +1401,10 @@ class Layer(s_nexus.Pusher):
                                                    readahead=False, readonly=self.readonly)
 
         self.formcounts = await self.layrslab.getHotCount('count:forms')
+        self.tagcounts = await self.layrslab.getHotCount('count:tags')
+        self.propcounts = await self.layrslab.getHotCount('count:props')
+
+        self.buidfilt = await self.layrslab.getHotBloom('buidfilt')
 
         path = s_common.genpath(self.dirn, 'nodeedits.lmdb')
         self.nodeeditslab = await s_lmdbslab.Slab.anit(path, readonly=self.readonly)
@@ -1168,6 +1425,11 @@ class Layer(s_nexus.Pusher):
         self.edgesn2 = self.layrslab.initdb('edgesn2', dupsort=True)
 
         self.bytag = self.layrslab.initdb('bytag', dupsort=True)
+        self.bytagival = self.layrslab.initdb('bytagival', dupsort=True)
+        self.bytrigram = self.layrslab.initdb('bytrigram', dupsort=True)
+        self.trigrammeta = self.layrslab.initdb('trigrams')
+        self.byref = self.layrslab.initdb('byref', dupsort=True)
+        self.refsmeta = self.layrslab.initdb('refs')
         self.byprop = self.layrslab.initdb('byprop', dupsort=True)
         self.byarray = self.layrslab.initdb('byarray', dupsort=True)
         self.bytagprop = self.layrslab.initdb('bytagprop', dupsort=True)
@@ -1178,6 +1440,457 @@ class Layer(s_nexus.Pusher):
 
         self.nodeeditlog = self.nodeeditctor(self.nodeeditslab, 'nodeedits')
 
+        self.hasindxcounts = self.layrslab.get(b'indxcounts', db=self.countdb) is not None
+        if not self.hasindxcounts and not self.readonly:
+            await self._initIndxCounts()
+
+        if not self.readonly and (not self.buidfilt.isready() or self.buidfilt.isfull()):
+            await self.rebuildBuidFilter()
+
+        self.hastagivals = self.layrslab.get(b'tagivals', db=self.countdb) is not None
+        if not self.hastagivals and not self.readonly:
+            await self._initTagIvalIndx()
+
+        if self.layrslab.get(b'zorderlatlong', db=self.countdb) is None and not self.readonly:
+            await self._initLatLongIndx()
+
+        await self._initTrigramIndx()
+
+        if self.refprops:
+            await self.setRefProps(self.refprops)
+
+    async def _initIndxCounts(self):
+        '''
+        Populate the persistent tag/prop row counters from the existing index rows.
+
+        This only needs to run once for layers created before the counters existed.
+        '''
+        tagcounts = collections.defaultdict(int)
+        for lkey in self.layrslab.scanKeys(db=self.bytag):
+            tagcounts[lkey[:8]] += 1
+            tagcounts[lkey[:16]] += 1
+            await asyncio.sleep(0)
+
+        propcounts = collections.defaultdict(int)
+        for lkey in self.layrslab.scanKeys(db=self.byprop):
+            propcounts[lkey[:8]] += 1
+            await asyncio.sleep(0)
+
+        for abrv, count in tagcounts.items():
+            self.tagcounts.set(s_common.ehex(abrv), count)
+
+        for abrv, count in propcounts.items():
+            self.propcounts.set(s_common.ehex(abrv), count)
+
+        if tagcounts or propcounts:
+            logger.warning(f'built index row counters for layer {self.iden}')
+
+        self.tagcounts.sync()
+        self.propcounts.sync()
+
+        self.layrslab.put(b'indxcounts', s_common.int64en(1), db=self.countdb)
+        self.hasindxcounts = True
+
+    async def _initTagIvalIndx(self):
+        '''
+        Populate the tag interval index from the existing tag rows.
+
+        This only needs to run once for layers created before the index existed.
+        '''
+        count = 0
+        for lkey, buid in self.layrslab.scanByFull(db=self.bytag):
+
+            tagabrv = lkey[:8]
+            tag = self.tagabrv.abrvToName(tagabrv)
+
+            valu = await self.getNodeTag(buid, tag)
+            if valu is not None and valu != (None, None):
+                self._setTagIvalIndx(tagabrv, lkey[8:], buid, valu)
+                count += 1
+
+            await asyncio.sleep(0)
+
+        if count:
+            logger.warning(f'built tag interval index for layer {self.iden}')
+
+        self.layrslab.put(b'tagivals', s_common.int64en(1), db=self.countdb)
+        self.hastagivals = True
+
+    async def _initLatLongIndx(self):
+        '''
+        Re-index geo:latlong values from the lon/lat index bytes to the z-order index bytes.
+
+        This only needs to run once for layers created before the z-order index existed.
+        '''
+        latlon = self.stortypes[STOR_TYPE_LATLONG]
+
+        def reindx(buid, abrvs, valu, stortype, db):
+
+            if stortype & STOR_FLAG_ARRAY:
+                if stortype & 0x7fff != STOR_TYPE_LATLONG:
+                    return 0
+                valus = valu
+                db = self.byarray
+
+            elif stortype == STOR_TYPE_LATLONG:
+                valus = (valu,)
+
+            else:
+                return 0
+
+            for latlong in valus:
+                oldi = latlon._getLonLatIndx(latlong)
+                newi = latlon._getLatLonIndx(latlong)
+                for abrv in abrvs:
+                    if self.layrslab.delete(abrv + oldi, buid, db=db):
+                        self.layrslab.put(abrv + newi, buid, db=db)
+
+            return 1
+
+        count = 0
+        rows = self.layrslab.scanByFull(db=self.bybuid)
+        for buid, items in itertools.groupby(rows, key=lambda x: x[0][:32]):
+
+            items = list(items)
+
+            form = None
+            for lkey, lval in items:
+                flag = lkey[32]
+                if flag == 0:
+                    form = s_msgpack.un(lval)[0]
+                elif flag == 9:
+                    form = lval.decode()
+
+            for lkey, lval in items:
+
+                flag = lkey[32]
+
+                if flag == 0:
+                    form, valu, stortype = s_msgpack.un(lval)
+                    abrvs = (self.setPropAbrv(form, None),)
+                    count += reindx(buid, abrvs, valu, stortype, self.byprop)
+
+                elif flag == 1:
+                    prop = lkey[33:].decode()
+                    valu, stortype = s_msgpack.un(lval)
+                    abrvs = [self.setPropAbrv(form, prop)]
+                    if prop[0] == '.':
+                        abrvs.append(self.setPropAbrv(None, prop))
+                    count += reindx(buid, abrvs, valu, stortype, self.byprop)
+
+                elif flag == 3:
+                    tag, prop = lkey[33:].decode().split(':')
+                    valu, stortype = s_msgpack.un(lval)
+                    abrvs = (self.setTagPropAbrv(None, tag, prop), self.setTagPropAbrv(form, tag, prop))
+                    count += reindx(buid, abrvs, valu, stortype, self.bytagprop)
+
+            await asyncio.sleep(0)
+
+        if count:
+            logger.warning(f'built z-order geo:latlong index for layer {self.iden}')
+
+        self.layrslab.put(b'zorderlatlong', s_common.int64en(1), db=self.countdb)
+
+    async def _initTrigramIndx(self):
+        '''
+        Build or remove trigram indexes to match the configured trigram props.
+        '''
+        self.trigramprops = set(self.layrinfo.get('trigrams', ()))
+
+        # full prop name -> abrv for each prop which has been indexed
+        self.trigramabrvs = {}
+        for lkey, abrv in self.layrslab.scanByFull(db=self.trigrammeta):
+            self.trigramabrvs[lkey.decode()] = abrv
+
+        if self.readonly:
+            self.trigramabrvs = {k: v for (k, v) in self.trigramabrvs.items() if k in self.trigramprops}
+            return
+
+        for full, abrv in list(self.trigramabrvs.items()):
+
+            if full in self.trigramprops:
+                continue
+
+            for lkey, buid in self.layrslab.scanByPref(abrv, db=self.bytrigram):
+                self.layrslab.delete(lkey, buid, db=self.bytrigram)
+                await asyncio.sleep(0)
+
+            self.layrslab.delete(full.encode(), db=self.trigrammeta)
+            self.trigramabrvs.pop(full)
+
+        if not self.trigramprops - set(self.trigramabrvs):
+            return
+
+        for byts, abrv in self.layrslab.scanByFull(db=self.propabrv.name2abrv):
+
+            form, prop = s_msgpack.un(byts)
+            if form is None:
+                continue
+
+            full = form if prop is None else f'{form}:{prop}'
+            if full not in self.trigramprops or full in self.trigramabrvs:
+                continue
+
+            for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
+
+                if prop is None:
+                    byts = self.layrslab.get(buid + b'\x00', db=self.bybuid)
+                    form, valu, stortype = s_msgpack.un(byts)
+                else:
+                    byts = self.layrslab.get(buid + b'\x01' + prop.encode(), db=self.bybuid)
+                    valu, stortype = s_msgpack.un(byts)
+
+                kvpairs = [(abrv + t, buid) for t in self._getStorTrigrams(stortype, valu)]
+                self.layrslab.putmulti(kvpairs, db=self.bytrigram)
+
+                await asyncio.sleep(0)
+
+            logger.warning(f'built trigram index for {full} in layer {self.iden}')
+
+            self._addTrigramAbrv(full, abrv)
+
+    def _addTrigramAbrv(self, full, abrv):
+        self.trigramabrvs[full] = abrv
+        self.layrslab.put(full.encode(), abrv, db=self.trigrammeta)
+
+    @s_cache.memoize()
+    def _getTrigramAbrv(self, form, prop):
+        '''
+        Return the prop abrv if the form/prop has a trigram index ( or None ).
+        '''
+        full = form if prop is None else f'{form}:{prop}'
+        if full not in self.trigramprops:
+            return None
+
+        abrv = self.trigramabrvs.get(full)
+        if abrv is None:
+            abrv = self.setPropAbrv(form, prop)
+            self._addTrigramAbrv(full, abrv)
+
+        return abrv
+
+    def _getStorTrigrams(self, stortype, valu):
+
+        realtype = stortype & 0x7fff
+        if realtype not in (STOR_TYPE_UTF8, STOR_TYPE_FQDN):
+            return ()
+
+        if not stortype & STOR_FLAG_ARRAY:
+            return getTrigrams(valu)
+
+        retn = set()
+        for aval in valu:
+            retn.update(getTrigrams(aval))
+
+        return retn
+
+    def _setTrigramIndx(self, buid, form, prop, stortype, valu):
+
+        if not self.trigramprops:
+            return
+
+        abrv = self._getTrigramAbrv(form, prop)
+        if abrv is None:
+            return
+
+        kvpairs = [(abrv + t, buid) for t in self._getStorTrigrams(stortype, valu)]
+        self.layrslab.putmulti(kvpairs, db=self.bytrigram)
+
+    def _delTrigramIndx(self, buid, form, prop, stortype, valu):
+
+        if not self.trigramprops:
+            return
+
+        abrv = self._getTrigramAbrv(form, prop)
+        if abrv is None:
+            return
+
+        for trigram in self._getStorTrigrams(stortype, valu):
+            self.layrslab.delete(abrv + trigram, buid, db=self.bytrigram)
+
+    def iterTrigramBuids(self, liftby, text):
+        '''
+        Return a generator of candidate buids for a regex lift using the trigram index ( or None ).
+        '''
+        if not self.trigramabrvs:
+            return None
+
+        if not isinstance(liftby, (IndxByForm, IndxByProp, IndxByPropArray)):
+            return None
+
+        if liftby.abrv not in self.trigramabrvs.values():
+            return None
+
+        trigrams = StorTypeUtf8.getRegxTrigrams(text)
+        if trigrams is None:
+            return None
+
+        return self._iterTrigramBuids(liftby.abrv, sorted(trigrams))
+
+    def _iterTrigramBuids(self, abrv, trigrams):
+
+        first, *others = trigrams
+
+        for _, buid in self.layrslab.scanByDups(abrv + first, db=self.bytrigram):
+            if all(self.layrslab.hasdup(abrv + t, buid, db=self.bytrigram) for t in others):
+                yield buid
+
+    async def setRefProps(self, refs):
+        '''
+        Set the props which reference forms and build or remove reference index rows to match.
+
+        Args:
+            refs (dict): A dict of (form, prop) tuples to the name of the referenced form.
+
+        Notes:
+            The reference index is keyed by the buid of the referenced node and the
+            abrv of the referencing prop so all references to a node are a prefix scan.
+        '''
+        refs = dict(refs)
+
+        built = {}
+        for lkey, lval in self.layrslab.scanByFull(db=self.refsmeta):
+            built[s_msgpack.un(lkey)] = s_msgpack.un(lval)
+
+        if self.readonly:
+            self.refprops = refs
+            self.hasrefindx = built == refs
+            return
+
+        self.hasrefindx = False
+
+        for (form, prop), reftype in built.items():
+
+            if refs.get((form, prop)) == reftype:
+                continue
+
+            async for abrv, buid, stortype, valu in self._iterRefPropRows(form, prop):
+                for lkey in self._getRefIndx(abrv, reftype, stortype, valu):
+                    self.layrslab.delete(lkey, buid, db=self.byref)
+
+            self.layrslab.delete(s_msgpack.en((form, prop)), db=self.refsmeta)
+
+        self.refprops = refs
+
+        count = 0
+        for (form, prop), reftype in refs.items():
+
+            if built.get((form, prop)) == reftype:
+                continue
+
+            async for abrv, buid, stortype, valu in self._iterRefPropRows(form, prop):
+                kvpairs = [(lkey, buid) for lkey in self._getRefIndx(abrv, reftype, stortype, valu)]
+                self.layrslab.putmulti(kvpairs, db=self.byref)
+                count += 1
+
+            self.layrslab.put(s_msgpack.en((form, prop)), s_msgpack.en(reftype), db=self.refsmeta)
+
+        if count:
+            logger.warning(f'built reference index for layer {self.iden}')
+
+        self.hasrefindx = True
+
+    async def _iterRefPropRows(self, form, prop):
+
+        try:
+            abrv = self.getPropAbrv(form, prop)
+        except s_exc.NoSuchAbrv:
+            return
+
+        penc = prop.encode()
+        for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
+
+            byts = self.layrslab.get(buid + b'\x01' + penc, db=self.bybuid)
+            if byts is None: # pragma: no cover
+                continue
+
+            valu, stortype = s_msgpack.un(byts)
+            yield abrv, buid, stortype, valu
+
+            await asyncio.sleep(0)
+
+    def _getRefIndx(self, abrv, reftype, stortype, valu):
+
+        if stortype & STOR_FLAG_ARRAY:
+            return set(s_common.buid((reftype, aval)) + abrv for aval in valu)
+
+        return (s_common.buid((reftype, valu)) + abrv,)
+
+    def _setRefIndx(self, buid, form, prop, abrv, stortype, valu):
+
+        reftype = self.refprops.get((form, prop))
+        if reftype is None:
+            return
+
+        kvpairs = [(lkey, buid) for lkey in self._getRefIndx(abrv, reftype, stortype, valu)]
+        self.layrslab.putmulti(kvpairs, db=self.byref)
+
+    def _delRefIndx(self, buid, form, prop, abrv, stortype, valu):
+
+        reftype = self.refprops.get((form, prop))
+        if reftype is None:
+            return
+
+        for lkey in self._getRefIndx(abrv, reftype, stortype, valu):
+            self.layrslab.delete(lkey, buid, db=self.byref)
+
+    async def liftByRefs(self, buid):
+        '''
+        Yield (prop, sode) tuples for nodes with a prop which references the node buid.
+        '''
+        rows = self.layrslab.scanByPref(buid, db=self.byref)
+        for abrv, items in itertools.groupby(rows, key=lambda x: x[0][32:]):
+
+            form, prop = self.getAbrvProp(abrv)
+
+            genr = (refbuid for (_, refbuid) in items)
+            async for sode in self._iterStorNodes(genr):
+                yield prop, sode
+
+    def _getTagIvalIndx(self, valu):
+        return self.stortypes[STOR_TYPE_IVAL].indx(valu)[0]
+
+    def _setTagIvalIndx(self, tagabrv, formabrv, buid, valu):
+        indx = self._getTagIvalIndx(valu)
+        # rows are stored for the form and for any form ( the (None, None) abrv )
+        self.layrslab.put(tagabrv + self.setPropAbrv(None, None) + indx, buid, db=self.bytagival)
+        self.layrslab.put(tagabrv + formabrv + indx, buid, db=self.bytagival)
+
+    def _delTagIvalIndx(self, tagabrv, formabrv, buid, valu):
+        indx = self._getTagIvalIndx(valu)
+        self.layrslab.delete(tagabrv + self.setPropAbrv(None, None) + indx, buid, db=self.bytagival)
+        self.layrslab.delete(tagabrv + formabrv + indx, buid, db=self.bytagival)
+
+    def _iterStorBuids(self):
+        last = None
+        for lkey in self.layrslab.scanKeys(db=self.bybuid):
+            buid = lkey[:32]
+            if buid != last:
+                last = buid
+                yield buid
+
+    async def rebuildBuidFilter(self):
+        '''
+        Size and populate the buid membership filter from the existing storage rows.
+
+        This runs at startup for layers without a filter or with a saturated filter.
+        '''
+        count = 0
+        for _ in self._iterStorBuids():
+            count += 1
+            await asyncio.sleep(0)
+
+        self.buidfilt.reset(count)
+
+        for buid in self._iterStorBuids():
+            self.buidfilt.add(buid)
+            await asyncio.sleep(0)
+
+        self.buidfilt.setReady()
+
+        if count:
+            logger.warning(f'built buid filter for layer {self.iden} ({count} nodes)')
+
     def getSpawnInfo(self):
         info = self.pack()
         info['dirn'] = self.dirn
@@ -1271,38 +1984,100 @@ class Layer(s_nexus.Pusher):
         info = collections.defaultdict(dict)
         self.buidcache[buid] = info
 
+        if not self.buidfilt.has(buid):
+            return (buid, info)
+
         for lkey, lval in self.layrslab.scanByPref(buid, db=self.bybuid):
+            self._addStorRow(info, lkey, lval)
 
-            flag = lkey[32]
+        return (buid, info)
 
-            if flag == 0:
-                form, valu, stortype = s_msgpack.un(lval)
-                info['ndef'] = (form, valu)
-                continue
+    async def getStorNodes(self, buids):
+        '''
+        Return a list of potentially incomplete podes for the given buids ( in the same order ).
 
-            if flag == 1:
-                name = lkey[33:].decode()
-                valu, stortype = s_msgpack.un(lval)
-                info['props'][name] = valu
-                continue
+        Buids which are not cached are loaded in sorted order using a single cursor.
+        '''
+        todo = []
+        infos = {}
 
-            if flag == 2:
-                name = lkey[33:].decode()
-                info['tags'][name] = s_msgpack.un(lval)
-                continue
+        for buid in buids:
 
-            if flag == 3:
-                tag, prop = lkey[33:].decode().split(':')
-                valu, stortype = s_msgpack.un(lval)
-                info['tagprops'][(tag, prop)] = valu
+            if buid in infos:
                 continue
 
-            if flag == 9:
+            info = self.buidcache.get(buid)
+            if info is None:
+                info = collections.defaultdict(dict)
+                self.buidcache[buid] = info
+                if self.buidfilt.has(buid):
+                    todo.append(buid)
+
+            infos[buid] = info
+
+        todo.sort()
+        for buid, lkey, lval in self.layrslab.scanByPrefs(todo, db=self.bybuid):
+            self._addStorRow(infos[buid], lkey, lval)
+
+        return [(buid, infos[buid]) for buid in buids]
+
+    def _addStorRow(self, info, lkey, lval):
+
+        flag = lkey[32]
+
+        if flag == 0:
+            form, valu, stortype = s_msgpack.un(lval)
+            info['ndef'] = (form, valu)
+            return
+
+        if flag == 1:
+            name = lkey[33:].decode()
+            valu, stortype = s_msgpack.un(lval)
+            info['props'][name] = valu
+            return
+
+        if flag == 2:
+            name = lkey[33:].decode()
+            info['tags'][name] = s_msgpack.un(lval)
+            return
+
+        if flag == 3:
+            tag, prop = lkey[33:].decode().split(':')
+            valu, stortype = s_msgpack.un(lval)
+            info['tagprops'][(tag, prop)] = valu
+            return
+
+        if flag == 9:
+            return
+
+        logger.warning(f'unrecognized storage row: {s_common.ehex(lkey[:32])}:{flag}')
+
+    async def _iterStorNodes(self, buids):
+        '''
+        Yield storage nodes for a generator of buids, loading them in windows.
+
+        Notes:
+            Windows start small and double up to STOR_NODE_WINDOW so lifts
+            which are only partially consumed do not load rows they never use.
+        '''
+        size = STOR_NODE_WINDOW_MIN
+
+        window = []
+        async for buid in s_coro.agen(buids):
+
+            window.append(buid)
+            if len(window) < size:
                 continue
 
-            logger.warning(f'unrecognized storage row: {s_common.ehex(buid)}:{flag}')
+            for sode in await self.getStorNodes(window):
+                yield sode
 
-        return (buid, info)
+            window = []
+            size = min(size * 2, STOR_NODE_WINDOW)
+
+        if window:
+            for sode in await self.getStorNodes(window):
+                yield sode
 
     async def getTagCount(self, tagname, formname=None):
         '''
@@ -1316,6 +2091,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return 0
 
+        if self.hasindxcounts:
+            return self.tagcounts.get(s_common.ehex(abrv))
+
         return await self.layrslab.countByPref(abrv, db=self.bytag)
 
     async def getPropCount(self, formname, propname=None):
@@ -1327,6 +2105,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return 0
 
+        if self.hasindxcounts:
+            return self.propcounts.get(s_common.ehex(abrv))
+
         return await self.layrslab.countByPref(abrv, db=self.byprop)
 
     async def liftByTag(self, tag, form=None):
@@ -1339,8 +2120,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
-            yield await self.getStorNode(buid)
+        genr = (buid for (_, buid) in self.layrslab.scanByPref(abrv, db=self.bytag))
+        async for sode in self._iterStorNodes(genr):
+            yield sode
 
     async def liftByTagValu(self, tag, cmpr, valu, form=None):
 
@@ -1356,11 +2138,45 @@ class Layer(s_nexus.Pusher):
         if filt is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr)
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
-            # filter based on the ival value before lifting the node...
-            valu = await self.getNodeTag(buid, tag)
-            if filt(valu):
-                yield await self.getStorNode(buid)
+        if self.hastagivals and valu != (None, None):
+            async for sode in self._liftByTagIval(tag, cmpr, valu, form=form):
+                yield sode
+            return
+
+        async def genr():
+            for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
+                # filter based on the ival value before lifting the node...
+                valu = await self.getNodeTag(buid, tag)
+                if filt(valu):
+                    yield buid
+
+        async for sode in self._iterStorNodes(genr()):
+            yield sode
+
+    async def _liftByTagIval(self, tag, cmpr, valu, form=None):
+
+        try:
+            abrv = self.tagabrv.bytsToAbrv(tag.encode())
+            abrv += self.getPropAbrv(form, None)
+
+        except s_exc.NoSuchAbrv:
+            return
+
+        if cmpr == '=':
+            indx = self._getTagIvalIndx(valu)
+            genr = (buid for (_, buid) in self.layrslab.scanByDups(abrv + indx, db=self.bytagival))
+
+        else:
+            timetype = self.stortypes[STOR_TYPE_IVAL].timetype
+            minindx = timetype.getIntIndx(valu[0])
+            maxindx = timetype.getIntIndx(valu[1] - 1)
+
+            # rows are ordered by min time so only ivals which start before the max are scanned
+            genr = (buid for (lkey, buid) in self.layrslab.scanByRange(abrv, abrv + maxindx, db=self.bytagival)
+                    if lkey[-8:] > minindx)
+
+        async for sode in self._iterStorNodes(genr):
+            yield sode
 
     async def hasTagProp(self, name):
         async for _ in self.liftTagProp(name):
@@ -1387,14 +2203,15 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytagprop):
-            yield await self.getStorNode(buid)
+        genr = (buid for (_, buid) in self.layrslab.scanByPref(abrv, db=self.bytagprop))
+        async for sode in self._iterStorNodes(genr):
+            yield sode
 
     async def liftByTagPropValu(self, form, tag, prop, cmprvals):
         for cmpr, valu, kind in cmprvals:
-
-            async for buid in self.stortypes[kind].indxByTagProp(form, tag, prop, cmpr, valu):
-                yield await self.getStorNode(buid)
+            genr = self.stortypes[kind].indxByTagProp(form, tag, prop, cmpr, valu)
+            async for sode in self._iterStorNodes(genr):
+                yield sode
 
     async def liftByProp(self, form, prop):
         try:
@@ -1403,26 +2220,84 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
-            yield await self.getStorNode(buid)
+        genr = (buid for (_, buid) in self.layrslab.scanByPref(abrv, db=self.byprop))
+        async for sode in self._iterStorNodes(genr):
+            yield sode
 
     # NOTE: form vs prop valu lifting is differentiated to allow merge sort
     async def liftByFormValu(self, form, cmprvals):
         for cmpr, valu, kind in cmprvals:
-            async for buid in self.stortypes[kind].indxByForm(form, cmpr, valu):
-                yield await self.getStorNode(buid)
+            genr = self.stortypes[kind].indxByForm(form, cmpr, valu)
+            async for sode in self._iterStorNodes(genr):
+                yield sode
 
     async def liftByPropValu(self, form, prop, cmprvals):
         for cmpr, valu, kind in cmprvals:
             if kind & 0x8000:
                 kind = STOR_TYPE_MSGP
-            async for buid in self.stortypes[kind].indxByProp(form, prop, cmpr, valu):
-                yield await self.getStorNode(buid)
+            genr = self.stortypes[kind].indxByProp(form, prop, cmpr, valu)
+            async for sode in self._iterStorNodes(genr):
+                yield sode
+
+    async def liftByPropValus(self, form, prop, valus, kind):
+        '''
+        Lift nodes whose form (prop=None) or prop equals any of a batch of normalized values.
+
+        Notes:
+            The values are deduplicated and sorted by their index bytes so the
+            batch is lifted in index order using a single cursor.
+        '''
+        try:
+            abrv = self.getPropAbrv(form, prop)
+
+        except s_exc.NoSuchAbrv:
+            return
+
+        if kind & 0x8000:
+            kind = STOR_TYPE_MSGP
+
+        stortype = self.stortypes[kind]
+        lkeys = sorted({abrv + stortype.indx(valu)[0] for valu in valus})
+
+        genr = (buid for (_, buid) in self.layrslab.scanByDupsList(lkeys, db=self.byprop))
+        async for sode in self._iterStorNodes(genr):
+            yield sode
+
+    async def getPropValuCount(self, form, prop, kind, valu, maxsize=None):
+        '''
+        Return the number of nodes in the layer whose form (prop=None) or prop equals a normalized value.
+
+        Args:
+            maxsize (int): Stop counting once this many rows have been found.
+        '''
+        try:
+            abrv = self.getPropAbrv(form, prop)
+
+        except s_exc.NoSuchAbrv:
+            return 0
+
+        if kind & 0x8000:
+            kind = STOR_TYPE_MSGP
+
+        lkey = abrv + self.stortypes[kind].indx(valu)[0]
+
+        count = 0
+        for _ in self.layrslab.scanByDups(lkey, db=self.byprop):
+
+            count += 1
+            if maxsize is not None and count >= maxsize:
+                break
+
+            if count % 1000 == 0:
+                await asyncio.sleep(0)
+
+        return count
 
     async def liftByPropArray(self, form, prop, cmprvals):
         for cmpr, valu, kind in cmprvals:
-            async for buid in self.stortypes[kind].indxByPropArray(form, prop, cmpr, valu):
-                yield await self.getStorNode(buid)
+            genr = self.stortypes[kind].indxByPropArray(form, prop, cmpr, valu)
+            async for sode in self._iterStorNodes(genr):
+                yield sode
 
     async def liftByDataName(self, name):
         try:
@@ -1431,11 +2306,10 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for abrv, buid in self.dataslab.scanByDups(abrv, db=self.dataname):
+        genr = (buid for (_, buid) in self.dataslab.scanByDups(abrv, db=self.dataname))
+        async for sode in self._iterStorNodes(genr):
 
-            sode = await self.getStorNode(buid)
-
-            byts = self.dataslab.get(buid + abrv, db=self.nodedata)
+            byts = self.dataslab.get(sode[0] + abrv, db=self.nodedata)
             if byts is not None:
                 item = s_msgpack.un(byts)
                 sode[1]['nodedata'] = {name: item}
@@ -1446,9 +2320,10 @@ class Layer(s_nexus.Pusher):
 
         results = await self._push('edits', nodeedits, meta)
 
+        sodes = await self.getStorNodes([r[0] for r in results])
+
         retn = []
-        for buid, form, edits in results:
-            sode = await self.getStorNode(buid)
+        for (buid, form, edits), sode in zip(results, sodes):
             sode[1]['edits'] = edits
             sode[1]['form'] = form
             retn.append(sode)
@@ -1508,6 +2383,8 @@ class Layer(s_nexus.Pusher):
             postedits.extend(changes)
 
             if changes:
+                self.buidfilt.add(buid)
+
                 if any((c[0] == EDIT_NODE_ADD for c in changes)):
                     if sode is not None:
                         sode['ndef'] = (form, edit[1][0])
@@ -1577,7 +2454,10 @@ class Layer(s_nexus.Pusher):
             for indx in self.getStorIndx(stortype, valu):
                 self.layrslab.put(abrv + indx, buid, db=self.byprop)
 
+        self._setTrigramIndx(buid, form, None, stortype, valu)
+
         self.formcounts.inc(form)
+        self.propcounts.inc(s_common.ehex(abrv))
 
         retn = [(EDIT_NODE_ADD, (valu, stortype), ())]
 
@@ -1593,25 +2473,33 @@ class Layer(s_nexus.Pusher):
 
         abrv = self.setPropAbrv(form, None)
 
+        # index rows are deleted in key order
         if stortype & STOR_FLAG_ARRAY:
 
-            for indx in self.getStorIndx(stortype, valu):
+            for indx in sorted(self.getStorIndx(stortype, valu)):
                 self.layrslab.delete(abrv + indx, buid, db=self.byarray)
 
-            for indx in self.getStorIndx(STOR_TYPE_MSGP, valu):
+            for indx in sorted(self.getStorIndx(STOR_TYPE_MSGP, valu)):
                 self.layrslab.delete(abrv + indx, buid, db=self.byprop)
 
         else:
 
-            for indx in self.getStorIndx(stortype, valu):
+            for indx in sorted(self.getStorIndx(stortype, valu)):
                 self.layrslab.delete(abrv + indx, buid, db=self.byprop)
 
+        self._delTrigramIndx(buid, form, None, stortype, valu)
+
         self.formcounts.inc(form, valu=-1)
+        self.propcounts.inc(s_common.ehex(abrv), valu=-1)
 
         self._wipeNodeData(buid)
         # TODO edits to become async so we can sleep(0) on large deletes?
         self._delNodeEdges(buid)
 
+        # sodes may have been loaded ahead of time by a windowed lift
+        if sode is not None:
+            sode.pop('ndef', None)
+
         self.buidcache.pop(buid, None)
 
         return (
@@ -1678,10 +2566,20 @@ class Layer(s_nexus.Pusher):
                     if univabrv is not None:
                         self.layrslab.delete(univabrv + oldi, buid, db=self.byprop)
 
+            self._delTrigramIndx(buid, form, prop, oldt, oldv)
+            self._delRefIndx(buid, form, prop, abrv, oldt, oldv)
+
         else:
             fenc = form.encode()
             self.layrslab.put(buid + b'\x09', fenc, db=self.bybuid, overwrite=False)
 
+            self.propcounts.inc(s_common.ehex(abrv))
+            if univabrv is not None:
+                self.propcounts.inc(s_common.ehex(univabrv))
+
+        self._setTrigramIndx(buid, form, prop, stortype, valu)
+        self._setRefIndx(buid, form, prop, abrv, stortype, valu)
+
         if stortype & STOR_FLAG_ARRAY:
 
             for indx in self.getStorIndx(stortype, valu):
@@ -1749,6 +2647,13 @@ class Layer(s_nexus.Pusher):
                 if univabrv is not None:
                     self.layrslab.delete(univabrv + indx, buid, db=self.byprop)
 
+        self._delTrigramIndx(buid, form, prop, stortype, valu)
+        self._delRefIndx(buid, form, prop, abrv, stortype, valu)
+
+        self.propcounts.inc(s_common.ehex(abrv), valu=-1)
+        if univabrv is not None:
+            self.propcounts.inc(s_common.ehex(univabrv), valu=-1)
+
         if sode is not None:
             sode['props'].pop(prop, None)
 
@@ -1785,12 +2690,21 @@ class Layer(s_nexus.Pusher):
             if oldv == valu:
                 return ()
 
+            if oldv != (None, None):
+                self._delTagIvalIndx(tagabrv, formabrv, buid, oldv)
+
         else:
             fenc = form.encode()
             self.layrslab.put(buid + b'\x09', fenc, db=self.bybuid, overwrite=False)
 
+            self.tagcounts.inc(s_common.ehex(tagabrv))
+            self.tagcounts.inc(s_common.ehex(tagabrv + formabrv))
+
         self.layrslab.put(tagabrv + formabrv, buid, db=self.bytag)
 
+        if valu != (None, None):
+            self._setTagIvalIndx(tagabrv, formabrv, buid, valu)
+
         if sode is not None:
             sode['tags'][tag] = valu
 
@@ -1814,7 +2728,12 @@ class Layer(s_nexus.Pusher):
 
         self.layrslab.delete(tagabrv + formabrv, buid, db=self.bytag)
 
+        self.tagcounts.inc(s_common.ehex(tagabrv), valu=-1)
+        self.tagcounts.inc(s_common.ehex(tagabrv + formabrv), valu=-1)
+
         oldv = s_msgpack.un(oldb)
+        if oldv != (None, None):
+            self._delTagIvalIndx(tagabrv, formabrv, buid, oldv)
 
         if sode is not None:
             sode['tags'].pop(tag, None)
@@ -267,6 +267,155 @@ class HotCount(HotKeyVal):
     def get(self, name: str, defv=0):
         return self.cache.get(name.encode(), defv)
 
+class HotBloom(s_base.Base):
+    '''
+    A hot-loop capable blocked Bloom filter that syncs within each slab commit.
+
+    Notes:
+        Key bytes are used directly as hash values, so keys must already be
+        uniformly distributed and at least 22 bytes long ( such as buids ).
+
+        Until the filter has been populated and marked ready, has() always returns True.
+
+        A filter in a read-only slab is never ready, since the slab may be
+        written by another process which adds keys the filter will not see.
+    '''
+    blocksize = 64      # bytes per block ( a single cache line )
+    pagesize = 4096     # bytes per persisted page
+    keybits = 7         # bits set per key
+    bitsperkey = 10     # roughly a 1% false positive rate
+
+    async def __anit__(self, slab, name):
+        await s_base.Base.__anit__(self)
+
+        self.slab = slab
+        self.db = self.slab.initdb(name)
+
+        self.dirty = set()
+        self.byts = bytearray()
+
+        self.size = 0
+        self.adds = 0
+        self.mask = 0
+        self.ready = False
+
+        # the size is only stored once the filter has been fully populated
+        byts = self.slab.get(b'size', db=self.db)
+        if byts is not None and not self.slab.readonly:
+            self._setSize(s_common.int64un(byts))
+            self.adds = s_common.int64un(self.slab.get(b'adds', db=self.db))
+            self.ready = True
+
+            for lkey, lval in self.slab.scanByPref(b'page:', db=self.db):
+                offs = s_common.int64un(lkey[5:]) * self.pagesize
+                self.byts[offs:offs + len(lval)] = lval
+
+        # the pages are written by every commit so they never lag the rows they cover
+        slab.precommits.append(self.sync)
+
+        async def fini():
+            self.sync()
+            slab.precommits.remove(self.sync)
+
+        self.onfini(fini)
+
+    def _setSize(self, size):
+        self.size = size
+        self.mask = size - 1
+        self.byts = bytearray(size * self.blocksize)
+
+    def isready(self):
+        '''
+        Return True if the filter has been populated and may be used to exclude keys.
+        '''
+        return self.ready
+
+    def isfull(self):
+        '''
+        Return True if more keys have been added than the filter was sized for.
+        '''
+        return self.adds * self.bitsperkey > self.size * self.blocksize * 8
+
+    def reset(self, count):
+        '''
+        Clear the filter and size it to hold the given number of keys.
+
+        Notes:
+            The filter will not exclude keys until setReady() is called.
+        '''
+        bits = max(count, 1) * self.bitsperkey
+        size = self.pagesize // self.blocksize
+        while size * self.blocksize * 8 < bits:
+            size *= 2
+
+        self._setSize(size)
+
+        self.adds = 0
+        self.ready = False
+
+        self.slab.delete(b'size', db=self.db)
+        self.dirty.update(range(len(self.byts) // self.pagesize))
+
+    def setReady(self):
+        '''
+        Mark the filter as fully populated and persist it.
+        '''
+        self.ready = True
+        self.slab.put(b'size', s_common.int64en(self.size), db=self.db)
+        self.sync()
+
+    def _getBits(self, key):
+        offs = (int.from_bytes(key[:8], 'big') & self.mask) * self.blocksize
+        for i in range(8, 8 + self.keybits * 2, 2):
+            bit = ((key[i] << 8) | key[i + 1]) & 511
+            yield offs + (bit >> 3), 1 << (bit & 7)
+
+    def add(self, key):
+        '''
+        Add a key to the filter.
+        '''
+        if not self.size:
+            return
+
+        bits = [(offs, mask) for (offs, mask) in self._getBits(key) if not self.byts[offs] & mask]
+        if not bits:
+            return
+
+        for offs, mask in bits:
+            self.byts[offs] |= mask
+
+        self.adds += 1
+        self.dirty.add(offs // self.pagesize)
+
+    def has(self, key):
+        '''
+        Return False if the key was definitely never added to the filter.
+        '''
+        if not self.ready:
+            return True
+
+        for offs, mask in self._getBits(key):
+            if not self.byts[offs] & mask:
+                return False
+
+        return True
+
+    def sync(self):
+
+        if not self.dirty:
+            return
+
+        tups = []
+        for page in self.dirty:
+            offs = page * self.pagesize
+            tups.append((b'page:' + s_common.int64en(page), bytes(self.byts[offs:offs + self.pagesize])))
+
+        tups.append((b'adds', s_common.int64en(self.adds)))
+
+        # clear first since the put may recover from a full map by committing
+        self.dirty.clear()
+        self.slab.putmulti(tups, db=self.db)
+
 class MultiQueue(s_base.Base):
     '''
     Allows creation/consumption of multiple durable queues in a slab.
@@ -658,6 +807,9 @@ class Slab(s_base.Base):
 
         # save the transaction deltas in case of error...
         self.xactops = []
+
+        # functions which write pending rows ( such as HotBloom pages ) before each commit
+        self.precommits = []
         self.max_xactops_len = opts.pop('max_replay_log', 10000)
         self.recovering = False
 
@@ -738,6 +890,11 @@ class Slab(s_base.Base):
         self.onfini(item)
         return item
 
+    async def getHotBloom(self, name):
+        item = await HotBloom.anit(self, name)
+        self.onfini(item)
+        return item
+
     def getSeqn(self, name):
         return s_slabseqn.SlabSeqn(self, name)
 
@@ -829,6 +986,8 @@ class Slab(s_base.Base):
         if self.xact is None:
             return
 
+        [func() for func in list(self.precommits)]
+
         self.xact.commit()
 
         self.xactops.clear()
@@ -1143,6 +1302,31 @@ class Slab(s_base.Base):
 
                 yield item
 
+    def scanByDupsList(self, lkeys, db=None):
+        '''
+        Yield (lkey, lval) tuples for each of the given keys using a single cursor.
+
+        Notes:
+            The keys must be provided in ascending byte order.
+        '''
+        with Scan(self, db) as scan:
+
+            for lkey in lkeys:
+
+                if scan.bumped:
+                    scan.bumped = False
+                    scan.curs = self.xact.cursor(db=scan.db)
+
+                if not scan.set_key(lkey):
+                    continue
+
+                for item in scan.iternext():
+
+                    if item[0] != lkey:
+                        break
+
+                    yield item
+
     def scanByDupsBack(self, lkey, db=None):
 
         with ScanBack(self, db) as scan:
@@ -1172,6 +1356,32 @@ class Slab(s_base.Base):
 
                 yield lkey, lval
 
+    def scanByPrefs(self, prefs, db=None):
+        '''
+        Yield (pref, lkey, lval) tuples for each of the given prefixes using a single cursor.
+
+        Notes:
+            The prefixes must be provided in ascending byte order.
+        '''
+        with Scan(self, db) as scan:
+
+            for pref in prefs:
+
+                if scan.bumped:
+                    scan.bumped = False
+                    scan.curs = self.xact.cursor(db=scan.db)
+
+                if not scan.set_range(pref):
+                    return
+
+                size = len(pref)
+                for lkey, lval in scan.iternext():
+
+                    if lkey[:size] != pref:
+                        break
+
+                    yield pref, lkey, lval
+
     def scanByPrefBack(self, byts, db=None):
 
         with ScanBack(self, db) as scan:
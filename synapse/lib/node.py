@@ -56,7 +56,7 @@ class Node:
                 (s_layer.EDIT_EDGE_ADD, (verb, n2iden), ()),
             )),
         )
-        await self.snap.applyNodeEdits(nodeedits)
+        await self.snap.saveNodeEdits(nodeedits)
 
     async def delEdge(self, verb, n2iden):
         nodeedits = (
@@ -64,7 +64,7 @@ class Node:
                 (s_layer.EDIT_EDGE_DEL, (verb, n2iden), ()),
             )),
         )
-        await self.snap.applyNodeEdits(nodeedits)
+        await self.snap.saveNodeEdits(nodeedits)
 
     async def iterEdgesN1(self, verb=None):
         async for edge in self.snap.iterNodeEdgesN1(self.buid, verb=verb):
@@ -257,7 +257,7 @@ class Node:
         props = {prop.name: norm}
         nodeedits = await self.snap.getNodeAdds(self.form, self.ndef[1], props, addnode=False)
 
-        await self.snap.applyNodeEdits(nodeedits)
+        await self.snap.saveNodeEdits(nodeedits)
 
         return True
 
@@ -311,7 +311,7 @@ class Node:
             (s_layer.EDIT_PROP_DEL, (prop.name, None, prop.type.stortype), ()),
         )
 
-        await self.snap.applyNodeEdit((self.buid, self.form.name, edits))
+        await self.snap.saveNodeEdits(((self.buid, self.form.name, edits),))
 
     def repr(self, name=None, defv=None):
 
@@ -460,7 +460,7 @@ class Node:
 
         nodeedit = (self.buid, self.form.name, edits)
 
-        await self.snap.applyNodeEdit(nodeedit)
+        await self.snap.saveNodeEdits((nodeedit,))
 
     async def delTag(self, tag, init=False):
         '''
@@ -496,7 +496,102 @@ class Node:
 
         nodeedit = (self.buid, self.form.name, edits)
 
-        await self.snap.applyNodeEdit(nodeedit)
+        await self.snap.saveNodeEdits((nodeedit,))
+
+    async def getRetagEdits(self, retag):
+        '''
+        Return the list of edits which move tags (and their tag props) to new names.
+
+        Args:
+            retag (dict): A dictionary of old tag names to new tag names.
+
+        Notes:
+            The edits are equivalent to calling delTag(), addTag(), and
+            setTagProp() for each moved tag, deepest tags first.
+        '''
+        tags = dict(self.tags)
+        tagprops = dict(self.tagprops)
+
+        edits = []
+
+        def deltag(name):
+
+            if name not in tags:
+                return
+
+            pref = name + '.'
+            subtags = [(len(t), t) for t in tags.keys() if t.startswith(pref)]
+            subtags.sort(reverse=True)
+
+            for _, tag in subtags + [(len(name), name)]:
+
+                for (tagn, prop) in [k for k in tagprops.keys() if k[0] == tag]:
+                    tprop = self.snap.core.model.getTagProp(prop)
+                    if tprop is None: # pragma: no cover
+                        logger.warn(f'Cant delete tag prop ({prop}) without model prop!')
+                        continue
+
+                    tagprops.pop((tagn, prop))
+                    edits.append((s_layer.EDIT_TAGPROP_DEL, (tag, prop, None, tprop.type.stortype), ()))
+
+                tags.pop(tag)
+                edits.append((s_layer.EDIT_TAG_DEL, (tag, None), ()))
+
+        async def addtag(name, valu):
+
+            tagnode = await self.snap.addTagNode(name)
+
+            isnow = tagnode.get('isnow')
+            if isnow:
+                await self.snap.warn(f'tag {name} is now {isnow}')
+                name = isnow
+
+            curv = tags.get(name)
+            if curv == valu:
+                return name
+
+            if curv is None:
+
+                for tag in s_chop.tags(name)[:-1]:
+
+                    if tags.get(tag) is not None:
+                        continue
+
+                    await self.snap.addTagNode(tag)
+
+                    tags[tag] = (None, None)
+                    edits.append((s_layer.EDIT_TAG_SET, (tag, (None, None), None), ()))
+
+            else:
+                valu = s_time.ival(*valu, *curv)
+
+            if valu != curv:
+                tags[name] = valu
+                edits.append((s_layer.EDIT_TAG_SET, (name, valu, None), ()))
+
+            return name
+
+        for name, valu in sorted(self.tags.items(), reverse=True):
+
+            newt = retag.get(name)
+            if newt is None:
+                continue
+
+            tgfo = [(prop, tagprops[(tagn, prop)]) for (tagn, prop) in tagprops.keys() if tagn == name]
+
+            deltag(name)
+            newt = await addtag(newt, valu)
+
+            for prop, pval in tgfo:
+
+                tprop = self.snap.core.model.getTagProp(prop)
+                if tprop is None: # pragma: no cover
+                    continue
+
+                tagprops[(newt, prop)] = pval
+                edits.append((s_layer.EDIT_TAGPROP_SET, (newt, prop, pval, None, tprop.type.stortype), ()))
+
+        return edits
 
     def _getTagPropDel(self, tag):
 
@@ -552,7 +647,7 @@ class Node:
             (s_layer.EDIT_TAGPROP_SET, (tag, name, norm, None, prop.type.stortype), ()),
         )
 
-        await self.snap.applyNodeEdit((self.buid, self.form.name, edits))
+        await self.snap.saveNodeEdits(((self.buid, self.form.name, edits),))
 
         self.tagprops[tagkey] = norm
 
@@ -570,7 +665,7 @@ class Node:
             (s_layer.EDIT_TAGPROP_DEL, (tag, name, None, prop.type.stortype), ()),
         )
 
-        await self.snap.applyNodeEdit((self.buid, self.form.name, edits))
+        await self.snap.saveNodeEdits(((self.buid, self.form.name, edits),))
 
     async def delete(self, force=False):
         '''
@@ -640,6 +735,32 @@ class Node:
 
         self.snap.livenodes.pop(self.buid, None)
 
+    def getDelEdits(self):
+        '''
+        Return the list of edits which remove the tags, properties, and primary property of the node.
+
+        Notes:
+            This does not check permissions or references to the node.
+        '''
+        edits = []
+
+        for _, tag in sorted([(len(t), t) for t in self.tags.keys()], reverse=True):
+            edits.extend(self._getTagPropDel(tag))
+            edits.append((s_layer.EDIT_TAG_DEL, (tag, None), ()))
+
+        for name in self.props.keys():
+
+            prop = self.form.prop(name)
+            if prop is None: # pragma: no cover
+                logger.warning(f'Cant delete prop ({name}) without model prop!')
+                continue
+
+            edits.append((s_layer.EDIT_PROP_DEL, (prop.name, None, prop.type.stortype), ()))
+
+        edits.append((s_layer.EDIT_NODE_DEL, (self.ndef[1], self.form.type.stortype), ()))
+
+        return edits
+
     async def getData(self, name):
         valu = self.nodedata.get(name, s_common.novalu)
         if valu is not s_common.novalu:
@@ -784,6 +905,43 @@ class Path:
 
         (self.vars, self.runt) = self.frames.pop()
 
+class LitePath(Path):
+    '''
+    A path which shares the variables of its runtime and does not track the nodes it traversed.
+
+    Notes:
+        This is used by the storm runtime for top level queries which never observe
+        path state ( variables, $path, path tracking, or graph metadata ).
+    '''
+    traces = ()
+    frames = ()
+
+    def __init__(self, runt, vars, node):
+        self.node = node
+        self.runt = runt
+        self.snap = runt.snap
+        self.model = runt.model
+        self.vars = vars
+        self.metadata = {}
+
+    @property
+    def nodes(self):
+        return [self.node]
+
+    @property
+    def builtins(self):
+        return {'path': self, 'node': self.node}
+
+    @property
+    def ctors(self):
+        return {}
+
+    def fork(self, node):
+        return LitePath(self.runt, self.vars, node)
+
+    def clone(self):
+        return LitePath(self.runt, self.vars, self.node)
+
 class Trace:
     '''
     A trace for pivots taken and nodes involved from a given path's subsequent forks.
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import heapq
 import types
 import asyncio
 import logging
 import weakref
+import itertools
 import contextlib
 import collections
 
@@ -21,6 +23,104 @@ import synapse.lib.spooled as s_spooled
 
 logger = logging.getLogger(__name__)
 
+def getNodeAdds(model, form, valu, props, addnode=True):
+    '''
+    Return the node edits to add a node ( and the nodes it refers to ) using a data model.
+
+    Args:
+        model (s_datamodel.Model): The data model used to normalize values.
+        form (s_datamodel.Form): The form of the node.
+        valu (obj): The primary property value of the node.
+        props (dict): Optional secondary properties for the node.
+        addnode (bool): Set to False to omit the edit which adds the node itself.
+
+    Notes:
+        This only requires the data model, which allows node edits to be
+        computed outside of the Cortex process.
+
+    Returns:
+        (list): A list of node edits.
+    '''
+    def _getadds(f, p, formnorm, forminfo, doaddnode=True):
+
+        edits = []  # Non-primary prop edits
+        topsubedits = []  # Primary prop sub edits
+
+        addplan = f.getAddPlan()
+
+        formsubs = forminfo.get('subs', {})
+        for subname, subvalu in formsubs.items():
+            p[subname] = subvalu
+
+        for propname, propvalu in p.items():
+
+            propplan = addplan.get(propname)
+            if propplan is None:
+                continue
+
+            proptype, stortype, isndef, arrayform, propform, subprops = propplan
+
+            subedits: s_layer.NodeEditsT = []
+
+            if isndef:
+                ndefname, ndefvalu = propvalu
+                ndefform = model.form(ndefname)
+                if ndefform is None:
+                    raise s_exc.NoSuchForm(name=ndefname)
+
+                ndefnorm, ndefinfo = ndefform.type.norm(ndefvalu)
+                subedits.extend(_getadds(ndefform, {}, ndefnorm, ndefinfo))
+
+            elif arrayform is not None:
+                for arrayvalu in propvalu:
+                    arraynorm, arrayinfo = arrayform.type.norm(arrayvalu)
+                    subedits.extend(_getadds(arrayform, {}, arraynorm, arrayinfo))
+
+            propnorm, typeinfo = proptype.norm(propvalu)
+
+            if subprops:
+                propsubs = typeinfo.get('subs')
+                if propsubs is not None:
+                    for subname, subvalu in propsubs.items():
+
+                        subplan = subprops.get(subname)
+                        if subplan is None:
+                            continue
+
+                        subprop, subtype, substor = subplan
+                        subnorm, subinfo = subtype.norm(subvalu)
+
+                        edits.append((s_layer.EDIT_PROP_SET, (subprop, subnorm, None, substor), ()))
+
+            if propform is not None:
+                subedits.extend(_getadds(propform, {}, propnorm, typeinfo))
+
+            edit: s_layer.EditT = (s_layer.EDIT_PROP_SET, (propname, propnorm, None, stortype), subedits)
+            if propname in formsubs:
+                topsubedits.append(edit)
+            else:
+                edits.append(edit)
+
+        buid = s_common.buid((f.name, formnorm))
+
+        if doaddnode:
+            # Make all the sub edits for the primary property a conditional nodeEdit under a top-level NODE_ADD
+            # edit
+            if topsubedits:
+                subnodeedits: s_layer.NodeEditsT = [(buid, f.name, topsubedits)]
+            else:
+                subnodeedits = ()
+            topedit: s_layer.EditT = (s_layer.EDIT_NODE_ADD, (formnorm, f.type.stortype), subnodeedits)
+            return [(buid, f.name, [topedit] + edits)]
+
+        return [(buid, f.name, edits)]
+
+    if props is None:
+        props = {}
+
+    norm, info = form.type.norm(valu)
+    return _getadds(form, props, norm, info, doaddnode=addnode)
+
 class Snap(s_base.Base):
     '''
     A "snapshot" is a transaction across multiple Cortex layers.
@@ -78,6 +178,12 @@ class Snap(s_base.Base):
         self.buidcache = collections.deque(maxlen=self._buidcachesize)
         self.livenodes = weakref.WeakValueDictionary()  # buid -> Node
 
+        # incremented for each set of node edits applied by this snap
+        self.editseqn = 0
+
+        # task -> {buid: (form, edits)} for tasks which are buffering node edits
+        self.editbufs = {}
+
         self.onfini(self.stack.close)
         self.changelog = []
         self.tagtype = self.core.model.type('ival')
@@ -146,10 +252,24 @@ class Snap(s_base.Base):
         mode = opts.get('mode', 'storm')
 
         query = self.core.getStormQuery(text, mode=mode)
+
+        # explain the planned operators without running the query
+        if opts.get('explain'):
+            for line in query.getPlanLines():
+                await self.printf(line)
+            return
+
         with self.getStormRuntime(opts=opts, user=user) as runt:
+
+            # paths from a top level query are not consumed by other storm operators
+            runt.litepaths = True
+
             async for x in runt.iterStormQuery(query):
                 yield x
 
+            if runt.prof is not None:
+                await self.fire('prof', opers=runt.prof.pack(query))
+
     @s_coro.genrhelp
     async def eval(self, text, opts=None, user=None):
         '''
@@ -166,6 +286,7 @@ class Snap(s_base.Base):
         # maintained for backward compatibility
         query = self.core.getStormQuery(text, mode=mode)
         with self.getStormRuntime(opts=opts, user=user) as runt:
+            runt.litepaths = True
             async for node, path in runt.iterStormQuery(query):
                 yield node
 
@@ -212,18 +333,23 @@ class Snap(s_base.Base):
         buid = s_common.buid(ndef)
         return await self.getNodeByBuid(buid)
 
-    async def nodesByTagProp(self, form, tag, name):
+    async def nodesByTagProp(self, form, tag, name, limit=None):
         prop = self.core.model.getTagProp(name)
         if prop is None:
             mesg = f'No tag property named {name}'
             raise s_exc.NoSuchTagProp(name=name, mesg=mesg)
 
-        for layr in self.layers:
-            genr = layr.liftByTagProp(form, tag, name)
-            async for node in self._joinStorGenr(layr, genr):
-                yield node
+        def liftfunc(layr):
+            return layr.liftByTagProp(form, tag, name)
+
+        def filtfunc(layr, node):
+            return node.bylayer['tagprops'].get((tag, prop.name)) == layr
 
-    async def nodesByTagPropValu(self, form, tag, name, cmpr, valu):
+        indxfunc = self._getTagPropIndxFunc(tag, prop)
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+            yield node
+
+    async def nodesByTagPropValu(self, form, tag, name, cmpr, valu, limit=None):
 
         prop = self.core.model.getTagProp(name)
         if prop is None:
@@ -235,12 +361,15 @@ class Snap(s_base.Base):
         if not cmprvals:
             return
 
-        for layr in self.layers:
-            genr = layr.liftByTagPropValu(form, tag, name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tagprops'].get((tag, prop.name)) != layr:
-                    continue
-                yield node
+        def liftfunc(layr):
+            return layr.liftByTagPropValu(form, tag, name, cmprvals)
+
+        def filtfunc(layr, node):
+            return node.bylayer['tagprops'].get((tag, prop.name)) == layr
+
+        indxfunc = self._getTagPropIndxFunc(tag, prop)
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+            yield node
 
     async def _joinStorNode(self, buid, cache):
 
@@ -249,6 +378,25 @@ class Snap(s_base.Base):
             await asyncio.sleep(0)
             return node
 
+        sodes = []
+        for layr in self.layers:
+
+            sode = cache.get(layr.iden)
+            if sode is None:
+                sode = await layr.getStorNode(buid)
+
+            sodes.append(sode)
+
+        node = self._joinSodes(buid, sodes)
+
+        # moved here from getNodeByBuid() to cover more
+        await asyncio.sleep(0)
+        return node
+
+    def _joinSodes(self, buid, sodes):
+        '''
+        Construct a Node from a list of storage nodes ( one per layer, in layer order ).
+        '''
         ndef = None
 
         tags = {}
@@ -263,11 +411,7 @@ class Snap(s_base.Base):
             'tagprops': {},
         }
 
-        for layr in self.layers:
-
-            sode = cache.get(layr.iden)
-            if sode is None:
-                sode = await layr.getStorNode(buid)
+        for layr, sode in zip(self.layers, sodes):
 
             info = sode[1]
 
@@ -310,25 +454,209 @@ class Snap(s_base.Base):
         self.livenodes[buid] = node
         self.buidcache.append(node)
 
-        # moved here from getNodeByBuid() to cover more
-        await asyncio.sleep(0)
         return node
 
-    async def _joinStorGenr(self, layr, genr):
-        cache = {}
-        async for sode in genr:
-            cache[layr.iden] = sode
-            node = await self._joinStorNode(sode[0], cache)
-            if node is not None:
+    async def _joinStorGenr(self, layr, genr, size=s_layer.STOR_NODE_WINDOW):
+        '''
+        Join the storage nodes from a layer lift with the other layers in windows.
+        '''
+        async def items():
+            async for sode in genr:
+                yield layr, sode
+
+        async for _, node in self._joinStorItems(items(), size=size):
+            yield node
+
+    async def _joinStorItems(self, genr, size=s_layer.STOR_NODE_WINDOW):
+        '''
+        Join a generator of (layr, sode) tuples into (layr, node) tuples in windows.
+        '''
+        async for window in s_coro.chunks(genr, size):
+
+            sodesbylayr = {layr.iden: {} for layr in self.layers}
+            for layr, sode in window:
+                sodesbylayr[layr.iden][sode[0]] = sode
+
+            for layr in self.layers:
+                known = sodesbylayr[layr.iden]
+                buids = [sode[0] for _, sode in window if sode[0] not in known and sode[0] not in self.livenodes]
+                for sode in await layr.getStorNodes(buids):
+                    known[sode[0]] = sode
+
+            for layr, sode in window:
+
+                buid = sode[0]
+
+                node = self.livenodes.get(buid)
+                if node is None:
+                    sodes = [sodesbylayr[x.iden].get(buid) for x in self.layers]
+                    if None in sodes:
+                        # the node was live when the window was loaded but has since been released
+                        node = await self._joinStorNode(buid, {layr.iden: sode})
+                    else:
+                        node = self._joinSodes(buid, sodes)
+
+                if node is not None:
+                    yield layr, node
+
+            await asyncio.sleep(0)
+
+    async def _mergeStorGenrs(self, genrs, indxfunc):
+        '''
+        Perform a k-way merge of per-layer lift generators on their index keys.
+
+        Args:
+            genrs (list): A list of (layr, genr) tuples for each layer lift.
+            indxfunc: A function which returns the index bytes for a (layr, sode).
+
+        Yields:
+            (Layer, tuple): A (layr, sode) tuple in index order.
+
+        Notes:
+            When the same buid is present at the same index key in multiple
+            layers, only the storage node from the top-most layer is yielded.
+        '''
+        heap = []
+        seqn = itertools.count()
+
+        async def push(indx, layr, genr):
+            try:
+                sode = await genr.__anext__()
+            except StopAsyncIteration:
+                return
+            heapq.heappush(heap, (indxfunc(layr, sode), sode[0], -indx, next(seqn), layr, genr, sode))
+
+        for indx, (layr, genr) in enumerate(genrs):
+            await push(indx, layr, genr)
+
+        last = None
+        while heap:
+
+            lkey, buid, indx, _, layr, genr, sode = heapq.heappop(heap)
+            await push(-indx, layr, genr)
+
+            if (lkey, buid) == last:
+                continue
+
+            last = (lkey, buid)
+            yield layr, sode
+
+    async def _mergeLayerLifts(self, liftfunc, indxfunc, filtfunc, limit=None):
+        '''
+        Yield nodes from a lift across all layers of the view.
+
+        Args:
+            liftfunc: A function which returns a lift generator for a layer.
+            indxfunc: A function which returns the index bytes for a (layr, sode).
+            filtfunc: A function which returns True if a (layr, node) should be yielded.
+            limit (int): The maximum number of nodes the caller will consume.
+
+        Notes:
+            Lifts from multiple layers are merged on their index keys so each
+            node is only joined once and results retain the index order.
+        '''
+        size = self._getLiftWindow(limit)
+
+        if len(self.layers) == 1:
+            layr = self.layers[0]
+            genr = self._joinStorGenr(layr, liftfunc(layr), size=size)
+
+        else:
+            genrs = [(layr, liftfunc(layr)) for layr in self.layers]
+
+            async def filtgenr():
+                async for layr, node in self._joinStorItems(self._mergeStorGenrs(genrs, indxfunc), size=size):
+                    if filtfunc(layr, node):
+                        yield node
+
+            genr = filtgenr()
+
+        async for node in self._limitLift(genr, limit):
+            yield node
+
+    def _getLiftWindow(self, limit):
+        '''
+        Return the join window size for a lift which will yield at most limit nodes.
+        '''
+        if limit is None:
+            return s_layer.STOR_NODE_WINDOW
+
+        return max(1, min(limit, s_layer.STOR_NODE_WINDOW))
+
+    async def _limitLift(self, genr, limit):
+        '''
+        Yield up to limit nodes from a lift generator and close it once the limit is met.
+        '''
+        if limit is None:
+            async for node in genr:
+                yield node
+            return
+
+        count = 0
+        try:
+            async for node in genr:
+
                 yield node
 
+                count += 1
+                if count >= limit:
+                    return
+
+        finally:
+            # release the layer scans now rather than when the generator is collected
+            await genr.aclose()
+
+    def _getStorIndxFunc(self, stortype, getvalu):
+        '''
+        Return a function which computes the index bytes for a (layr, sode) used to merge lifts.
+        '''
+        if stortype is None:
+            return lambda layr, sode: b''
+
+        if stortype & s_layer.STOR_FLAG_ARRAY:
+            stortype = s_layer.STOR_TYPE_MSGP
+
+        def indxfunc(layr, sode):
+
+            valu = getvalu(sode[1])
+            if valu is None:
+                return b''
+
+            indx = layr.getStorIndx(stortype, valu)
+            if not indx:
+                return b''
+
+            return indx[0]
+
+        return indxfunc
+
+    def _getPropIndxFunc(self, prop):
+
+        if prop.isform:
+            def getvalu(info):
+                ndef = info.get('ndef')
+                if ndef is not None:
+                    return ndef[1]
+        else:
+            def getvalu(info):
+                return info.get('props', {}).get(prop.name)
+
+        return self._getStorIndxFunc(prop.type.stortype, getvalu)
+
+    def _getTagPropIndxFunc(self, tag, prop):
+
+        def getvalu(info):
+            return info.get('tagprops', {}).get((tag, prop.name))
+
+        return self._getStorIndxFunc(prop.type.stortype, getvalu)
+
     async def nodesByDataName(self, name):
         for layr in self.layers:
             genr = layr.liftByDataName(name)
             async for node in self._joinStorGenr(layr, genr):
                 yield node
 
-    async def nodesByProp(self, full):
+    async def nodesByProp(self, full, limit=None):
 
         prop = self.core.model.prop(full)
         if prop is None:
@@ -342,44 +670,41 @@ class Snap(s_base.Base):
 
             return
 
-        if prop.isform:
+        indxfunc = self._getPropIndxFunc(prop)
 
-            for layr in self.layers:
-                genr = layr.liftByProp(prop.name, None)
+        if prop.isform:
 
-                async for node in self._joinStorGenr(layr, genr):
+            def liftfunc(layr):
+                return layr.liftByProp(prop.name, None)
 
-                    # TODO merge sort rather than use bylayer
-                    if node.bylayer.get('ndef') != layr:
-                        continue
+            def filtfunc(layr, node):
+                return node.bylayer.get('ndef') == layr
 
-                    yield node
+            async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+                yield node
             return
 
+        def filtfunc(layr, node):
+            return node.bylayer['props'].get(prop.name) == layr
+
         if prop.isuniv:
 
-            for layr in self.layers:
-                genr = layr.liftByProp(None, prop.name)
-                async for node in self._joinStorGenr(layr, genr):
-                    if node.bylayer['props'].get(prop.name) != layr:
-                        continue
-                    yield node
-            return
+            def liftfunc(layr):
+                return layr.liftByProp(None, prop.name)
 
-        formname = None
-        if not prop.isuniv:
-            formname = prop.form.name
+            async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+                yield node
+            return
 
         # Prop is secondary prop
 
-        for layr in self.layers:
-            genr = layr.liftByProp(formname, prop.name)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
-                yield node
+        def liftfunc(layr):
+            return layr.liftByProp(prop.form.name, prop.name)
 
-    async def nodesByPropValu(self, full, cmpr, valu):
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+            yield node
+
+    async def nodesByPropValu(self, full, cmpr, valu, limit=None):
 
         if cmpr == 'type=':
             async for node in self.nodesByPropValu(full, '=', valu):
@@ -405,55 +730,154 @@ class Snap(s_base.Base):
                     yield node
             return
 
-        if prop.isform:
+        indxfunc = self._getPropIndxFunc(prop)
 
-            for layr in self.layers:
-                genr = layr.liftByFormValu(prop.name, cmprvals)
+        if prop.isform:
 
-                async for node in self._joinStorGenr(layr, genr):
+            def liftfunc(layr):
+                return layr.liftByFormValu(prop.name, cmprvals)
 
-                    # TODO merge sort rather than use bylayer
-                    if node.bylayer.get('ndef') != layr:
-                        continue
+            def filtfunc(layr, node):
+                return node.bylayer.get('ndef') == layr
 
-                    yield node
+            async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+                yield node
 
             return
 
+        def filtfunc(layr, node):
+            return node.bylayer['props'].get(prop.name) == layr
+
         if prop.isuniv:
 
-            for layr in self.layers:
-                genr = layr.liftByPropValu(None, prop.name, cmprvals)
-                async for node in self._joinStorGenr(layr, genr):
-                    if node.bylayer['props'].get(prop.name) != layr:
-                        continue
-                    yield node
+            def liftfunc(layr):
+                return layr.liftByPropValu(None, prop.name, cmprvals)
+
+            async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+                yield node
 
             return
 
-        for layr in self.layers:
-            genr = layr.liftByPropValu(prop.form.name, prop.name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
-                yield node
+        def liftfunc(layr):
+            return layr.liftByPropValu(prop.form.name, prop.name, cmprvals)
 
-    async def nodesByTag(self, tag, form=None):
-        for layr in self.layers:
-            genr = layr.liftByTag(tag, form=form)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tags'].get(tag) != layr:
-                    continue
-                yield node
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+            yield node
+
+    async def nodesByPropValus(self, full, valus):
+        '''
+        Yield nodes whose form or prop equals any of a batch of values.
+
+        Args:
+            full (str): The full name of the form or prop.
+            valus (list): A list of values normalized for the prop type.
+
+        Notes:
+            Nodes are yielded in index order rather than in the order of valus.
+        '''
+        prop = self.core.model.prop(full)
+        if prop is None:
+            mesg = f'No property named "{full}".'
+            raise s_exc.NoSuchProp(mesg=mesg)
+
+        if prop.isrunt:
+            for valu in valus:
+                async for node in self.getRuntNodes(prop.full, valu=valu, cmpr='='):
+                    yield node
+            return
+
+        stortype = prop.type.stortype
+        indxfunc = self._getPropIndxFunc(prop)
+
+        if prop.isform:
+
+            def liftfunc(layr):
+                return layr.liftByPropValus(prop.name, None, valus, stortype)
+
+            def filtfunc(layr, node):
+                return node.bylayer.get('ndef') == layr
+
+        else:
+
+            formname = None
+            if not prop.isuniv:
+                formname = prop.form.name
+
+            def liftfunc(layr):
+                return layr.liftByPropValus(formname, prop.name, valus, stortype)
+
+            def filtfunc(layr, node):
+                return node.bylayer['props'].get(prop.name) == layr
+
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc):
+            yield node
+
+    async def getPropValuCount(self, full, norm, maxsize=None):
+        '''
+        Return the number of nodes whose form or prop equals a normalized value using the layer indexes.
+
+        Args:
+            full (str): The full name of the form or prop.
+            norm (obj): The normalized value.
+            maxsize (int): Stop counting once this many nodes have been found.
+
+        Returns:
+            (int): The count or None if it may not be computed from the indexes.
+
+        Notes:
+            Counts are only available for views with a single layer because
+            rows in lower layers may be overridden by the layers above them.
+        '''
+        if len(self.layers) != 1:
+            return None
+
+        prop = self.core.model.prop(full)
+        if prop is None or prop.isrunt:
+            return None
+
+        if prop.isform:
+            form, name = prop.name, None
+        elif prop.isuniv:
+            form, name = None, prop.name
+        else:
+            form, name = prop.form.name, prop.name
+
+        return await self.layers[0].getPropValuCount(form, name, prop.type.stortype, norm, maxsize=maxsize)
+
+    def _tagIndxFunc(self, layr, sode):
+        # the tag index is ordered by buid
+        return b''
+
+    async def nodesByTag(self, tag, form=None, limit=None):
+
+        def liftfunc(layr):
+            return layr.liftByTag(tag, form=form)
+
+        def filtfunc(layr, node):
+            return node.bylayer['tags'].get(tag) == layr
+
+        async for node in self._mergeLayerLifts(liftfunc, self._tagIndxFunc, filtfunc, limit=limit):
+            yield node
+
+    async def nodesByTagValu(self, tag, cmpr, valu, form=None, limit=None):
 
-    async def nodesByTagValu(self, tag, cmpr, valu, form=None):
         norm, info = self.core.model.type('ival').norm(valu)
-        for layr in self.layers:
-            genr = layr.liftByTagValu(tag, cmpr, norm, form=form)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tags'].get(tag) != layr:
-                    continue
-                yield node
+
+        def liftfunc(layr):
+            return layr.liftByTagValu(tag, cmpr, norm, form=form)
+
+        def filtfunc(layr, node):
+            return node.bylayer['tags'].get(tag) == layr
+
+        def getvalu(info):
+            valu = info.get('tags', {}).get(tag)
+            if valu != (None, None):
+                return valu
+
+        # the tag interval index is ordered by the ival
+        indxfunc = self._getStorIndxFunc(s_layer.STOR_TYPE_IVAL, getvalu)
+        async for node in self._mergeLayerLifts(liftfunc, indxfunc, filtfunc, limit=limit):
+            yield node
 
     async def nodesByPropTypeValu(self, name, valu):
 
@@ -465,7 +889,36 @@ class Snap(s_base.Base):
             async for node in self.nodesByPropValu(prop.full, '=', valu):
                 yield node
 
-    async def nodesByPropArray(self, full, cmpr, valu):
+    def hasRefIndx(self):
+        '''
+        Return True if every layer in the view maintains a reference index.
+        '''
+        return all(layr.hasrefindx for layr in self.layers)
+
+    async def nodesByRefs(self, ndef):
+        '''
+        Yield nodes which have a prop ( or array prop ) that references the given ndef.
+
+        Notes:
+            This uses the layer reference indexes and will only include
+            references from props which are stored in layers.
+        '''
+        buid = s_common.buid(ndef)
+
+        for layr in self.layers:
+
+            async for prop, sode in layr.liftByRefs(buid):
+
+                node = await self._joinStorNode(sode[0], {layr.iden: sode})
+                if node is None:
+                    continue
+
+                if node.bylayer['props'].get(prop) != layr:
+                    continue
+
+                yield node
+
+    async def nodesByPropArray(self, full, cmpr, valu, limit=None):
 
         prop = self.core.model.prop(full)
         if prop is None:
@@ -478,128 +931,187 @@ class Snap(s_base.Base):
 
         cmprvals = prop.type.arraytype.getStorCmprs(cmpr, valu)
 
-        if prop.isform:
+        async def liftgenr():
+
+            size = self._getLiftWindow(limit)
+
+            if prop.isform:
+
+                for layr in self.layers:
+                    genr = layr.liftByPropArray(prop.name, None, cmprvals)
+                    async for node in self._joinStorGenr(layr, genr, size=size):
+                        if node.bylayer['ndef'] != layr:
+                            continue
+                        yield node
+
+                return
+
+            formname = None
+            if prop.form is not None:
+                formname = prop.form.name
 
             for layr in self.layers:
-                genr = layr.liftByPropArray(prop.name, None, cmprvals)
-                async for node in self._joinStorGenr(layr, genr):
-                    if node.bylayer['ndef'] != layr:
+                genr = layr.liftByPropArray(formname, prop.name, cmprvals)
+                async for node in self._joinStorGenr(layr, genr, size=size):
+                    if node.bylayer['props'].get(prop.name) != layr:
                         continue
                     yield node
 
-            return
+        # once the limit is met no further layer lifts are started
+        async for node in self._limitLift(liftgenr(), limit):
+            yield node
 
-        formname = None
-        if prop.form is not None:
-            formname = prop.form.name
+    async def getNodeAdds(self, form, valu, props, addnode=True):
 
-        for layr in self.layers:
-            genr = layr.liftByPropArray(formname, prop.name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
-                yield node
+        adds = getNodeAdds(self.core.model, form, valu, props, addnode=addnode)
 
-    async def getNodeAdds(self, form, valu, props, addnode=True):
+        if self.buidprefetch:
+            adds = [await self._pruneNodeAdds(nodeedit) for nodeedit in adds]
 
-        async def _getadds(f, p, formnorm, forminfo, doaddnode=True):
+        return adds
 
-            edits = []  # Non-primary prop edits
-            topsubedits = []  # Primary prop sub edits
+    async def _pruneNodeAdds(self, nodeedit):
+        # remove the edits which would add nodes that already exist in the view
+        buid, formname, edits = nodeedit
 
-            formsubs = forminfo.get('subs', {})
-            for subname, subvalu in formsubs.items():
-                p[subname] = subvalu
+        pruned = []
+        for edit in edits:
 
-            for propname, propvalu in p.items():
-                subedits: s_layer.NodeEditsT = []
+            etyp, parms, subs = edit
 
-                prop = f.prop(propname)
-                if prop is None:
-                    continue
+            if not subs:
+                pruned.append(edit)
+                continue
 
-                assert prop.type.stortype is not None
+            subedits = []
+            for subedit in subs:
 
-                if isinstance(prop.type, s_types.Ndef):
-                    ndefname, ndefvalu = propvalu
-                    ndefform = self.core.model.form(ndefname)
-                    if ndefform is None:
-                        raise s_exc.NoSuchForm(name=ndefname)
+                if etyp == s_layer.EDIT_PROP_SET:
+                    node = await self.getNodeByBuid(subedit[0])
+                    if node is not None:
+                        continue
 
-                    ndefnorm, ndefinfo = ndefform.type.norm(ndefvalu)
-                    do_subedit = True
-                    if self.buidprefetch:
-                        node = await self.getNodeByBuid(s_common.buid((ndefform.name, ndefnorm)))
-                        do_subedit = node is None
+                subedits.append(await self._pruneNodeAdds(subedit))
 
-                    if do_subedit:
-                        subedits.extend([x async for x in _getadds(ndefform, {}, ndefnorm, ndefinfo)])
+            pruned.append((etyp, parms, subedits))
 
-                elif isinstance(prop.type, s_types.Array):
-                    arrayform = self.core.model.form(prop.type.arraytype.name)
-                    if arrayform is not None:
-                        for arrayvalu in propvalu:
-                            arraynorm, arrayinfo = arrayform.type.norm(arrayvalu)
+        return (buid, formname, pruned)
 
-                            if self.buidprefetch:
-                                node = await self.getNodeByBuid(s_common.buid((arrayform.name, arraynorm)))
-                                if node is not None:
-                                    continue
+    @contextlib.asynccontextmanager
+    async def bufferNodeEdits(self):
+        '''
+        Coalesce node edits saved within the context into a single set of node edits.
 
-                            subedits.extend([x async for x in _getadds(arrayform, {}, arraynorm, arrayinfo)])
+        Node objects reflect saved edits immediately, but the edits are only sent to
+        the write layer ( and callbacks fired ) when the context exits or when other
+        node edits must be applied first.
 
-                propnorm, typeinfo = prop.type.norm(propvalu)
+        Edits which may run triggers or tag callbacks are applied immediately ( after
+        the edits buffered ahead of them ) so that triggers run before any edits
+        which follow them.
+        '''
+        await self.flushNodeEdits()
 
-                propsubs = typeinfo.get('subs')
-                if propsubs is not None:
-                    for subname, subvalu in propsubs.items():
-                        fullname = f'{prop.full}:{subname}'
-                        subprop = self.core.model.prop(fullname)
-                        if subprop is None:
-                            continue
+        task = asyncio.current_task()
+
+        prev = self.editbufs.get(task)
+        self.editbufs[task] = {}
 
-                        assert subprop.type.stortype is not None
+        try:
+            yield
 
-                        subnorm, subinfo = subprop.type.norm(subvalu)
+        finally:
+            editbuf = self.editbufs.pop(task)
+            if prev is not None:
+                self.editbufs[task] = prev
 
-                        edits.append((s_layer.EDIT_PROP_SET, (subprop.name, subnorm, None, subprop.type.stortype), ()))
+            await self._applyEditBuf(editbuf)
 
-                propform = self.core.model.form(prop.type.name)
-                if propform is not None:
+    async def flushNodeEdits(self):
+        '''
+        Apply any node edits which have been buffered by bufferNodeEdits().
+        '''
+        task = asyncio.current_task()
 
-                    doedit = True
-                    if self.buidprefetch:
-                        node = await self.getNodeByBuid(s_common.buid((propform.name, propnorm)))
-                        doedit = node is None
+        editbuf = self.editbufs.get(task)
+        if not editbuf:
+            return
 
-                    if doedit:
-                        subedits.extend([x async for x in _getadds(propform, {}, propnorm, typeinfo)])
+        self.editbufs[task] = {}
 
-                edit: s_layer.EditT = (s_layer.EDIT_PROP_SET, (propname, propnorm, None, prop.type.stortype), subedits)
-                if propname in formsubs:
-                    topsubedits.append(edit)
-                else:
-                    edits.append(edit)
+        await self._applyEditBuf(editbuf)
 
-            buid = s_common.buid((f.name, formnorm))
+    async def _applyEditBuf(self, editbuf):
 
-            if doaddnode:
-                # Make all the sub edits for the primary property a conditional nodeEdit under a top-level NODE_ADD
-                # edit
-                if topsubedits:
-                    subnodeedits: s_layer.NodeEditsT = [(buid, f.name, topsubedits)]
-                else:
-                    subnodeedits = ()
-                topedit: s_layer.EditT = (s_layer.EDIT_NODE_ADD, (formnorm, f.type.stortype), subnodeedits)
-                yield (buid, f.name, [topedit] + edits)
-            else:
-                yield (buid, f.name, edits)
+        if not editbuf:
+            return
+
+        edits = [(buid, form, nedits) for (buid, (form, nedits)) in editbuf.items()]
+
+        try:
+            await self.applyNodeEdits(edits)
+
+        except Exception:
+            # our Node objects may reflect edits which were not stored
+            [self.livenodes.pop(buid, None) for buid in editbuf.keys()]
+            raise
+
+    async def saveNodeEdits(self, edits):
+        '''
+        Apply node edits or add them to the buffer if node edits are being buffered.
+        '''
+        if self.readonly:
+            mesg = 'The snapshot is in read-only mode.'
+            raise s_exc.IsReadOnly(mesg=mesg)
+
+        editbuf = self.editbufs.get(asyncio.current_task())
+        if editbuf is None or self._hasEditTriggers(edits):
+            await self.applyNodeEdits(edits)
+            return
+
+        for (buid, form, nedits) in edits:
 
-        if props is None:
-            props = {}
+            item = editbuf.get(buid)
+            if item is None:
+                item = editbuf[buid] = (form, [])
 
-        norm, info = form.type.norm(valu)
-        return [x async for x in _getadds(form, props, norm, info, doaddnode=addnode)]
+            item[1].extend(nedits)
+
+            node = self.livenodes.get(buid)
+            if node is None:
+                continue
+
+            for (etyp, parms, _) in nedits:
+
+                if etyp == s_layer.EDIT_PROP_SET:
+                    node.props[parms[0]] = parms[1]
+                    continue
+
+                if etyp == s_layer.EDIT_PROP_DEL:
+                    node.props.pop(parms[0], None)
+                    continue
+
+                if etyp == s_layer.EDIT_TAG_SET:
+                    node.tags[parms[0]] = parms[1]
+                    continue
+
+                if etyp == s_layer.EDIT_TAG_DEL:
+                    node.tags.pop(parms[0], None)
+                    continue
+
+                if etyp == s_layer.EDIT_TAGPROP_SET:
+                    node.tagprops[(parms[0], parms[1])] = parms[2]
+                    continue
+
+                if etyp == s_layer.EDIT_TAGPROP_DEL:
+                    node.tagprops.pop((parms[0], parms[1]), None)
+                    continue
+
+    def _hasEditTriggers(self, edits):
+        for (buid, form, nedits) in edits:
+            if self.view.hasEditTriggers(form, nedits):
+                return True
+        return False
 
     async def applyNodeEdit(self, edit):
         nodes = await self.applyNodeEdits((edit,))
@@ -613,11 +1125,17 @@ class Snap(s_base.Base):
             mesg = 'The snapshot is in read-only mode.'
             raise s_exc.IsReadOnly(mesg=mesg)
 
+        # buffered edits must be stored ahead of any which follow them
+        if self.editbufs:
+            await self.flushNodeEdits()
+
         meta = await self.getSnapMeta()
 
         todo = s_common.todo('storNodeEdits', edits, meta)
         sodes = await self.core.dyncall(self.wlyr.iden, todo)
 
+        self.editseqn += 1
+
         wlyr = self.wlyr
         nodes = []
         callbacks = []
@@ -843,6 +1361,107 @@ class Snap(s_base.Base):
     async def _addTagNode(self, name):
         return await self.addNode('syn:tag', name)
 
+    async def delNodes(self, nodes, force=False):
+        '''
+        Delete a batch of nodes using a single set of node edits.
+
+        Args:
+            nodes (list): A list of Node objects to delete.
+            force (bool): Delete the nodes even if other nodes still refer to them.
+
+        Returns:
+            (list): The list of nodes which were deleted.
+
+        Notes:
+            References are checked using one multi-value lift per referencing
+            prop rather than a lift per node.  References from other nodes in
+            the batch only prevent their deletion if the referencing node is
+            not deleted.
+        '''
+        if self.readonly:
+            mesg = 'The snapshot is in read-only mode.'
+            raise s_exc.IsReadOnly(mesg=mesg)
+
+        for node in nodes:
+            if node.form.isrunt:
+                raise s_exc.IsRuntForm(mesg='Cannot delete runt nodes',
+                                       form=node.form.name, valu=node.ndef[1])
+
+        todo = {node.buid: node for node in nodes}
+
+        if not force:
+
+            byform = collections.defaultdict(lambda: collections.defaultdict(list))
+            for node in todo.values():
+                byform[node.form.name][node.ndef[1]].append(node)
+
+            blocked = {}
+            inbatch = []    # (buid, node, mesg) references between nodes in the batch
+
+            # refuse to delete tag nodes with existing tags
+            for node in byform.get('syn:tag', {}).values():
+                node = node[0]
+                async for tagd in self.nodesByTag(node.ndef[1]):
+
+                    if tagd.buid not in todo:
+                        blocked[node.buid] = (node, 'Nodes still have this tag.')
+                        break
+
+                    if tagd.buid != node.buid:
+                        inbatch.append((tagd.buid, node, 'Nodes still have this tag.'))
+
+            for formname, valus in byform.items():
+
+                for prop in self.core.model.getPropsByType(formname):
+
+                    async for refr in self.nodesByPropValus(prop.full, list(valus.keys())):
+
+                        if prop.isform:
+                            valu = refr.ndef[1]
+                        else:
+                            valu = refr.get(prop.name)
+
+                        for node in valus.get(valu, ()):
+
+                            if refr.buid == node.buid:
+                                continue
+
+                            mesg = 'Other nodes still refer to this node.'
+
+                            if refr.buid in todo:
+                                inbatch.append((refr.buid, node, mesg))
+                                continue
+
+                            blocked.setdefault(node.buid, (node, mesg))
+
+            # nodes which are not deleted continue to refer to other nodes in the batch
+            while True:
+
+                count = len(blocked)
+
+                for buid, node, mesg in inbatch:
+                    if buid in blocked and node.buid not in blocked:
+                        blocked[node.buid] = (node, mesg)
+
+                if len(blocked) == count:
+                    break
+
+            for node, mesg in blocked.values():
+                await self._raiseOnStrict(s_exc.CantDelNode, mesg, form=node.form.name)
+                todo.pop(node.buid, None)
+
+        # order the edits by buid to delete the node rows in key order
+        dels = [todo[buid] for buid in sorted(todo.keys())]
+        if not dels:
+            return []
+
+        await self.applyNodeEdits([(node.buid, node.form.name, node.getDelEdits()) for node in dels])
+
+        for node in dels:
+            self.livenodes.pop(node.buid, None)
+
+        return dels
+
     async def _raiseOnStrict(self, ctor, mesg, **info):
         if self.strict:
             raise ctor(mesg=mesg, **info)
@@ -861,65 +1480,130 @@ class Snap(s_base.Base):
         Args:
             nodedefs (list): A list of nodedef tuples.
 
+        Notes:
+            If the Cortex has a norm pool, the node edits for each batch of
+            nodedefs are computed by the pool processes and stored together.
+
         Returns:
             (list): A list of xact messages.
         '''
-        for (formname, formvalu), forminfo in nodedefs:
-            try:
-                props = forminfo.get('props')
+        normpool = self.core.normpool
+        if normpool is None or self.buidprefetch or self.readonly:
+            for nodedef in nodedefs:
+                async for node in self._addNodeDef(nodedef):
+                    yield node
+            return
+
+        todo = iter(nodedefs)
+        while True:
+
+            chunk = list(itertools.islice(todo, normpool.batchsize))
+            if not chunk:
+                return
+
+            async for node in self._addNodeDefsPooled(normpool, chunk):
+                yield node
+
+    async def _addNodeDefsPooled(self, normpool, nodedefs):
+
+        for _, forminfo in nodedefs:
+            props = forminfo.get('props')
+            if props is not None:
+                props.pop('.created', None)
+
+        try:
+            alladds = await normpool.getNodeAdds(nodedefs)
+
+            edits = [nodeedit for adds in alladds if adds is not None for nodeedit in adds]
+            if edits:
+                await self.applyNodeEdits(edits)
+
+        except asyncio.CancelledError: # pragma: no cover
+            raise
+
+        except Exception:
+            logger.exception('Norm pool failed to add nodes, adding them individually.')
+            alladds = [None for nodedef in nodedefs]
+
+        nodes = []
+        async with self.bufferNodeEdits():
+
+            for nodedef, adds in zip(nodedefs, alladds):
+
+                # nodedefs which the pool could not add are added here to raise or warn
+                if adds is None:
+                    nodes.extend([n async for n in self._addNodeDef(nodedef)])
+                    continue
 
-                # remove any universal created props...
-                if props is not None:
-                    props.pop('.created', None)
+                node = await self.getNodeByBuid(adds[0][0])
+                nodes.extend([n async for n in self._addNodeDef(nodedef, node=node)])
+
+        for node in nodes:
+            yield node
+
+    async def _addNodeDef(self, nodedef, node=None):
+        '''
+        Add a nodedef ( or update the given node ) and yield the node if successful.
+        '''
+        (formname, formvalu), forminfo = nodedef
+
+        try:
+            props = forminfo.get('props')
 
-                oldstrict = self.strict
-                self.strict = True
-                try:
+            # remove any universal created props...
+            if props is not None:
+                props.pop('.created', None)
+
+            oldstrict = self.strict
+            self.strict = True
+            try:
+                if node is None:
                     node = await self.addNode(formname, formvalu, props=props)
-                    if node is not None:
-                        tags = forminfo.get('tags')
-                        if tags is not None:
-                            for tag, asof in tags.items():
-                                await node.addTag(tag, valu=asof)
-
-                        tagprops = forminfo.get('tagprops', {})
-                        if tagprops is not None:
-                            for tag, props in tagprops.items():
-                                for prop, valu in props.items():
-                                    try:
-                                        await node.setTagProp(tag, prop, valu)
-                                    except s_exc.NoSuchTagProp:
-                                        mesg = \
-                                            f'Tagprop [{prop}] does not exist, cannot set it on [{formname}={formvalu}]'
-                                        logger.warning(mesg)
-                                        continue
-
-                        nodedata = forminfo.get('nodedata')
-                        if nodedata is not None:
-                            for name, data in nodedata.items():
-                                await node.setData(name, data)
-
-                        edges = forminfo.get('edges')
-                        if edges is not None:
-                            for n2iden, edgeinfo in edges:
-                                await node.addEdge(edgeinfo.get('verb'), n2iden)
-
-                except Exception as e:
-                    if not oldstrict:
-                        await self.warn(f'addNodes failed on {formname}, {formvalu}, {forminfo}: {e}')
-                        continue
-                    raise
 
-                finally:
-                    self.strict = oldstrict
+                if node is not None:
+                    tags = forminfo.get('tags')
+                    if tags is not None:
+                        for tag, asof in tags.items():
+                            await node.addTag(tag, valu=asof)
+
+                    tagprops = forminfo.get('tagprops', {})
+                    if tagprops is not None:
+                        for tag, props in tagprops.items():
+                            for prop, valu in props.items():
+                                try:
+                                    await node.setTagProp(tag, prop, valu)
+                                except s_exc.NoSuchTagProp:
+                                    mesg = \
+                                        f'Tagprop [{prop}] does not exist, cannot set it on [{formname}={formvalu}]'
+                                    logger.warning(mesg)
+                                    continue
 
-                yield node
+                    nodedata = forminfo.get('nodedata')
+                    if nodedata is not None:
+                        for name, data in nodedata.items():
+                            await node.setData(name, data)
 
-            except asyncio.CancelledError:  # pragma: no cover
+                    edges = forminfo.get('edges')
+                    if edges is not None:
+                        for n2iden, edgeinfo in edges:
+                            await node.addEdge(edgeinfo.get('verb'), n2iden)
+
+            except Exception as e:
+                if not oldstrict:
+                    await self.warn(f'addNodes failed on {formname}, {formvalu}, {forminfo}: {e}')
+                    return
                 raise
 
-            except Exception:
-                logger.exception(f'Error making node: [{formname}={formvalu}]')
+            finally:
+                self.strict = oldstrict
+
+            yield node
+
+        except asyncio.CancelledError:  # pragma: no cover
+            raise
+
+        except Exception:
+            logger.exception(f'Error making node: [{formname}={formvalu}]')
 
     async def getRuntNodes(self, full, valu=None, cmpr=None):
 
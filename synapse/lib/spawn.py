@@ -3,6 +3,7 @@ Spawn is mechanism so that a cortex can execute different queries in separate pr
 '''
 
 import os
+import math
 import asyncio
 import logging
 import functools
@@ -25,6 +26,7 @@ import synapse.lib.boss as s_boss
 import synapse.lib.coro as s_coro
 import synapse.lib.hive as s_hive
 import synapse.lib.link as s_link
+import synapse.lib.snap as s_snap
 import synapse.lib.view as s_view
 import synapse.lib.storm as s_storm
 import synapse.lib.dyndeps as s_dyndeps
@@ -305,6 +307,103 @@ class SpawnPool(s_base.Base):
 
         return proc
 
+# the data model of a norm pool process
+normmodel = None
+
+def _initNormProc(modeldefs, loglevel):
+    '''
+    Multiprocessing initializer for a NormPool process.
+    '''
+    global normmodel
+
+    s_common.setlogging(logger, loglevel)
+
+    normmodel = s_datamodel.Model()
+    normmodel.addDataModels(modeldefs)
+
+def _getNormNodeAdds(nodedefs):
+    '''
+    Compute the node edits to add each nodedef using the norm process data model.
+
+    Returns:
+        (list): A list of node edits per nodedef ( or None if the nodedef must be added by the Cortex ).
+    '''
+    retn = []
+    for (formname, formvalu), forminfo in nodedefs:
+
+        form = normmodel.form(formname)
+        if form is None or form.isrunt:
+            retn.append(None)
+            continue
+
+        try:
+            retn.append(s_snap.getNodeAdds(normmodel, form, formvalu, forminfo.get('props')))
+        except Exception:
+            retn.append(None)
+
+    return retn
+
+class NormPool(s_base.Base):
+    '''
+    A pool of processes which normalize nodedefs for bulk node adds.
+    '''
+    async def __anit__(self, core, size, batchsize=10000):
+
+        await s_base.Base.__anit__(self)
+
+        self.core = core
+        self.size = size
+        self.batchsize = batchsize
+
+        self.pool = None
+        self.mpctx = multiprocessing.get_context('spawn')
+
+        self.onfini(self.bump)
+
+    async def bump(self):
+        '''
+        Shutdown the pool processes so new processes are created with the current data model.
+        '''
+        pool = self.pool
+        self.pool = None
+
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    async def _getProcPool(self):
+
+        if self.pool is None:
+            modeldefs = await self.core.getModelDefs()
+            initargs = (modeldefs, logger.getEffectiveLevel())
+            self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.size, mp_context=self.mpctx,
+                                                               initializer=_initNormProc, initargs=initargs)
+        return self.pool
+
+    async def getNodeAdds(self, nodedefs):
+        '''
+        Compute the node edits to add a list of nodedefs using the pool processes.
+
+        Args:
+            nodedefs (list): A list of nodedef tuples.
+
+        Returns:
+            (list): A list of node edits per nodedef ( or None if the nodedef must be added by the Cortex ).
+        '''
+        if self.isfini: # pragma: no cover
+            raise s_exc.IsFini()
+
+        pool = await self._getProcPool()
+        loop = asyncio.get_running_loop()
+
+        size = math.ceil(len(nodedefs) / self.size)
+        futs = [loop.run_in_executor(pool, _getNormNodeAdds, chunk) for chunk in s_common.chunks(nodedefs, size)]
+
+        retn = []
+        for adds in await asyncio.gather(*futs):
+            retn.extend(adds)
+
+        return retn
+
 class SpawnCore(s_base.Base):
     '''
     A SpawnCore instance is the substitute for a Cortex in non-cortex processes
@@ -318,6 +417,7 @@ class SpawnCore(s_base.Base):
         self.views = {}
         self.layers = {}
         self.nexsroot = None
+        self.normpool = None
         self.isactive = False
         self.spawninfo = spawninfo
 
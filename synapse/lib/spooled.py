@@ -1,4 +1,5 @@
 import shutil
+import asyncio
 import tempfile
 
 import synapse.common as s_common
@@ -102,3 +103,121 @@ class Set(Spooled):
             return
 
         self.realset.discard(valu)
+
+class Sorted(Spooled):
+    '''
+    A collection of (key, valu) tuples which are yielded in key order and will spool to a slab on large growth.
+
+    Notes:
+        Keys must be bytes and valus must be msgpack compatible. Items with
+        equal keys are yielded in the order they were added.
+    '''
+
+    async def __anit__(self, dirn=None, size=10000, reverse=False):
+        await Spooled.__anit__(self, dirn=dirn, size=size)
+        self.reverse = reverse
+        self.realitems = []
+        self.len = 0
+
+    def __len__(self):
+        return self.len
+
+    def _putItem(self, seqn, key, valu):
+        # the sequence number keeps the sort stable and the slab keys unique
+        if self.reverse:
+            seqn = 0xffffffffffffffff - seqn
+
+        # escape and terminate the key so it sorts before any key it prefixes
+        lkey = key.replace(b'\x00', b'\x00\xff') + b'\x00\x00' + seqn.to_bytes(8, 'big')
+        self.slab.put(lkey, s_msgpack.en(valu))
+
+    async def add(self, key, valu):
+
+        if self.fallback:
+            self._putItem(self.len, key, valu)
+            self.len += 1
+            return
+
+        self.realitems.append((key, valu))
+        self.len += 1
+
+        if len(self.realitems) >= self.size:
+            await self._initFallBack()
+            [self._putItem(seqn, k, v) for seqn, (k, v) in enumerate(self.realitems)]
+            self.realitems.clear()
+
+    async def items(self):
+        '''
+        Yield (key, valu) tuples in key order ( or reverse key order ).
+        '''
+        if not self.fallback:
+            for item in sorted(self.realitems, key=lambda x: x[0], reverse=self.reverse):
+                yield item
+            return
+
+        if self.reverse:
+            genr = self.slab.scanByFullBack()
+        else:
+            genr = self.slab.scanByFull()
+
+        for lkey, lval in genr:
+            yield lkey[:-10].replace(b'\x00\xff', b'\x00'), s_msgpack.un(lval)
+            await asyncio.sleep(0)
+
+class Dict(Spooled):
+    '''
+    A minimal dict-like implementation that will spool to a slab on large growth.
+
+    Notes:
+        Keys and values must be msgpack compatible. Values are not references
+        once spooled, so changes must be stored using set().
+    '''
+
+    async def __anit__(self, dirn=None, size=10000):
+        await Spooled.__anit__(self, dirn=dirn, size=size)
+        self.realdict = {}
+        self.len = 0
+
+    def __len__(self):
+        if self.fallback:
+            return self.len
+
+        return len(self.realdict)
+
+    def get(self, key, defv=None):
+
+        if self.fallback:
+            byts = self.slab.get(s_msgpack.en(key))
+            if byts is None:
+                return defv
+            return s_msgpack.un(byts)
+
+        return self.realdict.get(key, defv)
+
+    async def set(self, key, valu):
+
+        if self.fallback:
+            if self.slab.replace(s_msgpack.en(key), s_msgpack.en(valu)) is None:
+                self.len += 1
+            return
+
+        self.realdict[key] = valu
+
+        if len(self.realdict) >= self.size:
+            await self._initFallBack()
+            [self.slab.put(s_msgpack.en(k), s_msgpack.en(v)) for (k, v) in self.realdict.items()]
+            self.len = len(self.realdict)
+            self.realdict.clear()
+
+    async def items(self):
+        '''
+        Yield (key, valu) tuples from the dict.
+        '''
+        if not self.fallback:
+            for item in list(self.realdict.items()):
+                yield item
+            return
+
+        for lkey, lval in self.slab.scanByFull():
+            yield s_msgpack.un(lkey), s_msgpack.un(lval)
+            await asyncio.sleep(0)
@@ -1,6 +1,9 @@
+import time
+import heapq
 import asyncio
 import logging
 import argparse
+import itertools
 import collections
 
 import synapse.exc as s_exc
@@ -9,11 +12,15 @@ import synapse.telepath as s_telepath
 
 import synapse.lib.ast as s_ast
 import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
 import synapse.lib.node as s_node
+import synapse.lib.task as s_task
 import synapse.lib.time as s_time
 import synapse.lib.scope as s_scope
 import synapse.lib.config as s_config
 import synapse.lib.scrape as s_scrape
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.spooled as s_spooled
 import synapse.lib.grammar as s_grammar
 import synapse.lib.provenance as s_provenance
 import synapse.lib.stormtypes as s_stormtypes
@@ -1046,6 +1053,117 @@ class StormDmon(s_base.Base):
                 self.err_evnt.set()
                 await self.waitfini(timeout=1)
 
+class Profiler:
+    '''
+    Track per-operator row counts and timing for a storm query.
+
+    Operator generators are pulled by their downstream operator, so the
+    time spent waiting on the upstream generator is subtracted to give
+    each operator its own wall clock and CPU time.
+
+    NOTE: CPU time is process wide and may include other tasks which
+          ran on the ioloop while the operator was awaiting.
+    '''
+    def __init__(self):
+        self.opers = {}
+
+    def _getOperInfo(self, oper):
+
+        info = self.opers.get(id(oper))
+        if info is None:
+            info = self.opers[id(oper)] = {
+                'inputs': 0,
+                'outputs': 0,
+                'took': 0,
+                'cpu': 0,
+            }
+
+        return info
+
+    async def run(self, oper, runt, genr):
+        '''
+        Run the operator and yield its output while recording stats.
+        '''
+        info = self._getOperInfo(oper)
+
+        async def inptgenr():
+
+            while True:
+
+                tick = time.perf_counter_ns()
+                cpu0 = time.process_time_ns()
+
+                try:
+                    item = await genr.__anext__()
+                except StopAsyncIteration:
+                    return
+
+                finally:
+                    info['took'] -= time.perf_counter_ns() - tick
+                    info['cpu'] -= time.process_time_ns() - cpu0
+
+                info['inputs'] += 1
+                yield item
+
+        outp = oper.run(runt, inptgenr())
+
+        try:
+
+            while True:
+
+                tick = time.perf_counter_ns()
+                cpu0 = time.process_time_ns()
+
+                try:
+                    item = await outp.__anext__()
+                except StopAsyncIteration:
+                    return
+
+                finally:
+                    info['took'] += time.perf_counter_ns() - tick
+                    info['cpu'] += time.process_time_ns() - cpu0
+
+                info['outputs'] += 1
+                yield item
+
+        finally:
+            await outp.aclose()
+
+    def pack(self, query):
+        '''
+        Return the operator tree for the query with the recorded stats.
+        '''
+        retn = []
+        for oper in query.kids:
+
+            info = self.opers.get(id(oper), {})
+
+            name = oper.__class__.__name__
+            if isinstance(oper, s_ast.CmdOper):
+                name = f'{name}: {oper.kids[0].value()}'
+
+            retn.append({
+                'oper': name,
+                'repr': oper.repr(),
+                'inputs': info.get('inputs', 0),
+                'outputs': info.get('outputs', 0),
+                # nanoseconds to milliseconds
+                'took': info.get('took', 0) / 1000000,
+                'cpu': info.get('cpu', 0) / 1000000,
+                'kids': [self.pack(subq) for subq in self._iterSubQueries(oper)],
+            })
+
+        return retn
+
+    def _iterSubQueries(self, astn):
+        for kid in astn.kids:
+
+            if isinstance(kid, s_ast.Query):
+                yield kid
+                continue
+
+            yield from self._iterSubQueries(kid)
+
 class Runtime:
     '''
     A Runtime represents the instance of a running query.
@@ -1090,6 +1208,17 @@ class Runtime:
 
         self.proxies = {}
 
+        self.prof = None
+        if self.opts.get('profile'):
+            self.prof = Profiler()
+
+        # top level runtimes may share path variables if the query never observes them
+        self.litepaths = False
+        self.pathvars = None
+
+        # set when the query is fed nodes from another pipeline ( such as a pure storm command )
+        self.piped = False
+
     async def dyncall(self, iden, todo, gatekeys=()):
         return await self.snap.core.dyncall(iden, todo, gatekeys=gatekeys)
 
@@ -1138,6 +1267,8 @@ class Runtime:
         self.task.cancel()
 
     def initPath(self, node):
+        if self.pathvars is not None:
+            return s_node.LitePath(self, self.pathvars, node)
         return s_node.Path(self, dict(self.vars), [node])
 
     def getOpt(self, name, defval=None):
@@ -1214,12 +1345,16 @@ class Runtime:
         with s_provenance.claim('storm', q=query.text, user=self.user.iden):
 
             self.loadRuntVars(query)
+            self.piped = genr is not None
 
             # init any options from the query
             # (but dont override our own opts)
             for name, valu in query.opts.items():
                 self.opts.setdefault(name, valu)
 
+            if self.litepaths and not query.usespath and not self.getOpt('path') and not self.getOpt('graph'):
+                self.pathvars = dict(self.vars)
+
             async for node, path in query.iterNodePaths(self, genr=genr):
                 self.tick()
                 yield node, path
@@ -1236,6 +1371,7 @@ class Runtime:
         variable values and functions.
         '''
         runt = Runtime(self.snap, user=self.user, opts=opts)
+        runt.prof = self.prof
         # imported implies module level
         runt.isModuleRunt = impd
         if not impd:  # respect the import boundary
@@ -1876,17 +2012,17 @@ class UniqCmd(Cmd):
 
     async def execStormCmd(self, runt, genr):
 
-        buidset = set()
+        async with await s_spooled.Set.anit(dirn=runt.snap.core.dirn) as buidset:
 
-        async for node, path in genr:
+            async for node, path in genr:
 
-            if node.buid in buidset:
-                # all filters must sleep
-                await asyncio.sleep(0)
-                continue
+                if node.buid in buidset:
+                    # all filters must sleep
+                    await asyncio.sleep(0)
+                    continue
 
-            buidset.add(node.buid)
-            yield node, path
+                await buidset.add(node.buid)
+                yield node, path
 
 class MaxCmd(Cmd):
     '''
@@ -1982,15 +2118,350 @@ class MinCmd(Cmd):
         if minitem:
             yield minitem
 
+class SortCmd(Cmd):
+    '''
+    Consume nodes and yield them sorted by the value of a property, tag, or variable.
+
+    Nodes without a value are yielded last. Numbers sort before strings and
+    tag intervals sort by their minimum ( or maximum when reversed ).
+
+    Examples:
+
+        # Yield the files in order of size
+        file:bytes +#foo.bar | sort :size
+
+        # Yield the ten most recently seen FQDNs
+        inet:fqdn | sort --reverse --top 10 .seen
+
+    Notes:
+        The --top option keeps only the needed nodes in memory. Otherwise nodes
+        are spooled to disk for large inputs, which requires path variables to
+        be primitive values such as strings, numbers, lists, and dictionaries.
+    '''
+    name = 'sort'
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+        pars.add_argument('--reverse', '-r', default=False, action='store_true',
+                          help='Sort in descending order.')
+        pars.add_argument('--top', type=int, default=None,
+                          help='Only yield the first N nodes.')
+        pars.add_argument('valu', help='The property, tag, or variable value to sort by.')
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        # per-node arguments are not parsed until the first node arrives
+        genr = await s_ast.pullone(genr)
+        if self.opts is None:
+            return
+
+        if self.opts.top is not None and self.opts.top < 1:
+            mesg = 'The sort --top option must be greater than 0.'
+            raise s_exc.BadArg(mesg=mesg, name=self.name)
+
+        ivaltype = self.runt.snap.core.model.type('ival')
+
+        async def keygenr():
+            async for node, path in genr:
+                valu = await s_stormtypes.toprim(self.opts.valu)
+                yield self._getSortKey(ivaltype, valu), node, path
+
+        if self.opts.top is not None:
+            async for item in self._execTop(keygenr()):
+                yield item
+            return
+
+        async with await s_spooled.Sorted.anit(dirn=runt.snap.core.dirn, reverse=self.opts.reverse) as spool:
+
+            # nodes and paths are kept in memory until there are too many to sort without spooling
+            items = []
+            async for key, node, path in keygenr():
+
+                if items is None:
+                    await spool.add(key, self._getSpoolValu(runt, node, path))
+                    continue
+
+                items.append((key, node, path))
+                if len(items) < spool.size:
+                    continue
+
+                # too many nodes to keep in memory so they are all spooled to disk
+                for ikey, inode, ipath in items:
+                    await spool.add(ikey, self._getSpoolValu(runt, inode, ipath))
+
+                items = None
+
+            if items is not None:
+                items.sort(key=lambda x: x[0], reverse=self.opts.reverse)
+                for key, node, path in items:
+                    yield node, path
+                return
+
+            async for key, (buid, pathvars) in spool.items():
+
+                node = await runt.snap.getNodeByBuid(buid)
+                if node is None:
+                    continue
+
+                path = runt.initPath(node)
+                for name, valu in pathvars.items():
+                    path.setVar(name, valu)
+
+                yield node, path
+
+    async def _execTop(self, genr):
+
+        top = []
+        size = self.opts.top
+
+        def getkey(x):
+            return x[0]
+
+        # nsmallest/nlargest are equivalent to a stable sort but only keep a heap of size items
+        async for window in s_coro.chunks(genr, max(size, 1000)):
+            if self.opts.reverse:
+                top = heapq.nlargest(size, itertools.chain(top, window), key=getkey)
+            else:
+                top = heapq.nsmallest(size, itertools.chain(top, window), key=getkey)
+
+        for key, node, path in top:
+            yield node, path
+
+    def _getSpoolValu(self, runt, node, path):
+
+        # runtime vars are restored when the path is initialized again
+        basevars = runt.pathvars if runt.pathvars is not None else runt.vars
+
+        pathvars = {}
+        for name, valu in path.vars.items():
+
+            prim = self._getSpoolVar(valu)
+            if prim is s_common.novalu:
+
+                if basevars.get(name, s_common.novalu) is valu:
+                    continue
+
+                mesg = f'The sort command can not spool the non-primitive variable ${name} to disk.'
+                raise s_exc.BadArg(mesg=mesg, name=name)
+
+            pathvars[name] = prim
+
+        return node.buid, pathvars
+
+    def _getSpoolVar(self, valu):
+
+        if isinstance(valu, (str, int, bool, float, bytes)) or valu is None:
+            return valu
+
+        if isinstance(valu, (s_stormtypes.Str, s_stormtypes.Bytes, s_stormtypes.Bool,
+                             s_stormtypes.List, s_stormtypes.Dict)):
+            return self._getSpoolVar(valu.valu)
+
+        if isinstance(valu, (tuple, list)):
+            retn = []
+            for item in valu:
+                item = self._getSpoolVar(item)
+                if item is s_common.novalu:
+                    return s_common.novalu
+                retn.append(item)
+            return tuple(retn)
+
+        if isinstance(valu, dict):
+            retn = {}
+            for key, item in valu.items():
+                key = self._getSpoolVar(key)
+                item = self._getSpoolVar(item)
+                if key is s_common.novalu or item is s_common.novalu:
+                    return s_common.novalu
+                retn[key] = item
+            return retn
+
+        return s_common.novalu
+
+    def _getSortKey(self, ivaltype, valu):
+        '''
+        Return order preserving bytes for a sort value.
+        '''
+        if isinstance(valu, (list, tuple)):
+
+            if valu == (None, None):
+                valu = None
+
+            else:
+                ival, info = ivaltype.norm(valu)
+                valu = ival[1] if self.opts.reverse else ival[0]
+
+        if valu is None:
+            # nodes without a value are yielded last
+            return b'' if self.opts.reverse else b'\xff'
+
+        if isinstance(valu, str):
+            return b'\x01' + valu.encode('utf8', 'surrogatepass')
+
+        valu = s_stormtypes.intify(valu)
+
+        try:
+            return b'\x00' + (valu + 0x80000000000000000000000000000000).to_bytes(16, 'big')
+        except OverflowError:
+            mesg = f'The sort value {valu} is out of range.'
+            raise s_exc.BadArg(mesg=mesg, name=self.name) from None
+
+class AggCmd(Cmd):
+    '''
+    Aggregate values from the inbound nodes into groups and emit a row for each group.
+
+    The count, sum, min, and max aggregates may be computed from properties, tags,
+    or variables. If no aggregates are specified the nodes in each group are counted.
+    Rows are printed unless --emit or --into are used. This does yield the inbound nodes.
+
+    Examples:
+
+        # Count the IPv4 addresses and their first/last seen times by ASN
+        inet:ipv4 | agg --by :asn --count --min .seen --max .seen | spin
+
+        # Emit an "agg:row" message for each group
+        inet:ipv4 | agg --by :asn --by :loc --emit | spin
+
+        # Store the rows into a list variable
+        $rows = $lib.list() inet:ipv4 | agg --by :asn --into $rows | spin
+
+    Notes:
+        Each row is a dictionary containing the "by" values of the group and
+        a value ( or list of values ) for each requested aggregate. Groups
+        are spooled to disk when there are a large number of them.
+    '''
+    name = 'agg'
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+        pars.add_argument('--by', default=[], action='append',
+                          help='A value to group by. May be specified multiple times.')
+        pars.add_argument('--count', default=False, action='store_true',
+                          help='Count the nodes in each group.')
+        pars.add_argument('--sum', default=[], action='append',
+                          help='A value to sum for each group. May be specified multiple times.')
+        pars.add_argument('--min', default=[], action='append',
+                          help='A value to find the minimum of for each group. May be specified multiple times.')
+        pars.add_argument('--max', default=[], action='append',
+                          help='A value to find the maximum of for each group. May be specified multiple times.')
+        pars.add_argument('--emit', default=False, action='store_true',
+                          help='Emit "agg:row" messages rather than printing the rows.')
+        pars.add_argument('--into', default=None,
+                          help='A list to append the rows to rather than printing them.')
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        ivaltype = self.runt.snap.core.model.type('ival')
+
+        def normvalu(valu, imax=False):
+
+            if isinstance(valu, (list, tuple)):
+
+                if valu == (None, None):
+                    return None
+
+                ival, info = ivaltype.norm(valu)
+                valu = ival[1] if imax else ival[0]
+
+            if valu is None:
+                return None
+
+            return s_stormtypes.intify(valu)
+
+        # the number of aggregates is fixed by the first node
+        size = None
+
+        async with await s_spooled.Dict.anit(dirn=runt.snap.core.dirn) as groups:
+
+            async for node, path in genr:
+
+                yield node, path
+
+                if size is None:
+                    size = (len(self.opts.sum), len(self.opts.min), len(self.opts.max))
+
+                by = await s_stormtypes.toprim(tuple(self.opts.by))
+
+                # group by the encoded values so lists and dicts may be used
+                try:
+                    bykey = s_msgpack.en(by)
+                except s_exc.NotMsgpackSafe as e:
+                    mesg = f'The agg --by values must be primitives: {e.get("mesg")}'
+                    raise s_exc.BadArg(mesg=mesg, name=self.name) from None
+
+                state = groups.get(bykey)
+                if state is None:
+                    state = (by, 0, [0] * size[0], [None] * size[1], [None] * size[2])
+
+                by, count, sums, mins, maxs = state
+
+                sums = list(sums)
+                for i, valu in enumerate(self.opts.sum[:size[0]]):
+                    valu = normvalu(await s_stormtypes.toprim(valu))
+                    if valu is not None:
+                        sums[i] += valu
+
+                mins = list(mins)
+                for i, valu in enumerate(self.opts.min[:size[1]]):
+                    valu = normvalu(await s_stormtypes.toprim(valu))
+                    if valu is not None and (mins[i] is None or valu < mins[i]):
+                        mins[i] = valu
+
+                maxs = list(maxs)
+                for i, valu in enumerate(self.opts.max[:size[2]]):
+                    valu = normvalu(await s_stormtypes.toprim(valu), imax=True)
+                    if valu is not None and (maxs[i] is None or valu > maxs[i]):
+                        maxs[i] = valu
+
+                await groups.set(bykey, (by, count + 1, sums, mins, maxs))
+
+            if size is None:
+                return
+
+            into = self.opts.into
+            if into is not None and not isinstance(into, s_stormtypes.List):
+                mesg = 'The agg --into option must be a list.'
+                raise s_exc.BadArg(mesg=mesg, name=self.name)
+
+            docount = self.opts.count or not any(size)
+
+            async for bykey, (by, count, sums, mins, maxs) in groups.items():
+
+                row = {'by': by}
+
+                if docount:
+                    row['count'] = count
+
+                for name, valus in (('sum', sums), ('min', mins), ('max', maxs)):
+                    if valus:
+                        row[name] = valus[0] if len(valus) == 1 else tuple(valus)
+
+                if into is not None:
+                    into.valu.append(row)
+                    continue
+
+                if self.opts.emit:
+                    await runt.snap.fire('agg:row', row=row)
+                    continue
+
+                text = ', '.join(repr(v) for v in by) or '*'
+                info = ' '.join(f'{k}={v!r}' for (k, v) in row.items() if k != 'by')
+                await runt.printf(f'{text}: {info}')
+
 class DelNodeCmd(Cmd):
     '''
     Delete nodes produced by the previous query logic.
 
     (no nodes are returned)
 
-    Example
+    Examples:
 
         inet:fqdn=vertex.link | delnode
+
+        // Delete a large set of nodes using bulk edits in batches of 10000
+        #bad.ingest | delnode --batch 10000
     '''
     name = 'delnode'
 
@@ -1998,6 +2469,8 @@ class DelNodeCmd(Cmd):
         pars = Cmd.getArgParser(self)
         forcehelp = 'Force delete even if it causes broken references (requires admin).'
         pars.add_argument('--force', default=False, action='store_true', help=forcehelp)
+        batchhelp = 'Delete nodes in batches of the given size using bulk edits and reference checks.'
+        pars.add_argument('--batch', type=int, default=None, help=batchhelp)
         return pars
 
     async def execStormCmd(self, runt, genr):
@@ -2007,14 +2480,25 @@ class DelNodeCmd(Cmd):
                 mesg = '--force requires admin privs.'
                 raise s_exc.AuthDeny(mesg=mesg)
 
+        if self.opts.batch is not None:
+
+            if self.opts.batch < 1:
+                mesg = '--batch must be greater than 0.'
+                raise s_exc.BadArg(mesg=mesg)
+
+            async for chunk in s_coro.chunks(genr, self.opts.batch):
+
+                for node, path in chunk:
+                    self._confirmNodeDel(runt, node)
+
+                await runt.snap.delNodes([node for node, path in chunk], force=self.opts.force)
+
+            return
+
         i = 0
         async for node, path in genr:
 
-            # make sure we can delete the tags...
-            for tag in node.tags.keys():
-                runt.layerConfirm(('node', 'tag', 'del', *tag.split('.')))
-
-            runt.layerConfirm(('node', 'del', node.form.name))
+            self._confirmNodeDel(runt, node)
 
             await node.delete(force=self.opts.force)
 
@@ -2027,6 +2511,14 @@ class DelNodeCmd(Cmd):
         if False:
             yield
 
+    def _confirmNodeDel(self, runt, node):
+
+        # make sure we can delete the tags...
+        for tag in node.tags.keys():
+            runt.layerConfirm(('node', 'tag', 'del', *tag.split('.')))
+
+        runt.layerConfirm(('node', 'del', node.form.name))
+
 class ReIndexCmd(Cmd):
     '''
     Use admin privileges to re index/normalize node properties.
@@ -2075,6 +2567,9 @@ class MoveTagCmd(Cmd):
     '''
     name = 'movetag'
 
+    # the number of nodes re-tagged per set of node edits
+    batchsize = 1000
+
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
         pars.add_argument('oldtag', help='The tag tree to rename.')
@@ -2134,31 +2629,31 @@ class MoveTagCmd(Cmd):
             retag[tagstr] = newtag
             await node.set('isnow', newtag)
 
-        # now we re-tag all the nodes...
+        # now we re-tag all the nodes using bulk node edits
         count = 0
-        async for node in snap.nodesByTag(oldstr):
 
-            count += 1
+        info = {'oldtag': oldstr, 'newtag': newstr, 'nodes': 0}
 
-            tags = list(node.tags.items())
-            tags.sort(reverse=True)
+        # report progress in the info of the top level task ( visible via ps )
+        synt = s_task.current()
+        if synt is not None:
+            while synt.root is not None:
+                synt = synt.root
+            synt.info['movetag'] = info
 
-            for name, valu in tags:
+        async for nodes in s_coro.chunks(snap.nodesByTag(oldstr), self.batchsize):
 
-                newt = retag.get(name)
-                if newt is None:
-                    continue
-
-                # Capture tagprop information before moving tags
-                tgfo = {tagp: node.getTagProp(name, tagp) for tagp in node.getTagProps(name)}
+            nodeedits = []
+            for node in nodes:
+                edits = await node.getRetagEdits(retag)
+                if edits:
+                    nodeedits.append((node.buid, node.form.name, edits))
 
-                # Move the tags
-                await node.delTag(name)
-                await node.addTag(newt, valu=valu)
+            if nodeedits:
+                await snap.applyNodeEdits(nodeedits)
 
-                # re-apply any captured tagprop data
-                for tagp, tagp_valu in tgfo.items():
-                    await node.setTagProp(newt, tagp, tagp_valu)
+            count += len(nodes)
+            info['nodes'] = count
 
         await snap.printf(f'moved tags on {count} nodes.')
 
@@ -2361,11 +2856,55 @@ class GraphCmd(Cmd):
         async for node, path in subg.run(runt, genr):
             yield node, path
 
+async def mergeGenrs(genrs, size=1):
+    '''
+    Consume async generators concurrently and yield their items as they are produced.
+
+    Args:
+        genrs (list): The async generators to consume.
+        size (int): The number of items which may be buffered before the generators wait.
+
+    Notes:
+        An exception raised by any of the generators is raised to the caller. Any
+        generators which are still running are cancelled when iteration stops.
+    '''
+    async with await s_base.Base.anit() as base:
+
+        outq = asyncio.Queue(maxsize=size)
+
+        async def produce(genr):
+            try:
+                async for item in genr:
+                    await outq.put((True, item))
+                await outq.put((False, None))
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                await outq.put((False, e))
+
+        for genr in genrs:
+            base.schedCoro(produce(genr))
+
+        todo = len(genrs)
+        while todo:
+
+            isitem, item = await outq.get()
+            if isitem:
+                yield item
+                continue
+
+            if item is not None:
+                raise item
+
+            todo -= 1
+
 class TeeCmd(Cmd):
     '''
     Execute multiple Storm queries on each node in the input stream, joining output streams together.
 
-    Commands are executed in order they are given.
+    Commands are executed in order they are given unless the --parallel option is used.
 
     Examples:
 
@@ -2375,6 +2914,9 @@ class TeeCmd(Cmd):
         # Also emit the inbound node
         inet:ipv4=1.2.3.4 | tee --join { -> * } { <- * }
 
+        # Run the queries for each node concurrently
+        inet:ipv4=1.2.3.4 | tee --parallel { -> * } { <- * }
+
     '''
     name = 'tee'
 
@@ -2384,6 +2926,9 @@ class TeeCmd(Cmd):
         pars.add_argument('--join', '-j', default=False, action='store_true',
                           help='Emit inbound nodes after processing storm queries.')
 
+        pars.add_argument('--parallel', '-p', default=False, action='store_true',
+                          help='Run the storm queries concurrently. Output order is not guaranteed.')
+
         pars.add_argument('query', nargs='*',
                           help='Specify a query to execute on the input nodes.')
 
@@ -2395,26 +2940,162 @@ class TeeCmd(Cmd):
             raise s_exc.StormRuntimeError(mesg='Tee command must take at least one query as input.',
                                           name=self.name)
 
+        texts = [text[1:-1] for text in self.opts.query]
+
         hasnodes = False
         async for node, path in genr:  # type: s_node.Node, s_node.Path
             hasnodes = True
-            for text in self.opts.query:
-                text = text[1:-1]
-                # This does update path with any vars set in the last npath (node.storm behavior)
-                async for nnode, npath in node.storm(text, user=runt.user, path=path):
+
+            # This does update path with any vars set in the last npath (node.storm behavior)
+            genrs = [node.storm(text, user=runt.user, path=path) for text in texts]
+
+            if self.opts.parallel:
+                async for nnode, npath in mergeGenrs(genrs, size=len(genrs)):
                     yield nnode, npath
 
+            else:
+                for subg in genrs:
+                    async for nnode, npath in subg:
+                        yield nnode, npath
+
             if self.opts.join:
                 yield node, path
 
         if not hasnodes:
-            for text in self.opts.query:
-                text = text[1:-1]
-                query = await runt.getStormQuery(text)
-                subr = await runt.getScopeRuntime(query)
-                async for nnode, npath in subr.iterStormQuery(query):
+
+            genrs = [self._runScopeQuery(runt, text) for text in texts]
+
+            if self.opts.parallel:
+                async for nnode, npath in mergeGenrs(genrs, size=len(genrs)):
+                    yield nnode, npath
+                return
+
+            for subg in genrs:
+                async for nnode, npath in subg:
                     yield nnode, npath
 
+    async def _runScopeQuery(self, runt, text):
+        query = await runt.getStormQuery(text)
+        subr = await runt.getScopeRuntime(query)
+        async for nnode, npath in subr.iterStormQuery(query):
+            yield nnode, npath
+
+class ParallelCmd(Cmd):
+    '''
+    Execute a storm query on the inbound nodes using concurrent pipelines.
+
+    Inbound nodes are fanned out to --size pipelines of the query so operations
+    which wait on remote services or telepath calls may overlap. By default
+    results are yielded as they are produced. The --ordered option yields the
+    results for each inbound node in the order the nodes were received.
+
+    Examples:
+
+        # Run up to 8 enrichment pipelines at once
+        inet:ipv4#todo | parallel --size 8 { $lib.import(enrich).lookup($node) }
+
+        # Keep the results grouped and ordered by inbound node
+        inet:fqdn | parallel --ordered { -> inet:dns:a }
+
+    Notes:
+        Variables set within the query are not shared between pipelines.
+    '''
+    name = 'parallel'
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+
+        pars.add_argument('--size', type=int, default=8,
+                          help='The number of concurrent pipelines to run.')
+
+        pars.add_argument('--ordered', default=False, action='store_true',
+                          help='Yield results in the order of the inbound nodes.')
+
+        pars.add_argument('query', help='The query to execute on the inbound nodes.')
+
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        if self.opts.size < 1:
+            mesg = 'The parallel --size option must be greater than 0.'
+            raise s_exc.BadArg(mesg=mesg, name=self.name)
+
+        query = await runt.getStormQuery(self.opts.query[1:-1])
+
+        if self.opts.ordered:
+            async for item in self._execOrdered(runt, query, genr):
+                yield item
+            return
+
+        # each pipeline pulls the next inbound node when it is ready for one
+        lock = asyncio.Lock()
+
+        async def pull():
+            while True:
+                async with lock:
+                    try:
+                        item = await genr.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield item
+
+        async def pipeline():
+            subr = await runt.getScopeRuntime(query)
+            async for item in subr.iterStormQuery(query, genr=pull()):
+                yield item
+
+        genrs = [pipeline() for i in range(self.opts.size)]
+        async for item in mergeGenrs(genrs, size=self.opts.size):
+            yield item
+
+    async def _execOrdered(self, runt, query, genr):
+
+        size = self.opts.size
+
+        async with await s_base.Base.anit() as base:
+
+            async def execute(item, outq):
+                try:
+                    subr = await runt.getScopeRuntime(query)
+                    async for subitem in subr.iterStormQuery(query, genr=s_common.agen(item)):
+                        await outq.put((True, subitem))
+                    await outq.put((False, None))
+
+                except asyncio.CancelledError:
+                    raise
+
+                except Exception as e:
+                    await outq.put((False, e))
+
+            async def drain(outq):
+                while True:
+
+                    isitem, subitem = await outq.get()
+                    if isitem:
+                        yield subitem
+                        continue
+
+                    if subitem is not None:
+                        raise subitem
+
+                    return
+
+            todo = collections.deque()
+            async for item in genr:
+
+                outq = asyncio.Queue(maxsize=size)
+                base.schedCoro(execute(item, outq))
+                todo.append(outq)
+
+                if len(todo) >= size:
+                    async for subitem in drain(todo.popleft()):
+                        yield subitem
+
+            while todo:
+                async for subitem in drain(todo.popleft()):
+                    yield subitem
+
 class TreeCmd(Cmd):
     '''
     Walk elements of a tree using a recursive pivot.
@@ -171,6 +171,39 @@ class Triggers:
                 for _, trig in globs.get(tag):
                     await trig.execute(node, vars=vars)
 
+    def hasPropSet(self, prop):
+        '''
+        Return True if a prop:set trigger exists for the given Prop().
+        '''
+        if self.propset.get(prop.full):
+            return True
+
+        return prop.univ is not None and bool(self.propset.get(prop.univ.full))
+
+    def hasTagAdd(self, form, tag):
+        '''
+        Return True if a tag:add trigger may run for the tag on a node of the given form.
+        '''
+        return self._hasTagTrig(self.tagadd, self.tagaddglobs, form, tag)
+
+    def hasTagDel(self, form, tag):
+        '''
+        Return True if a tag:del trigger may run for the tag on a node of the given form.
+        '''
+        return self._hasTagTrig(self.tagdel, self.tagdelglobs, form, tag)
+
+    def _hasTagTrig(self, trigs, globs, form, tag):
+
+        if trigs.get((form, tag)) or trigs.get((None, tag)):
+            return True
+
+        for name in (form, None):
+            tagglobs = globs.get(name)
+            if tagglobs is not None and tagglobs.get(tag):
+                return True
+
+        return False
+
     def load(self, tdef):
 
         trig = Trigger(self.view, tdef)
@@ -18,6 +18,9 @@ import synapse.lib.grammar as s_grammar
 
 logger = logging.getLogger(__name__)
 
+# default number of values kept by a type norm cache
+NORM_CACHE_SIZE = 10000
+
 class Type:
 
     _opt_defs = ()
@@ -50,6 +53,17 @@ class Type:
         self.opts.update(opts)
 
         self._type_norms = {}   # python type to norm function map str: _norm_str
+
+        # deterministic types may opt in to memoizing norm() results
+        self._norm_cache = None
+        self._norm_hits = 0
+        self._norm_miss = 0
+
+        normcache = self.info.get('normcache')
+        if normcache:
+            size = NORM_CACHE_SIZE if normcache is True else normcache
+            self._norm_cache = s_cache.LruDict(size)
+
         self._cmpr_ctors = {}   # cmpr string to filter function constructor map
         self._cmpr_ctor_lift = {} # if set, create a cmpr which is passed along with indx ops
 
@@ -287,13 +301,57 @@ class Type:
         Notes:
             The info dictionary uses the following key conventions:
                 subs (dict): The normalized sub-fields as name: valu entries.
+
+            If the type info sets "normcache", str and int values are
+            memoized and the cached (norm, info) tuple is returned.  Callers
+            must not modify the returned info dictionary.
         '''
-        func = self._type_norms.get(type(valu))
+        typo = type(valu)
+
+        if self._norm_cache is not None and (typo is str or typo is int):
+
+            key = (typo, valu)
+
+            retn = self._norm_cache.get(key)
+            if retn is not None:
+                self._norm_hits += 1
+                return retn
+
+            self._norm_miss += 1
+
+            retn = self._norm(typo, valu)
+            self._norm_cache[key] = retn
+            return retn
+
+        return self._norm(typo, valu)
+
+    def _norm(self, typo, valu):
+        func = self._type_norms.get(typo)
         if func is None:
-            raise s_exc.BadTypeValu(name=self.name, mesg='no norm for type: %r.' % (type(valu),))
+            raise s_exc.BadTypeValu(name=self.name, mesg='no norm for type: %r.' % (typo,))
 
         return func(valu)
 
+    def getNormCacheStats(self):
+        '''
+        Get the norm cache statistics for the type.
+
+        Returns:
+            (dict): The cache size, hits, misses, and hit rate or None if the type does not cache.
+        '''
+        if self._norm_cache is None:
+            return None
+
+        total = self._norm_hits + self._norm_miss
+
+        return {
+            'size': len(self._norm_cache),
+            'maxsize': self._norm_cache.maxsize,
+            'hits': self._norm_hits,
+            'misses': self._norm_miss,
+            'rate': self._norm_hits / total if total else 0.0,
+        }
+
     def repr(self, norm):
         '''
         Return a printable representation for the value.
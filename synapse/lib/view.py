@@ -8,6 +8,7 @@ import synapse.common as s_common
 
 import synapse.lib.coro as s_coro
 import synapse.lib.snap as s_snap
+import synapse.lib.layer as s_layer
 import synapse.lib.nexus as s_nexus
 import synapse.lib.config as s_config
 import synapse.lib.spooled as s_spooled
@@ -513,6 +514,52 @@ class View(s_nexus.Pusher):  # type: ignore
                     if splicecount % 1000 == 0:
                         await asyncio.sleep(0)
 
+    def hasEditTriggers(self, formname, edits):
+        '''
+        Return True if applying the edits to a node of the given form may run triggers or tag callbacks.
+        '''
+        form = self.core.model.form(formname)
+        if form is None: # pragma: no cover
+            return False
+
+        for etyp, parms, _ in edits:
+
+            if etyp in (s_layer.EDIT_PROP_SET, s_layer.EDIT_PROP_DEL):
+
+                prop = form.props.get(parms[0])
+                if prop is None: # pragma: no cover
+                    continue
+
+                view = self
+                while view is not None:
+                    if view.triggers.hasPropSet(prop):
+                        return True
+                    view = view.parent
+
+                continue
+
+            if etyp == s_layer.EDIT_TAG_SET:
+
+                tag = parms[0]
+                if self.core.ontagadds.get(tag) or self.core.ontagaddglobs.get(tag):
+                    return True
+
+                if self.triggers.hasTagAdd(formname, tag):
+                    return True
+
+                continue
+
+            if etyp == s_layer.EDIT_TAG_DEL:
+
+                tag = parms[0]
+                if self.core.ontagdels.get(tag) or self.core.ontagdelglobs.get(tag):
+                    return True
+
+                if self.triggers.hasTagDel(formname, tag):
+                    return True
+
+        return False
+
     async def runTagAdd(self, node, tag, valu):
 
         # Run the non-glob callbacks, then the glob callbacks
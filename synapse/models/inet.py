@@ -818,15 +818,18 @@ class InetModule(s_module.CoreModule):
                     }),
 
                     ('inet:email', 'synapse.models.inet.Email', {}, {
-                        'doc': 'An e-mail address.'}),
+                        'doc': 'An e-mail address.',
+                        'normcache': True}),
 
                     ('inet:fqdn', 'synapse.models.inet.Fqdn', {}, {
                         'doc': 'A Fully Qualified Domain Name (FQDN).',
-                        'ex': 'vertex.link'}),
+                        'ex': 'vertex.link',
+                        'normcache': True}),
 
                     ('inet:ipv4', 'synapse.models.inet.IPv4', {}, {
                         'doc': 'An IPv4 address.',
-                        'ex': '1.2.3.4'
+                        'ex': '1.2.3.4',
+                        'normcache': True,
                     }),
 
                     ('inet:ipv4range', 'synapse.models.inet.IPv4Range', {}, {
@@ -851,7 +854,8 @@ class InetModule(s_module.CoreModule):
 
                     ('inet:url', 'synapse.models.inet.Url', {}, {
                         'doc': 'A Universal Resource Locator (URL).',
-                        'ex': 'http://www.woot.com/files/index.html'
+                        'ex': 'http://www.woot.com/files/index.html',
+                        'normcache': True,
                     }),
 
                 ),
@@ -2744,6 +2744,84 @@ class CortexBasicTest(s_t_utils.SynTest):
 
             self.len(0, await core.nodes('test:cycle0=foo | delnode --force', opts=opts))
 
+    async def test_cortex_delnode_batch(self):
+
+        async with self.getTestCore() as core:
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            await core.nodes('[ inet:ipv4=1.2.3.0/28 :asn=10 +#bad.ingest:score=10 +#foo ]')
+            await core.nodes('inet:ipv4 [ +(refs)> { [ inet:fqdn=woot.com ] } ] $node.data.set(foo, bar)')
+
+            msgs = await core.stormlist('inet:ipv4 | delnode --batch 0')
+            self.stormIsInErr('--batch must be greater than 0', msgs)
+
+            nodes = await core.nodes('inet:ipv4 | delnode --batch 5')
+            self.len(0, nodes)
+
+            self.len(0, await core.nodes('inet:ipv4'))
+            self.len(0, await core.nodes('inet:ipv4:asn=10'))
+            self.len(0, await core.nodes('#bad.ingest'))
+            self.len(0, await core.nodes('#bad.ingest:score=10'))
+            self.len(0, await core.nodes('inet:fqdn=woot.com <(refs)- *'))
+            self.len(1, await core.nodes('inet:asn=10'))
+
+            # deleted nodes may be re-added without stale data
+            nodes = await core.nodes('[ inet:ipv4=1.2.3.1 ]')
+            self.none(nodes[0].get('asn'))
+            self.eq({}, nodes[0].tags)
+            self.none(await nodes[0].getData('foo'))
+
+            # references from outside the batch prevent deletion
+            await core.nodes('[ inet:dns:a=(woot.com, 1.2.3.1) ]')
+            with self.raises(s_exc.CantDelNode):
+                await core.nodes('inet:fqdn=woot.com inet:ipv4 | delnode --batch 10')
+
+            self.len(1, await core.nodes('inet:ipv4'))
+            self.len(0, await core.nodes('inet:fqdn=woot.com inet:ipv4 | delnode --batch 10 --force'))
+            self.len(0, await core.nodes('inet:ipv4'))
+
+            # references from within the batch do not
+            await core.nodes('[ test:cycle0=foo :cycle1=bar ]')
+            await core.nodes('[ test:cycle1=bar :cycle0=foo ]')
+
+            with self.raises(s_exc.CantDelNode):
+                await core.nodes('test:cycle0 | delnode --batch 10')
+
+            self.len(0, await core.nodes('test:cycle0 test:cycle1 | delnode --batch 10'))
+            self.len(0, await core.nodes('test:cycle0 test:cycle1'))
+
+            await core.nodes('[ test:str=foo +#lol ]')
+            with self.raises(s_exc.CantDelNode):
+                await core.nodes('syn:tag=lol | delnode --batch 10')
+
+            self.len(0, await core.nodes('syn:tag=lol test:str=foo | delnode --batch 10'))
+
+            with self.raises(s_exc.IsRuntForm):
+                await core.nodes('test:runt | delnode --batch 10')
+
+            # a tag node is kept if any tagged node is not in the batch
+            await core.nodes('[ inet:fqdn=a.com inet:fqdn=b.com inet:fqdn=c.com +#foo ]')
+
+            async with await core.snap() as snap:
+                snap.strict = False
+                nodes = [await snap.getNodeByNdef(('syn:tag', 'foo')), await snap.getNodeByNdef(('inet:fqdn', 'a.com'))]
+                dels = await snap.delNodes(nodes)
+                self.eq([('inet:fqdn', 'a.com')], [n.ndef for n in dels])
+
+            self.len(1, await core.nodes('syn:tag=foo'))
+            self.len(2, await core.nodes('#foo'))
+
+            # nodes referenced by a node in the batch which is kept are also kept
+            await core.nodes('[ inet:dns:a=(x.zzz, 1.2.3.4) ]')
+
+            async with await core.snap() as snap:
+                snap.strict = False
+                nodes = [await snap.getNodeByNdef(('inet:fqdn', 'x.zzz')), await snap.getNodeByNdef(('inet:fqdn', 'zzz'))]
+                self.len(0, await snap.delNodes(nodes))
+
+            self.len(1, await core.nodes('inet:fqdn=x.zzz :domain -> inet:fqdn'))
+
     async def test_cortex_cell_splices(self):
 
         async with self.getTestCore() as core:
@@ -3993,6 +4071,35 @@ class CortexBasicTest(s_t_utils.SynTest):
             await self.asyncraises(s_exc.BadTypeValu, prox.getTypeNorm('test:int', 'newp'))
             await self.asyncraises(s_exc.NoSuchType, prox.getTypeNorm('test:newp', 'newp'))
 
+            # getPropNorms / getTypeNorms stream a retn tuple per value
+            retn = await alist(core.getPropNorms('test:int', ['10', 'newp', 0x20]))
+            self.eq(retn[0], (True, (10, {})))
+            self.false(retn[1][0])
+            self.eq(retn[1][1][0], 'BadTypeValu')
+            self.eq(retn[2], (True, (0x20, {})))
+
+            async def genr():
+                yield ('1234', '1234')
+                yield ('newp', 'newp')
+
+            retn = await alist(core.getTypeNorms('test:comp', genr()))
+            self.eq(retn[0], (True, ((1234, '1234'), {'subs': {'hehe': 1234, 'haha': '1234'}, 'adds': []})))
+            self.eq(retn[1][1][0], 'BadTypeValu')
+
+            await self.agenraises(s_exc.NoSuchProp, core.getPropNorms('test:newp', ['newp']))
+            await self.agenraises(s_exc.NoSuchType, core.getTypeNorms('test:newp', ['newp']))
+
+            retn = await alist(prox.getPropNorms('test:str', [1234, 'hehe']))
+            self.eq(retn, ((True, ('1234', {})), (True, ('hehe', {}))))
+
+            retn = await alist(prox.getTypeNorms('test:int', ['newp', '5']))
+            self.false(retn[0][0])
+            self.eq(retn[0][1][0], 'BadTypeValu')
+            self.eq(retn[1], (True, (5, {})))
+
+            await self.agenraises(s_exc.NoSuchProp, prox.getPropNorms('test:newp', ['newp']))
+            await self.agenraises(s_exc.NoSuchType, prox.getTypeNorms('test:newp', ['newp']))
+
             # getPropNorm can norm sub props
             norm, info = await core.getPropNorm('test:str:tick', '3001')
             self.eq(norm, 32535216000000)
@@ -97,3 +97,36 @@ class DataModelTest(s_t_utils.SynTest):
 
             refs = core.model.form('test:comp').getRefsOut()
             self.len(1, refs['prop'])
+
+    async def test_datamodel_form_add_plan(self):
+        async with self.getTestCore() as core:
+
+            form = core.model.form('test:comp')
+
+            plan = form.getAddPlan()
+            self.true(plan is form.getAddPlan())
+            self.isin('hehe', plan)
+            self.notin('_ipv4', plan)
+
+            # subs of the prop value set the matching secondary props
+            subprops = core.model.form('inet:flow').getAddPlan()['src'][5]
+            self.eq(subprops['ipv4'][0], 'src:ipv4')
+            self.eq(subprops['port'][0], 'src:port')
+
+            await core.addFormProp('test:comp', '_ipv4', ('inet:ipv4', {}), {})
+
+            plan = form.getAddPlan()
+            proptype, stortype, isndef, arrayform, propform, subprops = plan['_ipv4']
+            self.eq(proptype.name, 'inet:ipv4')
+            self.eq(stortype, proptype.stortype)
+            self.false(isndef)
+            self.none(arrayform)
+            self.eq(propform.name, 'inet:ipv4')
+
+            self.len(1, await core.nodes('[ test:comp=(10, haha) :_ipv4=1.2.3.4 ]'))
+            self.len(1, await core.nodes('test:comp:_ipv4=1.2.3.4 -> inet:ipv4'))
+
+            await core.nodes('test:comp [ -:_ipv4 ]')
+            await core.delFormProp('test:comp', '_ipv4')
+
+            self.notin('_ipv4', form.getAddPlan())
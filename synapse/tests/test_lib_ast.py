@@ -1,9 +1,11 @@
 import json
+import unittest.mock as mock
 
 import synapse.exc as s_exc
 import synapse.common as s_common
 
 import synapse.lib.ast as s_ast
+import synapse.lib.node as s_node
 
 import synapse.tests.utils as s_test
 
@@ -1521,3 +1523,458 @@ class AstTest(s_test.SynTest):
             msgs = await core.stormlist('media:news | graph --no-edges')
             nodes = [m[1] for m in msgs if m[0] == 'node']
             self.len(0, nodes[0][1]['path']['edges'])
+
+    async def test_ast_plan(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 :asn=10 +#foo ]')
+            await core.nodes('[ inet:ipv4=5.6.7.8 :asn=20 ]')
+            await core.nodes('[ inet:ipv4=9.9.9.9 ]')
+            await core.nodes('[ inet:dns:a=(vertex.link, 5.6.7.8) ]')
+
+            with self.getLoggerStream('synapse.lib.ast', 'Storm query plan') as stream:
+                query = core.getStormQuery('inet:ipv4 +:asn=10')
+                self.true(stream.wait(1))
+
+            self.isinstance(query.kids[0], s_ast.LiftPropBy)
+            self.isinstance(query.kids[1], s_ast.FiltOper)
+
+            nodes = await core.nodes('inet:ipv4 +:asn=10')
+            self.eq([('inet:ipv4', 0x01020304)], [n.ndef for n in nodes])
+
+            nodes = await core.nodes('inet:ipv4 +:asn>=15')
+            self.eq([('inet:ipv4', 0x05060708)], [n.ndef for n in nodes])
+
+            nodes = await core.nodes('inet:ipv4 +:asn*range=(5, 15) +#foo')
+            self.eq([('inet:ipv4', 0x01020304)], [n.ndef for n in nodes])
+
+            # an equality filter wins over a range filter
+            query = core.getStormQuery('inet:ipv4 +:asn>5 +:loc=us')
+            self.eq('=', query.kids[0].kids[1].value())
+
+            query = core.getStormQuery('inet:ipv4 +(#foo and :asn=10)')
+            self.isinstance(query.kids[0], s_ast.LiftPropBy)
+            self.len(1, await core.nodes('inet:ipv4 +(#foo and :asn=10)'))
+            self.len(1, await core.nodes('inet:ipv4 +(:asn>10 or #foo) -#foo'))
+
+            # a tag filter is preferred over a range filter
+            query = core.getStormQuery('inet:ipv4 +#foo +:asn>5')
+            self.isinstance(query.kids[0], s_ast.LiftProp)
+
+            # the filter still applies to inbound nodes
+            opts = {'ndefs': (('inet:ipv4', 0x09090909), ('inet:ipv4', 0x01020304))}
+            nodes = await core.nodes('inet:ipv4 +:asn=20', opts=opts)
+            self.eq([('inet:ipv4', 0x05060708)], [n.ndef for n in nodes])
+
+            # not pushed down
+            for text in ('inet:ipv4 +:asn=$x', 'inet:ipv4 -:asn=10', 'inet:ipv4 +:asn*in=(10, 20)', 'inet:ipv4 +:asn::newp=1'):
+                query = core.getStormQuery(text)
+                self.isinstance(query.kids[0], s_ast.LiftProp)
+
+            # cheap filters run before subquery filters
+            query = core.getStormQuery('inet:ipv4 +{ -> inet:dns:a } +#foo')
+            self.isinstance(query.kids[1].kids[1], s_ast.TagCond)
+            self.isinstance(query.kids[2].kids[1], s_ast.SubqCond)
+
+            nodes = await core.nodes('inet:ipv4 +{ -> inet:dns:a } +:asn=20')
+            self.eq([('inet:ipv4', 0x05060708)], [n.ndef for n in nodes])
+
+            # unless the subquery may have side effects
+            query = core.getStormQuery('inet:ipv4 +{ [ +#bar ] } +#bar')
+            self.isinstance(query.kids[1].kids[1], s_ast.SubqCond)
+            self.len(3, await core.nodes('inet:ipv4 +{ [ +#bar ] } +#bar'))
+
+    async def test_ast_lift_limit(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.0/26 +#foo ]')
+            await core.nodes('[ test:arrayprop=* :ints=(1, 2) ] [ test:arrayprop=* :ints=(2, 3) ]')
+
+            query = core.getStormQuery('inet:fqdn inet:ipv4 | limit 10')
+            self.eq(10, query.kids[0].limit)
+            self.eq(10, query.kids[1].limit)
+
+            msgs = await core.stormlist('inet:ipv4 | limit 10', opts={'explain': True})
+            self.stormIsInPrint('limit=10', msgs)
+
+            # not pushed down past filters or for computed limits
+            for text in ('inet:ipv4 +#foo | limit 10', 'inet:ipv4 | limit $x', 'inet:ipv4 | limit 0'):
+                query = core.getStormQuery(text)
+                self.none(query.kids[0].limit)
+
+            ipv4s = [n.ndef for n in await core.nodes('inet:ipv4')]
+
+            nodes = await core.nodes('inet:ipv4 | limit 10')
+            self.eq(ipv4s[:10], [n.ndef for n in nodes])
+
+            nodes = await core.nodes('inet:ipv4*range=(1.2.3.20, 1.2.3.40) | limit 3')
+            self.eq(ipv4s[20:23], [n.ndef for n in nodes])
+
+            self.len(5, await core.nodes('#foo | limit 5'))
+            self.len(5, await core.nodes('inet:ipv4#foo | limit 5'))
+            self.len(1, await core.nodes('test:arrayprop:ints*[=2] | limit 1'))
+
+            # inbound nodes are counted against the limit
+            nodes = await core.nodes('inet:ipv4=1.2.3.63 inet:ipv4 | limit 2')
+            self.eq([('inet:ipv4', 0x0102033f), ipv4s[0]], [n.ndef for n in nodes])
+
+            # lifts across multiple layers retain their order
+            view = await core.view.fork()
+            opts = {'view': view['iden']}
+
+            await core.nodes('[ inet:ipv4=1.2.3.1 :asn=10 ] [ inet:ipv4=0.0.0.1 ]', opts=opts)
+
+            nodes = await core.nodes('inet:ipv4 | limit 3', opts=opts)
+            self.eq([('inet:ipv4', 1)] + ipv4s[:2], [n.ndef for n in nodes])
+            self.eq(10, nodes[2].get('asn'))
+
+            async with await core.snap(view=core.getView(view['iden'])) as snap:
+                nodes = [n async for n in snap.nodesByProp('inet:ipv4', limit=1)]
+                self.eq([('inet:ipv4', 1)], [n.ndef for n in nodes])
+
+    async def test_ast_subq_memo(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:dns:a=(vertex.link, 1.2.3.4) inet:dns:a=(woot.com, 1.2.3.4) ]')
+            await core.nodes('[ inet:dns:a=(foo.com, 1.2.3.4) inet:dns:a=(bar.com, 5.6.7.8) ]')
+
+            query = core.getStormQuery('inet:ipv4 +{ -> inet:dns:a +:fqdn=$fqdn }')
+            subq = query.kids[1].kids[1]
+            self.true(subq.pure)
+            self.eq(('fqdn',), subq.varnames)
+
+            query = core.getStormQuery('inet:ipv4 +{ [ +#foo ] }')
+            self.false(query.kids[1].kids[1].pure)
+
+            sizes = []
+            getPivotSize = s_ast.SubqCond._getPivotSize
+
+            async def getsize(self, runt, node, path, maxsize):
+                size = await getPivotSize(self, runt, node, path, maxsize)
+                sizes.append(size)
+                return size
+
+            with mock.patch.object(s_ast.SubqCond, '_getPivotSize', getsize):
+
+                # counted from the index once per distinct node
+                nodes = await core.nodes('inet:dns:a -> inet:ipv4 +{ -> inet:dns:a } >= 2')
+                self.len(3, nodes)
+                self.sorteq([1, 2], sizes)
+
+                sizes.clear()
+                self.len(2, await core.nodes('inet:ipv4 +{ -> inet:dns:a }'))
+                self.len(1, await core.nodes('inet:ipv4 +{ -> inet:dns:a } = 3'))
+                self.len(1, await core.nodes('inet:ipv4 +{ -> inet:dns:a } < 2'))
+                self.len(0, await core.nodes('inet:ipv4 +{ -> inet:dns:a } > 3'))
+                self.len(2, await core.nodes('inet:ipv4 +{ -> inet:dns:a } <= 3'))
+                self.len(1, await core.nodes('inet:ipv4 +{ -> inet:dns:a } != 1'))
+                self.notin(None, sizes)
+
+                # referenced variables are part of the memo key
+                sizes.clear()
+                nodes = await core.nodes('inet:dns:a $fqdn=:fqdn -> inet:ipv4 +{ -> inet:dns:a +:fqdn=$fqdn } = 1')
+                self.len(4, nodes)
+                self.eq([None, None, None, None], sizes)
+
+                # edits made by the query invalidate memoized results
+                await core.nodes('[ inet:fqdn=newp.com ]')
+                q = '''
+                inet:fqdn=newp.com inet:fqdn=newp.com
+                +{ -> inet:dns:a } = 0
+                { [ inet:dns:a=(newp.com, 1.1.1.1) ] }
+                '''
+                self.len(1, await core.nodes(q))
+
+                # views with multiple layers run the subquery
+                view = await core.view.fork()
+                opts = {'view': view['iden']}
+
+                sizes.clear()
+                await core.nodes('[ inet:dns:a=(visi.com, 1.2.3.4) ]', opts=opts)
+                self.len(1, await core.nodes('inet:ipv4=1.2.3.4 +{ -> inet:dns:a } = 4', opts=opts))
+                self.len(0, await core.nodes('inet:ipv4=1.2.3.4 +{ -> inet:dns:a } = 4'))
+                self.eq([None, 3], sizes)
+
+    async def test_ast_filt_compiled(self):
+
+        async with self.getTestCore() as core:
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            await core.nodes('[ test:int=1 :int2=10 +#foo:score=10 ]')
+            await core.nodes('[ test:type10=* :int2=20 +#foo:score=20 ]')
+            await core.nodes('[ test:arrayprop=* :ints=(1, 2, 3) ]')
+            await core.nodes('[ test:arrayprop=* :ints=(4, 5) ]')
+
+            self.len(2, await core.nodes('test:int test:type10 +:int2>5'))
+            self.len(1, await core.nodes('test:int test:type10 +:int2>15'))
+            self.len(1, await core.nodes('test:int test:type10 +#foo:score>=15'))
+            self.len(1, await core.nodes('test:arrayprop +:ints*[=2]'))
+            self.len(2, await core.nodes('test:arrayprop +:ints*[>1]'))
+            self.len(1, await core.nodes('test:int +test:int:int2=10'))
+            self.len(1, await core.nodes('test:int test:type10 +test:int=1'))
+            self.len(1, await core.nodes('test:int test:type10 +(:int2>15 and #foo)'))
+
+            # non-constant values are still computed per node
+            q = 'test:int test:type10 $x=:int2 +#foo:score=$x'
+            self.len(2, await core.nodes(q))
+
+            with self.raises(s_exc.NoSuchProp):
+                await core.nodes('test:int +:newp=10')
+
+            with self.raises(s_exc.NoSuchCmpr):
+                await core.nodes('test:int +:int2@=10')
+
+            # filters within a subquery are compiled once per runtime
+            query = core.getStormQuery('test:int test:type10 +{ +:int2=10 }')
+            filt = query.kids[2].kids[1].kids[0].kids[0]
+            self.isinstance(filt, s_ast.FiltOper)
+
+            async with await core.snap() as snap:
+                with snap.getStormRuntime() as runt:
+
+                    nodes = [n async for n in runt.iterStormQuery(query)]
+                    self.eq([('test:int', 1)], [n[0].ndef for n in nodes])
+
+                    self.true(filt.condcache[0] is runt)
+                    cond = filt.condcache[1]
+                    self.true(cond is await filt.getCondEval(runt))
+
+    async def test_ast_pivot_batch(self):
+
+        async with self.getTestCore() as core:
+
+            q = '[ inet:dns:a=(vertex.link, 1.2.3.4) inet:dns:a=(woot.com, 1.2.3.4) inet:dns:a=(woot.com, 5.6.7.8) ]'
+            await core.nodes(q)
+            await core.nodes('[ inet:ipv4=9.9.9.9 (test:str=foo :bar=(inet:ipv4, 1.2.3.4)) ]')
+
+            def ndefs(nodes):
+                return list(sorted(n.ndef for n in nodes))
+
+            with mock.patch('synapse.lib.ast.PIVOT_WINDOW', 2):
+
+                # duplicate target values yield one pivot per inbound node
+                nodes = await core.nodes('inet:dns:a -> inet:ipv4')
+                self.eq(ndefs(nodes), (('inet:ipv4', 0x01020304), ('inet:ipv4', 0x01020304), ('inet:ipv4', 0x05060708)))
+
+                nodes = await core.nodes('inet:dns:a :ipv4 -> inet:ipv4')
+                self.eq(ndefs(nodes), (('inet:ipv4', 0x01020304), ('inet:ipv4', 0x01020304), ('inet:ipv4', 0x05060708)))
+
+                nodes = await core.nodes('inet:dns:a :ipv4 -> *')
+                self.len(3, nodes)
+
+                nodes = await core.nodes('inet:dns:a -> *')
+                self.len(6, nodes)
+
+                nodes = await core.nodes('inet:ipv4 -> inet:dns:a')
+                self.len(3, nodes)
+
+                nodes = await core.nodes('inet:ipv4 -> inet:dns:a:ipv4')
+                self.len(3, nodes)
+
+                nodes = await core.nodes('inet:fqdn=woot.com -> inet:dns:a:fqdn')
+                self.len(2, nodes)
+
+                nodes = await core.nodes('test:str :bar -> *')
+                self.eq(ndefs(nodes), (('inet:ipv4', 0x01020304),))
+
+                nodes = await core.nodes('inet:ipv4 -> test:str:bar')
+                self.eq(ndefs(nodes), (('test:str', 'foo'),))
+
+                # each pivot path is forked from its own inbound node
+                msgs = await core.stormlist('inet:dns:a $fqdn=:fqdn -> inet:ipv4 $lib.fire(pivo, fqdn=$fqdn, ipv4=$node.repr())')
+                pivs = [(m[1]['data']['fqdn'], m[1]['data']['ipv4']) for m in msgs if m[0] == 'storm:fire']
+                self.eq(list(sorted(pivs)), (('vertex.link', '1.2.3.4'), ('woot.com', '1.2.3.4'), ('woot.com', '5.6.7.8')))
+
+                # joins keep each inbound node with its pivots
+                nodes = await core.nodes('inet:dns:a -+> inet:ipv4')
+                self.len(6, nodes)
+                for i in range(0, 6, 2):
+                    self.eq(nodes[i].ndef[0], 'inet:dns:a')
+                    self.eq(nodes[i + 1].ndef, ('inet:ipv4', nodes[i].get('ipv4')))
+
+            # pivots do not pull inbound nodes through edits ahead of a limit
+            await core.nodes('[ inet:ipv4=10.0.0.0/28 :asn=10 ]')
+
+            nodes = await core.nodes('inet:ipv4=10.0.0.0/28 [ +#foo ] -> inet:asn | limit 1')
+            self.len(1, nodes)
+            self.len(1, await core.nodes('inet:ipv4#foo'))
+
+            msgs = await core.stormlist('inet:ipv4=10.0.0.0/28 $lib.fire(pulled) -> inet:asn | limit 1')
+            self.len(1, [m for m in msgs if m[0] == 'storm:fire'])
+
+            # nodes from a pure storm command pipeline are not pulled ahead either
+            await core.setStormCmd({'name': 'toasn', 'storm': '-> inet:asn'})
+            nodes = await core.nodes('inet:ipv4=10.0.0.0/28 [ +#baz ] | toasn | limit 1')
+            self.len(1, nodes)
+            self.len(1, await core.nodes('inet:ipv4#baz'))
+
+            # pure inbound nodes are still batched
+            query = core.getStormQuery('inet:ipv4 -> inet:asn')
+            self.true(query.kids[1].hasPureInput())
+
+            query = core.getStormQuery('inet:ipv4 [ +#foo ] -> inet:asn')
+            self.false(query.kids[-1].hasPureInput())
+
+    async def test_ast_path_elide(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:dns:a=(vertex.link, 1.2.3.4) inet:dns:a=(woot.com, 1.2.3.4) ]')
+
+            self.false(core.getStormQuery('inet:fqdn -> inet:dns:a :ipv4 -> inet:ipv4 +:type=unicast').usespath)
+            self.false(core.getStormQuery('inet:fqdn +{ -> inet:dns:a } [ +#foo ]').usespath)
+            self.true(core.getStormQuery('inet:fqdn $x=$node.value()').usespath)
+            self.true(core.getStormQuery('inet:fqdn | limit 1').usespath)
+            self.true(core.getStormQuery('inet:fqdn +{ $lib.print($node) }').usespath)
+
+            async with await core.snap() as snap:
+
+                items = [item async for item in snap.storm('inet:fqdn -> inet:dns:a :ipv4 -> inet:ipv4')]
+                self.len(2, items)
+                for node, path in items:
+                    self.isinstance(path, s_node.LitePath)
+                    self.eq(node, path.node)
+                    self.eq(path.vars, path.fork(node).vars)
+
+                items = [item async for item in snap.storm('inet:fqdn=woot.com $x=1 -> inet:dns:a')]
+                self.false(isinstance(items[0][1], s_node.LitePath))
+
+            # relative props and edits use the node of each path
+            nodes = await core.nodes('inet:dns:a [ :ipv4=:ipv4 +#foo ] -> inet:fqdn')
+            self.eq(['vertex.link', 'woot.com'], list(sorted(n.ndef[1] for n in nodes)))
+
+            # path tracking and graph modes retain full paths
+            msgs = await core.stormlist('inet:fqdn=woot.com -> inet:dns:a', opts={'path': True})
+            podes = [m[1] for m in msgs if m[0] == 'node']
+            self.len(2, podes[0][1]['path']['nodes'])
+
+            msgs = await core.stormlist('inet:fqdn=woot.com -> inet:dns:a', opts={'graph': True})
+            podes = [m[1] for m in msgs if m[0] == 'node']
+            self.true(podes)
+            for pode in podes:
+                self.nn(pode[1]['path'].get('edges'))
+
+    async def test_ast_edit_block(self):
+
+        async with self.getTestCore() as core:
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            text = 'inet:ipv4 [ +#foo :asn=10 ] $x=1 [ -#foo (inet:asn=10 :name=x +#bar) +#baz ] | limit 3'
+            query = core.getStormQuery(text)
+            self.isinstance(query.kids[1], s_ast.EditBlock)
+            self.len(2, query.kids[1].kids)
+            self.isinstance(query.kids[3], s_ast.EditBlock)
+            self.isinstance(query.kids[4], s_ast.EditParens)
+            self.isinstance(query.kids[4].kids[1], s_ast.EditBlock)
+            self.isinstance(query.kids[5], s_ast.EditBlock)
+            self.eq(1, query.kids[1].limit)
+            self.eq(1, query.kids[3].limit)
+            self.eq(3, query.kids[5].limit)
+
+            query = core.getStormQuery('inet:ipv4 [ +#foo ] +#foo [ -#foo ]')
+            self.none(query.kids[1].limit)
+            self.none(query.kids[3].limit)
+
+            await core.nodes('[ inet:ipv4=1.2.3.0/28 ]')
+
+            stors = []
+            layr = core.getLayer()
+            storNodeEdits = layr.storNodeEdits
+
+            async def storedits(nodeedits, meta):
+                stors.append(nodeedits)
+                return await storNodeEdits(nodeedits, meta)
+
+            layr.storNodeEdits = storedits
+
+            edits = []
+            async with await core.snap() as snap:
+
+                async def onedits(mesg):
+                    edits.append(mesg[1]['edits'])
+
+                snap.on('node:edits', onedits)
+
+                query = 'inet:ipv4 [ +#foo :asn=10 .seen=2020 +#foo:score=20 ] [ :loc=$lib.str.format("as{n}", n=$node.props.asn) ]'
+                nodes = [node async for node, path in snap.storm(query)]
+
+            self.len(16, nodes)
+            for node in nodes:
+                self.eq(10, node.get('asn'))
+                self.eq('as10', node.get('loc'))
+                self.eq(20, node.getTagProp('foo', 'score'))
+
+            # the edits to windows of nodes are stored together
+            self.eq([2, 4, 8], [len(e) for e in stors if len(e) > 1])
+            self.isin(8, [len(e) for e in edits])
+            self.len(16, await core.nodes('inet:asn=10 -> inet:ipv4 +#foo:score=20'))
+
+            # nodes beyond a limit are not edited
+            stors.clear()
+            self.len(2, await core.nodes('inet:ipv4 [ -#foo ] | limit 2'))
+            self.len(14, await core.nodes('#foo'))
+            self.len(1, stors)
+
+            self.len(3, await core.nodes('#foo [ -#foo ]', opts={'limit': 3}))
+            self.len(11, await core.nodes('#foo'))
+
+            # edits from before an error are kept
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4=1.2.3.4 [ +#bar :asn=newp ]')
+            self.len(1, await core.nodes('#bar'))
+
+            # buffered edits are stored before any other node edits
+            async with await core.snap() as snap:
+
+                node = await snap.getNodeByNdef(('inet:ipv4', 0x01020304))
+
+                async with snap.bufferNodeEdits():
+                    await node.addTag('baz')
+                    self.nn(node.getTag('baz'))
+                    self.len(0, await core.nodes('#baz'))
+
+                    await node.setData('foo', 'bar')
+                    self.len(1, await core.nodes('#baz'))
+
+            # nodes which a later operator may never consume are not edited
+            await core.nodes('[ inet:ipv4=1.2.4.0/28 ]')
+
+            self.len(4, await core.nodes('inet:ipv4=1.2.4.0/28 [ +#lim ] +inet:ipv4 | limit 4'))
+            self.len(4, await core.nodes('#lim'))
+
+            self.len(5, await core.nodes('inet:ipv4=1.2.4.0/28 [ +#uniq ] | uniq | limit 5'))
+            self.len(5, await core.nodes('#uniq'))
+
+            self.len(2, await core.nodes('inet:ipv4=1.2.4.0/28 [ +#lim2 ] | limit 4 | limit 2'))
+            self.len(2, await core.nodes('#lim2'))
+
+            self.len(3, await core.nodes('inet:ipv4=1.2.4.0/28 [ +#optlim ] +inet:ipv4', opts={'limit': 3}))
+            self.len(3, await core.nodes('#optlim'))
+
+            self.len(1, await core.nodes('inet:ipv4=1.2.4.0/28 { [ +#subq ] } | limit 1'))
+            self.len(1, await core.nodes('#subq'))
+
+            await core.setStormCmd({'name': 'tagsome', 'storm': '[ +#tagsome ]'})
+            self.len(3, await core.nodes('inet:ipv4=1.2.4.0/28 | tagsome | limit 3'))
+            self.len(3, await core.nodes('#tagsome'))
+
+            with mock.patch('synapse.lib.ast.EDIT_WINDOW', 4):
+                self.len(10, await core.nodes('inet:ipv4=1.2.4.0/28 [ +#biglim ] | limit 10'))
+                self.len(10, await core.nodes('#biglim'))
+
+            # edits which may fire triggers are not reordered by buffering
+            tdef = {'cond': 'tag:add', 'tag': 'trig', 'form': 'inet:ipv4', 'storm': '[ :asn=20 ]'}
+            await core.view.addTrigger(tdef)
+
+            tdef = {'cond': 'prop:set', 'prop': 'inet:ipv4:asn', 'storm': '[ +#asnset ]'}
+            await core.view.addTrigger(tdef)
+
+            nodes = await core.nodes('[ inet:ipv4=1.2.3.5 ] [ +#trig :asn=10 ]')
+            self.len(1, nodes)
+            self.eq(10, nodes[0].get('asn'))
+            self.len(1, await core.nodes('inet:ipv4=1.2.3.5 +:asn=10 +#asnset'))
@@ -54,6 +54,16 @@ class CoroTest(s_t_utils.SynTest):
         self.none(await woot().spin())
         self.eq([1, 2, 3], await woot().list())
 
+    async def test_coro_chunks(self):
+
+        async def agen():
+            for i in range(5):
+                yield i
+
+        self.eq([[0, 1], [2, 3], [4]], [c async for c in s_coro.chunks(agen(), 2)])
+        self.eq([[0, 1, 2]], [c async for c in s_coro.chunks(range(3), 3)])
+        self.eq([], [c async for c in s_coro.chunks(range(0), 3)])
+
     async def test_executor(self):
 
         def func(*args, **kwargs):
@@ -5,8 +5,10 @@ import contextlib
 
 import synapse.exc as s_exc
 import synapse.common as s_common
+import synapse.cortex as s_cortex
 import synapse.telepath as s_telepath
 
+import synapse.lib.gis as s_gis
 import synapse.lib.time as s_time
 import synapse.lib.layer as s_layer
 import synapse.lib.msgpack as s_msgpack
@@ -908,6 +910,317 @@ class LayerTest(s_t_utils.SynTest):
             self.false(await layr.hasTagProp('score'))
             nodes = await core.nodes('[test:str=bar +#test:score=100]')
 
+    async def test_layer_getstornodes(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.getLayer()
+
+            nodes = await core.nodes('[ inet:ipv4=1.2.3.4 :asn=10 +#foo inet:ipv4=5.6.7.8 ]')
+            buid0, buid1 = nodes[0].buid, nodes[1].buid
+            newp = s_common.buid(('inet:ipv4', 0))
+
+            layr.buidcache.clear()
+
+            sodes = await layr.getStorNodes((buid1, newp, buid0, buid1))
+            self.eq((buid1, newp, buid0, buid1), [s[0] for s in sodes])
+
+            self.eq(('inet:ipv4', 0x05060708), sodes[0][1]['ndef'])
+            self.none(sodes[1][1].get('ndef'))
+            self.eq(('inet:ipv4', 0x01020304), sodes[2][1]['ndef'])
+            self.eq(10, sodes[2][1]['props']['asn'])
+            self.eq((None, None), sodes[2][1]['tags']['foo'])
+
+            self.eq(sodes[2], await layr.getStorNode(buid0))
+            self.eq([], await layr.getStorNodes(()))
+
+            # lifts larger than a single window
+            await core.nodes('$x = 0 while $($x < 300) { [ inet:ipv4=$x +#bar ] $x = $($x + 1) }')
+            self.len(300, await core.nodes('#bar'))
+            self.len(302, await core.nodes('inet:ipv4'))
+
+    async def test_layer_buidfilt(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.true(layr.buidfilt.isready())
+
+                nodes = await core.nodes('[ inet:ipv4=1.2.3.4 ]')
+                buid = nodes[0].buid
+                self.true(layr.buidfilt.has(buid))
+
+                vdef2 = await core.view.fork()
+                view2 = core.getView(vdef2.get('iden'))
+                layr2 = view2.layers[0]
+
+                # the fork layer does not hold the node until it is edited
+                self.false(layr2.buidfilt.has(buid))
+                self.len(1, await view2.nodes('inet:ipv4=1.2.3.4'))
+
+                await view2.nodes('inet:ipv4=1.2.3.4 [ +#foo ]')
+                self.true(layr2.buidfilt.has(buid))
+                self.eq((None, None), (await layr2.getStorNode(buid))[1]['tags']['foo'])
+
+                # a layer without a filter builds it on startup
+                await core.nodes('[ inet:ipv4=5.6.7.8 ]')
+                layr.buidfilt.reset(1)
+                layr.buidfilt.sync()
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.true(layr.buidfilt.isready())
+                self.false(layr.buidfilt.isfull())
+
+                self.len(2, await core.nodes('inet:ipv4'))
+                self.len(1, await core.nodes('inet:ipv4=5.6.7.8'))
+
+    async def test_layer_tagival(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.true(layr.hastagivals)
+
+                await core.nodes('[ test:str=a +#foo=(2019, 2020) ]')
+                await core.nodes('[ test:str=b +#foo=(2020, 2021) ]')
+                await core.nodes('[ test:str=c +#foo ]')
+                await core.nodes('[ test:int=10 +#foo=(2015, 2022) ]')
+
+                # results are in interval order
+                nodes = await core.nodes('#foo@=2020')
+                self.eq((10, 'b'), [n.ndef[1] for n in nodes])
+
+                nodes = await core.nodes('test:str#foo@=(2019, 2020)')
+                self.eq(('a',), [n.ndef[1] for n in nodes])
+
+                self.len(0, await core.nodes('#foo@=2023'))
+                self.len(3, await core.nodes('#foo@=(2015, 2030)'))
+
+                # tag updates and deletes maintain the index
+                await core.nodes('test:str=a [ +#foo=2025 ]')
+                nodes = await core.nodes('#foo@=2020')
+                self.eq((10, 'a', 'b'), [n.ndef[1] for n in nodes])
+
+                await core.nodes('test:str=b [ -#foo ]')
+                await core.nodes('test:str=c [ +#foo=2020 ]')
+                nodes = await core.nodes('#foo@=2020')
+                self.eq((10, 'a', 'c'), [n.ndef[1] for n in nodes])
+
+                ival = core.model.type('ival').norm('2020')[0]
+                sodes = await alist(layr.liftByTagValu('foo', '=', ival))
+                self.eq([('test:str', 'c')], [s[1]['ndef'] for s in sodes])
+
+                # remove the index to test populating it for older layers
+                layr.layrslab.dropdb('bytagival')
+                layr.layrslab.delete(b'tagivals', db=layr.countdb)
+
+            async with self.getTestCore(dirn=dirn) as core:
+                nodes = await core.nodes('#foo@=2020')
+                self.eq((10, 'a', 'c'), [n.ndef[1] for n in nodes])
+
+    async def test_layer_latlong_zorder(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+
+                points = [(lat, lon) for lat in range(-90, 91, 15) for lon in range(-165, 181, 15)]
+                points.extend([(34.1185, -118.3003), (34.1186, -118.3004), (0.0, 179.999), (0.0, -179.999)])
+
+                for lat, lon in points:
+                    opts = {'vars': {'lat': lat, 'lon': lon}}
+                    await core.nodes('[ geo:place=* :latlong=($lat, $lon) ]', opts=opts)
+
+                async def check(lat, lon, dist):
+                    opts = {'vars': {'lat': lat, 'lon': lon, 'dist': dist}}
+                    nodes = await core.nodes('geo:place:latlong*near=(($lat, $lon), $dist)', opts=opts)
+                    radius = core.model.type('geo:dist').norm(dist)[0]
+                    expect = [p for p in points if s_gis.haversine((lat, lon), p) <= radius]
+                    self.sorteq(expect, [n.get('latlong') for n in nodes])
+                    return len(expect)
+
+                self.eq(2, await check(34.1185, -118.3003, '50m'))
+                self.eq(3, await check(0, 180, '10km'))
+                self.eq(24, await check(90, 0, '10km'))
+                self.eq(24, await check(-89.9, 0, '100km'))
+                self.ge(await check(30, 30, '2000km'), 4)
+                self.eq(len(points), await check(0, 0, '30000km'))
+
+                # convert the index back to lon/lat order to test re-indexing older layers
+                latlon = layr.stortypes[s_layer.STOR_TYPE_LATLONG]
+                abrv = layr.getPropAbrv('geo:place', 'latlong')
+                for lkey, buid in list(layr.layrslab.scanByPref(abrv, db=layr.byprop)):
+                    latlong = await layr.getNodeValu(buid, 'latlong')
+                    layr.layrslab.delete(lkey, buid, db=layr.byprop)
+                    layr.layrslab.put(abrv + latlon._getLonLatIndx(latlong), buid, db=layr.byprop)
+
+                layr.layrslab.delete(b'zorderlatlong', db=layr.countdb)
+
+            async with self.getTestCore(dirn=dirn) as core:
+                self.eq(2, await check(34.1185, -118.3003, '50m'))
+                self.len(1, await core.nodes('geo:place:latlong=(0, 179.999)'))
+
+    async def test_layer_trigrams(self):
+
+        self.eq({b'foo', b'bar'}, s_layer.StorTypeUtf8.getRegxTrigrams('^foo.*bar'))
+        self.eq({b'oob', b'oba', b'bar', b'foo'}, s_layer.StorTypeUtf8.getRegxTrigrams('foobar'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('foo|bar'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('(?i)foobar'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('fo+'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('[newp'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('(?:foobar){e<=1}'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('\\x41bcd'))
+        self.none(s_layer.StorTypeUtf8.getRegxTrigrams('(foo'))
+        self.eq({b'foo', b'oob', b'oba'}, s_layer.StorTypeUtf8.getRegxTrigrams('foobar{e<=1}'))
+        self.eq({b'foo', b'qux'}, s_layer.StorTypeUtf8.getRegxTrigrams('foo(bar|baz)qux'))
+        self.eq({b'.ex', b'exe'}, s_layer.StorTypeUtf8.getRegxTrigrams('\\p{L}[a-z]*\\.exe$'))
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                await core.nodes('[ test:str=foobar :hehe=visi.exe ]')
+                await core.nodes('[ test:str=bazfaz :hehe=calc.exe ]')
+
+                layr = core.getLayer()
+                self.none(layr.iterTrigramBuids(None, 'foo'))
+
+                await layr.layrinfo.set('trigrams', ('test:str', 'test:str:hehe'))
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.eq(('test:str', 'test:str:hehe'), sorted(layr.trigramabrvs.keys()))
+
+                await core.nodes('[ test:str=fooqux :hehe=notepad.exe ]')
+
+                liftby = s_layer.IndxByForm(layr, 'test:str')
+                self.len(2, list(layr.iterTrigramBuids(liftby, 'foo')))
+                self.none(layr.iterTrigramBuids(liftby, 'fo'))
+
+                self.eq({'foobar', 'fooqux'}, {n.ndef[1] for n in await core.nodes('test:str~=foo')})
+                self.eq(['foobar'], [n.ndef[1] for n in await core.nodes('test:str~="^foob"')])
+                self.eq(['fooqux'], [n.ndef[1] for n in await core.nodes('test:str~="^f.*ux$"')])
+                self.len(0, await core.nodes('test:str~="oof"'))
+
+                # fuzzy matches are not dropped by the index
+                self.eq(['foobar'], [n.ndef[1] for n in await core.nodes('test:str~="(?:fooxar){e<=1}"')])
+                self.eq(['foobar'], [n.ndef[1] for n in await core.nodes('test:str~="foobaz{e<=1}"')])
+
+                nodes = await core.nodes('test:str:hehe~="\\.exe$"')
+                self.len(3, nodes)
+
+                # prop edits maintain the index
+                await core.nodes('test:str=fooqux [ :hehe=wordpad.exe ]')
+                self.eq(['fooqux'], [n.ndef[1] for n in await core.nodes('test:str:hehe~=wordpad')])
+                self.len(0, await core.nodes('test:str:hehe~=notepad'))
+
+                await core.nodes('test:str=fooqux [ -:hehe ]')
+                self.len(0, await core.nodes('test:str:hehe~=wordpad'))
+
+                await core.nodes('test:str=fooqux | delnode')
+                self.len(0, await core.nodes('test:str~=fooqux'))
+
+                await layr.layrinfo.set('trigrams', ('test:str',))
+
+            async with self.getTestCore(dirn=dirn) as core:
+                layr = core.getLayer()
+                self.eq(('test:str',), tuple(layr.trigramabrvs.keys()))
+                self.len(0, list(layr.layrslab.scanByPref(layr.getPropAbrv('test:str', 'hehe'), db=layr.bytrigram)))
+                self.len(2, await core.nodes('test:str:hehe~="\\.exe$"'))
+
+    async def test_layer_refs(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.true(layr.hasrefindx)
+                self.eq('inet:ipv4', layr.refprops.get(('inet:dns:a', 'ipv4')))
+                self.eq('test:int', layr.refprops.get(('test:arrayprop', 'ints')))
+                self.none(layr.refprops.get(('inet:dns:a', '.seen')))
+
+                await core.nodes('[ inet:dns:a=(vertex.link, 1.2.3.4) inet:dns:a=(woot.com, 1.2.3.4) ]')
+                await core.nodes('[ test:int=1 test:int=2 ]')
+                await core.nodes('[ test:arrayprop=* :ints=(1, 2, 1) ]')
+
+                nodes = await core.nodes('inet:ipv4=1.2.3.4 <- *')
+                self.eq(['vertex.link', 'woot.com'], sorted(n.get('fqdn') for n in nodes))
+
+                nodes = await core.nodes('test:int=1 <- *')
+                self.eq(['test:arrayprop'], [n.ndef[0] for n in nodes])
+
+                # prop edits maintain the index
+                await core.nodes('inet:dns:a:fqdn=woot.com | delnode')
+                nodes = await core.nodes('inet:ipv4=1.2.3.4 <- *')
+                self.eq(['vertex.link'], [n.get('fqdn') for n in nodes])
+
+                await core.nodes('test:arrayprop [ :ints=(2,) ]')
+                self.len(0, await core.nodes('test:int=1 <- *'))
+                self.len(1, await core.nodes('test:int=2 <- *'))
+
+                await core.nodes('test:arrayprop [ -:ints ]')
+                self.len(0, await core.nodes('test:int=2 <- *'))
+
+                # ext model props are added to the index
+                await core.addFormProp('test:str', '_ipv4', ('inet:ipv4', {}), {})
+                self.eq('inet:ipv4', layr.refprops.get(('test:str', '_ipv4')))
+
+                await core.nodes('[ test:str=foo :_ipv4=1.2.3.4 ]')
+                nodes = await core.nodes('inet:ipv4=1.2.3.4 <- *')
+                self.eq(['inet:dns:a', 'test:str'], sorted(n.ndef[0] for n in nodes))
+
+                # references from a fork are merged with the parent layer
+                view2 = await core.view.fork()
+                opts = {'view': view2['iden']}
+                await core.nodes('[ inet:dns:a=(fork.link, 1.2.3.4) ]', opts=opts)
+                await core.nodes('test:str=foo [ :_ipv4=5.6.7.8 ]', opts=opts)
+
+                nodes = await core.nodes('inet:ipv4=1.2.3.4 <- *', opts=opts)
+                self.eq(['fork.link', 'vertex.link'], sorted(n.get('fqdn') for n in nodes))
+
+                nodes = await core.nodes('inet:ipv4=5.6.7.8 <- *', opts=opts)
+                self.eq([('test:str', 'foo')], [n.ndef for n in nodes])
+
+                self.len(2, await core.nodes('inet:ipv4=1.2.3.4 <- *'))
+                self.len(0, await core.nodes('inet:ipv4=5.6.7.8 <- *'))
+
+                # missing or stale index rows are rebuilt
+                await layr.setRefProps({})
+                self.len(0, list(layr.layrslab.scanByFull(db=layr.byref)))
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.true(layr.hasrefindx)
+                self.len(2, await core.nodes('inet:ipv4=1.2.3.4 <- *'))
+
+        # props from modules loaded at runtime are added to the index
+        with self.getTestDir() as dirn:
+
+            async with await s_cortex.Cortex.anit(dirn) as core:
+
+                await core.nodes('[ inet:dns:a=(vertex.link, 1.2.3.4) ]')
+                await core.loadCoreModule('synapse.tests.utils.TestModule')
+
+                layr = core.getLayer()
+                self.true(layr.hasrefindx)
+                self.eq('test:str', layr.refprops.get(('test:pivcomp', 'lulz')))
+
+                await core.nodes('[ test:pivcomp=(foo, baz) ]')
+                nodes = await core.nodes('test:str=baz <- *')
+                self.eq([('test:pivcomp', ('foo', 'baz'))], [n.ndef for n in nodes])
+                self.len(1, await core.nodes('inet:ipv4=1.2.3.4 <- *'))
+
     async def test_layer_waitForHot(self):
 
         async with self.getTestCore() as core:
@@ -994,3 +1307,57 @@ class LayerTest(s_t_utils.SynTest):
 
             readlayr = core.getLayer(readlayrinfo.get('iden'))
             self.true(readlayr.readonly)
+
+    async def test_layer_indx_counts(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.getLayer()
+            self.true(layr.hasindxcounts)
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 :asn=20 .seen=2020 +#foo.bar ]')
+            await core.nodes('[ inet:asn=20 +#foo.bar ]')
+
+            self.eq(2, await layr.getPropCount('inet:ipv4'))
+            self.eq(2, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(2, await layr.getPropCount(None, '.seen'))
+            self.eq(3, await layr.getTagCount('foo.bar'))
+            self.eq(2, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+            self.eq(1, await layr.getTagCount('foo.bar', formname='inet:asn'))
+
+            # updating existing rows does not change the counts
+            await core.nodes('inet:ipv4 [ :asn=30 .seen=2021 +#foo.bar=2020 ]')
+            self.eq(2, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(2, await layr.getPropCount(None, '.seen'))
+            self.eq(2, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+
+            await core.nodes('inet:ipv4=1.2.3.4 [ -:asn -.seen -#foo.bar ]')
+            self.eq(1, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(1, await layr.getPropCount(None, '.seen'))
+            self.eq(2, await layr.getTagCount('foo.bar'))
+            self.eq(1, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+
+            await core.nodes('inet:ipv4=1.2.3.4 | delnode')
+            self.eq(1, await layr.getPropCount('inet:ipv4'))
+
+            # the counters agree with a full scan of the index
+            abrv = layr.getPropAbrv('inet:ipv4', 'asn')
+            self.eq(1, await layr.layrslab.countByPref(abrv, db=layr.byprop))
+
+            # simulate a layer from before the counters existed
+            layr.layrslab.delete(b'indxcounts', db=layr.countdb)
+            layr.tagcounts.cache.clear()
+            layr.propcounts.cache.clear()
+            layr.hasindxcounts = False
+
+            self.eq(2, await layr.getTagCount('foo.bar'))
+
+            await layr._initIndxCounts()
+            self.true(layr.hasindxcounts)
+
+            self.eq(1, await layr.getPropCount('inet:ipv4'))
+            self.eq(1, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(1, await layr.getPropCount(None, '.seen'))
+            self.eq(2, await layr.getTagCount('foo.bar'))
+            self.eq(1, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+            self.eq(1, await layr.getTagCount('foo.bar', formname='inet:asn'))
@@ -583,6 +583,38 @@ class LmdbSlabTest(s_t_utils.SynTest):
             async with await s_lmdbslab.Slab.anit(path, map_size=100000, growsize=10000) as slab:
                 self.eq(0, await slab.countByPref(b'asdf'))
 
+    async def test_lmdbslab_scanbyprefs(self):
+
+        with self.getTestDir() as dirn:
+            path = os.path.join(dirn, 'test.lmdb')
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                dupsdb = slab.initdb('dups', dupsort=True)
+
+                slab.put(b'aa00', b'1', db=dupsdb)
+                slab.put(b'aa01', b'2', db=dupsdb)
+                slab.put(b'bb00', b'3', db=dupsdb)
+                slab.put(b'bb00', b'4', db=dupsdb)
+                slab.put(b'cc00', b'5', db=dupsdb)
+
+                items = list(slab.scanByPrefs((b'aa', b'ab', b'bb', b'dd'), db=dupsdb))
+                self.eq(items, (
+                    (b'aa', b'aa00', b'1'),
+                    (b'aa', b'aa01', b'2'),
+                    (b'bb', b'bb00', b'3'),
+                    (b'bb', b'bb00', b'4'),
+                ))
+
+                self.eq((), list(slab.scanByPrefs((), db=dupsdb)))
+
+                items = list(slab.scanByDupsList((b'aa', b'aa00', b'bb00', b'bb01', b'cc00'), db=dupsdb))
+                self.eq(items, (
+                    (b'aa00', b'1'),
+                    (b'bb00', b'3'),
+                    (b'bb00', b'4'),
+                    (b'cc00', b'5'),
+                ))
+
     async def test_lmdbslab_grow(self):
 
         with self.getTestDir() as dirn:
@@ -1191,6 +1223,94 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 self.len(1, [k for k, v in cache if k == b'foo'])
                 self.len(1, [k for k, v in cache if k == b'bar'])
 
+    async def test_lmdbslab_hotbloom(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+            keys = [s_common.buid(i) for i in range(5000)]
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=1000000) as slab, \
+                    await s_lmdbslab.HotBloom.anit(slab, 'bloom') as bloom:
+
+                # an unpopulated filter may not exclude anything
+                self.false(bloom.isready())
+                self.true(bloom.has(keys[0]))
+
+                bloom.reset(100)
+                [bloom.add(k) for k in keys[:4000]]
+                self.true(bloom.has(keys[4999]))
+
+                bloom.setReady()
+                self.true(bloom.isready())
+                self.true(bloom.isfull())
+
+                self.true(all(bloom.has(k) for k in keys[:4000]))
+                self.lt(len([k for k in keys[4000:] if bloom.has(k)]), 100)
+
+                bloom.reset(2000)
+                self.false(bloom.isready())
+
+                [bloom.add(k) for k in keys[:500]]
+                bloom.setReady()
+                self.false(bloom.isfull())
+                self.eq(500, bloom.adds)
+
+                bloom.add(keys[0])
+                self.eq(500, bloom.adds)
+
+                bloom.add(keys[500])
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=1000000) as slab, \
+                    await s_lmdbslab.HotBloom.anit(slab, 'bloom') as bloom:
+
+                self.true(bloom.isready())
+                self.eq(501, bloom.adds)
+                self.true(all(bloom.has(k) for k in keys[:501]))
+                self.lt(len([k for k in keys[501:] if bloom.has(k)]), 100)
+
+                # pages are written by every commit ( not only by slab sync )
+                def getpage(key):
+                    offs = next(bloom._getBits(key))[0]
+                    return s_common.int64en(offs // bloom.pagesize)
+
+                def pagebyts(page):
+                    offs = s_common.int64un(page) * bloom.pagesize
+                    return bytes(bloom.byts[offs:offs + bloom.pagesize])
+
+                page = getpage(keys[501])
+                bloom.add(keys[501])
+                self.len(1, bloom.dirty)
+                self.ne(pagebyts(page), slab.get(b'page:' + page, db=bloom.db))
+
+                slab.initdb('newdb')
+                self.len(0, bloom.dirty)
+                self.eq(pagebyts(page), slab.get(b'page:' + page, db=bloom.db))
+                self.eq(502, s_common.int64un(slab.get(b'adds', db=bloom.db)))
+
+                page = getpage(keys[502])
+                bloom.add(keys[502])
+                slab.put(b'foo', b'bar', db='newdb')
+                self.true(slab.forcecommit())
+                self.len(0, bloom.dirty)
+                self.eq(pagebyts(page), slab.get(b'page:' + page, db=bloom.db))
+
+            # a read-only slab may be written by another process
+            async with await s_lmdbslab.Slab.anit(path, map_size=1000000, readonly=True) as slab, \
+                    await s_lmdbslab.HotBloom.anit(slab, 'bloom') as bloom:
+                self.false(bloom.isready())
+                self.true(bloom.has(keys[4999]))
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=1000000) as slab, \
+                    await s_lmdbslab.HotBloom.anit(slab, 'bloom') as bloom:
+
+                # a partially populated filter is not persisted as ready
+                bloom.reset(1000)
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=1000000) as slab, \
+                    await s_lmdbslab.HotBloom.anit(slab, 'bloom') as bloom:
+                self.false(bloom.isready())
+
     async def test_lmdbslab_doubleopen(self):
 
         with self.getTestDir() as dirn:
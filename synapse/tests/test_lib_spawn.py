@@ -651,3 +651,52 @@ class CoreSpawnTest(s_test.SynTest):
 
             self.stormIsInPrint('1234', msgs)
             self.stormIsInPrint('beep', msgs)
+
+    async def test_spawn_normpool(self):
+
+        conf = {'spawn:normprocs': 1}
+        async with self.getTestCore(conf=conf) as core:
+
+            self.nn(core.normpool)
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            await core.nodes('[ test:str=woot ]')
+            woot = (await core.nodes('test:str=woot'))[0].iden()
+
+            nodedefs = (
+                (('inet:url', 'http://vertex.link/foo'), {'props': {'.created': 10}, 'tags': {'foo.bar': (None, None)}}),
+                (('inet:email', 'visi@vertex.link'), {'tagprops': {'foo': {'score': 20}}}),
+                (('inet:ipv4', '1.2.3.4'), {'props': {'asn': 10}, 'nodedata': {'foo': 'bar'},
+                                            'edges': ((woot, {'verb': 'refs'}),)}),
+                (('inet:ipv4', 'newp'), {}),
+                (('newp:form', 'newp'), {}),
+                (('inet:ipv4', '5.6.7.8'), {'props': {'asn': 'newp'}}),
+            )
+
+            async with await core.snap() as snap:
+
+                nodes = [n async for n in snap.addNodes(nodedefs)]
+                self.eq(('inet:url', 'inet:email', 'inet:ipv4'), [n.form.name for n in nodes])
+
+                self.nn(nodes[0].getTag('foo.bar'))
+                self.ne(10, nodes[0].get('.created'))
+                self.eq('vertex.link', nodes[0].get('fqdn'))
+                self.eq(20, nodes[1].getTagProp('foo', 'score'))
+                self.eq(10, nodes[2].get('asn'))
+
+            self.nn(core.normpool.pool)
+            self.len(1, await core.nodes('inet:fqdn=vertex.link'))
+            self.len(1, await core.nodes('inet:asn=10'))
+            self.len(1, await core.nodes('#foo.bar'))
+            self.len(1, await core.nodes('inet:ipv4=1.2.3.4 -(refs)> test:str'))
+            self.eq('bar', await core.callStorm('inet:ipv4=1.2.3.4 return($node.data.get(foo))'))
+            self.len(0, await core.nodes('inet:ipv4=5.6.7.8'))
+
+            # model changes create processes with the new model
+            await core.addFormProp('inet:ipv4', '_woot', ('int', {}), {})
+            self.none(core.normpool.pool)
+
+            nodedefs = ((('inet:ipv4', '1.2.3.4'), {'props': {'_woot': 10}}),)
+            nodes = [n async for n in core.addNodes(nodedefs)]
+            self.eq(10, nodes[0].get('_woot'))
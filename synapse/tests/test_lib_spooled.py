@@ -54,3 +54,58 @@ class SpooledTest(s_test.SynTest):
                 await sset.add(30)
                 self.true(os.path.isdir(sset.slabpath))
                 self.true(os.path.abspath(sset.slabpath).startswith(dirn))
+
+    async def test_spooled_sorted(self):
+
+        items = [(b'b', 1), (b'a', 2), (b'c', 3), (b'a', 4), (b'', 5)]
+
+        for size in (100, 2):
+
+            async with await s_spooled.Sorted.anit(size=size) as sset:
+
+                for key, valu in items:
+                    await sset.add(key, valu)
+
+                self.len(5, sset)
+                self.eq(size == 2, sset.fallback)
+
+                retn = [item async for item in sset.items()]
+                self.eq([(b'', 5), (b'a', 2), (b'a', 4), (b'b', 1), (b'c', 3)], retn)
+
+            async with await s_spooled.Sorted.anit(size=size, reverse=True) as sset:
+
+                for key, valu in items:
+                    await sset.add(key, valu)
+
+                retn = [item async for item in sset.items()]
+                self.eq([(b'c', 3), (b'b', 1), (b'a', 2), (b'a', 4), (b'', 5)], retn)
+
+    async def test_spooled_dict(self):
+
+        async with await s_spooled.Dict.anit(size=2) as sdict:
+
+            self.len(0, sdict)
+            self.none(sdict.get('foo'))
+
+            await sdict.set('foo', 10)
+            await sdict.set('foo', 20)
+            self.len(1, sdict)
+            self.false(sdict.fallback)
+            self.eq(20, sdict.get('foo'))
+
+            # Trigger fallback
+            await sdict.set(('bar', 1), (1, 2))
+            self.true(sdict.fallback)
+            self.len(2, sdict)
+
+            await sdict.set(('bar', 1), (3, 4))
+            await sdict.set(None, 'baz')
+            self.len(3, sdict)
+
+            self.eq(20, sdict.get('foo'))
+            self.eq((3, 4), sdict.get(('bar', 1)))
+            self.eq('baz', sdict.get(None))
+            self.eq(30, sdict.get('newp', 30))
+
+            items = {k: v async for (k, v) in sdict.items()}
+            self.eq({'foo': 20, ('bar', 1): (3, 4), None: 'baz'}, items)
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import unittest.mock as mock
 
 import synapse.exc as s_exc
 import synapse.common as s_common
@@ -164,6 +165,46 @@ class StormTest(s_t_utils.SynTest):
             with self.raises(s_exc.BadOperArg):
                 await core.nodes('movetag foo.bar duck.knight')
 
+        # Move tags on many nodes using several batches of edits
+        async with self.getTestCore() as core:
+
+            await core.addTagProp('score', ('int', {}), {})
+            await core.nodes('[ inet:ipv4=1.2.3.0/28 +#hehe.haha=(2019, 2020) +#hehe.haha:score=10 +#woot=2021 ]')
+            await core.nodes('inet:ipv4=1.2.3.1 [ +#zoom=2018 +#zoom.boom ]')
+
+            tagadds = []
+            tagdels = []
+            core.view.layers[0].on('tag:add', tagadds.append)
+            core.view.layers[0].on('tag:del', tagdels.append)
+
+            async def movetag():
+                synt = await core.boss.promote('storm', user=core.auth.rootuser)
+                return synt, await core.stormlist('movetag hehe zoom')
+
+            with mock.patch.object(s_storm.MoveTagCmd, 'batchsize', 5):
+                synt, msgs = await asyncio.create_task(movetag())
+                self.stormIsInPrint('moved tags on 16 nodes.', msgs)
+
+            self.eq({'oldtag': 'hehe', 'newtag': 'zoom', 'nodes': 16}, synt.info.get('movetag'))
+
+            self.len(32, tagdels)
+            self.len(31, tagadds)
+
+            self.len(0, await core.nodes('#hehe'))
+            self.len(16, await core.nodes('#zoom.haha:score=10'))
+            self.len(16, await core.nodes('#woot'))
+
+            nodes = await core.nodes('inet:ipv4=1.2.3.2')
+            self.eq(nodes[0].tags['zoom'], (None, None))
+            self.eq(nodes[0].tags['zoom.haha'], (1546300800000, 1577836800000))
+
+            # existing tag intervals are merged
+            nodes = await core.nodes('inet:ipv4=1.2.3.1')
+            self.eq(nodes[0].tags['zoom'], (1514764800000, 1514764800001))
+            self.eq(nodes[0].tags['zoom.boom'], (None, None))
+            self.eq(nodes[0].tags['zoom.haha'], (1546300800000, 1577836800000))
+            self.eq(nodes[0].tagprops, {('zoom.haha', 'score'): 10})
+
     async def test_storm_spin(self):
 
         async with self.getTestCore() as core:
@@ -181,6 +222,39 @@ class StormTest(s_t_utils.SynTest):
             msgs = await core.stormlist('.created | sudo')
             self.stormIsInWarn('Sudo is deprecated and does nothing', msgs)
 
+    async def test_storm_profile(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ test:str=foo test:str=bar ]')
+            await core.nodes('[ test:str=baz :hehe=haha ]')
+
+            msgs = await core.stormlist('test:str +{ +:hehe=haha } | uniq | limit 2', opts={'profile': True})
+            profs = [m for m in msgs if m[0] == 'prof']
+            self.len(1, profs)
+            self.eq('prof', msgs[-2][0])
+
+            opers = profs[0][1]['opers']
+            self.eq(['LiftProp', 'FiltOper', 'CmdOper: uniq', 'CmdOper: limit'], [o['oper'] for o in opers])
+            self.eq([0, 3, 1, 1], [o['inputs'] for o in opers])
+            self.eq([3, 1, 1, 1], [o['outputs'] for o in opers])
+            self.true(all(o['took'] >= 0 for o in opers))
+
+            subq = opers[1]['kids'][0]
+            self.eq(['FiltOper'], [o['oper'] for o in subq])
+            self.eq(3, subq[0]['inputs'])
+            self.eq(1, subq[0]['outputs'])
+
+            msgs = await core.stormlist('test:str')
+            self.len(0, [m for m in msgs if m[0] == 'prof'])
+
+            # explain prints the plan without running edits
+            msgs = await core.stormlist('test:str +:hehe=haha [ +#newp ]', opts={'explain': True})
+            self.len(0, [m for m in msgs if m[0] in ('node', 'node:edits')])
+            self.stormIsInPrint('LiftPropBy: [Const: test:str:hehe, Const: =, Const: haha]', msgs)
+            self.stormIsInPrint('EditTagAdd', msgs)
+            self.len(0, await core.nodes('#newp'))
+
     async def test_storm_count(self):
 
         async with self.getTestCoreAndProxy() as (realcore, core):
@@ -209,6 +283,13 @@ class StormTest(s_t_utils.SynTest):
             nodes = await alist(core.eval('test:comp -> * | uniq | count'))
             self.len(1, nodes)
 
+            # large pipelines spool the seen buids to disk
+            with mock.patch('synapse.lib.spooled.Set.__anit__.__defaults__', (None, 2)):
+                await core.nodes('[ inet:ipv4=1.2.3.0/30 ]')
+                nodes = await core.nodes('inet:ipv4 inet:ipv4 | uniq')
+                self.eq([n.ndef for n in nodes[:4]], [n.ndef for n in await core.nodes('inet:ipv4')])
+                self.len(4, nodes)
+
     async def test_storm_iden(self):
         async with self.getTestCore() as core:
             q = "[test:str=beep test:str=boop]"
@@ -335,6 +416,152 @@ class StormTest(s_t_utils.SynTest):
             testmax = await core.nodes('ou:org | max #minmax')
             self.eq(testmax[0].ndef, maxnodes[0].ndef)
 
+    async def test_storm_sort(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ test:int=5 test:int=-3 test:int=20 test:int=7 test:int=2 ]')
+            await core.nodes('[ inet:fqdn=b.com inet:fqdn=aa.com inet:fqdn=a.com ]')
+
+            nodes = await core.nodes('test:int $v=$node.value() | sort $v')
+            self.eq([-3, 2, 5, 7, 20], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('test:int $v=$node.value() | sort --reverse $v')
+            self.eq([20, 7, 5, 2, -3], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('test:int $v=$node.value() | sort --top 2 $v')
+            self.eq([-3, 2], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('test:int $v=$node.value() | sort -r --top 3 $v')
+            self.eq([20, 7, 5], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('inet:fqdn +:domain | sort :host')
+            self.eq(['a.com', 'aa.com', 'b.com'], [n.ndef[1] for n in nodes])
+
+            # nodes without a value are yielded last
+            await core.nodes('test:int=5 test:int=7 [ :loc=us ]')
+            nodes = await core.nodes('test:int | sort :loc')
+            self.eq([5, 7], [n.ndef[1] for n in nodes[:2]])
+            self.len(5, nodes)
+
+            nodes = await core.nodes('test:int | sort -r :loc')
+            self.eq([5, 7], [n.ndef[1] for n in nodes[:2]])
+
+            # tag intervals sort by their min ( or max when reversed )
+            await core.nodes('[ test:str=a +#foo=(2015, 2020) test:str=b +#foo=(2016, 2017) test:str=c ]')
+            nodes = await core.nodes('test:str | sort #foo')
+            self.eq(['a', 'b', 'c'], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('test:str | sort -r #foo')
+            self.eq(['a', 'b', 'c'], [n.ndef[1] for n in nodes])
+
+            nodes = await core.nodes('test:str | sort --top 1 #foo')
+            self.eq(['a'], [n.ndef[1] for n in nodes])
+
+            # large inputs are spooled to disk and path vars are restored
+            with mock.patch('synapse.lib.spooled.Sorted.__anit__.__defaults__', (None, 2, False)):
+
+                q = 'test:int $v=$node.value() | sort -r $v | $lib.print($v)'
+                msgs = await core.stormlist(q)
+                nodes = [m[1] for m in msgs if m[0] == 'node']
+                self.eq([20, 7, 5, 2, -3], [n[0][1] for n in nodes])
+                self.eq(['20', '7', '5', '2', '-3'], [m[1]['mesg'] for m in msgs if m[0] == 'print'])
+
+                q = 'test:int $v=$node.value() $d=$lib.dict(v=$v) $l=$lib.list($v) | sort $v | $lib.print($d.v) $lib.print($l.index(0))'
+                msgs = await core.stormlist(q)
+                self.eq(['-3', '-3', '2', '2', '5', '5', '7', '7', '20', '20'],
+                        [m[1]['mesg'] for m in msgs if m[0] == 'print'])
+
+                with self.raises(s_exc.BadArg):
+                    await core.nodes('test:int $n=$node $v=$node.value() | sort $v')
+
+                with self.raises(s_exc.BadArg):
+                    await core.nodes('test:int $x=$lib.set(a) $v=$node.value() | sort $v')
+
+            # small inputs are sorted in memory and keep their paths
+            q = 'test:int $n=$node $v=$node.value() | sort $v | $lib.print($n.value())'
+            msgs = await core.stormlist(q)
+            self.eq(['-3', '2', '5', '7', '20'], [m[1]['mesg'] for m in msgs if m[0] == 'print'])
+
+            q = 'test:int $x=$lib.set(a) $v=$node.value() | sort -r $v | $lib.print($x.size())'
+            msgs = await core.stormlist(q)
+            self.eq(['1', '1', '1', '1', '1'], [m[1]['mesg'] for m in msgs if m[0] == 'print'])
+
+            msgs = await core.stormlist('inet:fqdn=a.com :domain -> inet:fqdn | sort :host', opts={'path': True})
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.eq(['com'], [n[0][1] for n in nodes])
+            self.len(2, nodes[0][1]['path']['nodes'])
+
+            self.len(0, await core.nodes('test:int=99 | sort :loc'))
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('test:int | sort --top 0 :loc')
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('test:int | sort $v', opts={'vars': {'v': 2 ** 200}})
+
+    async def test_storm_agg(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.1 :asn=10 :loc=us .seen=(2015, 2016) ]')
+            await core.nodes('[ inet:ipv4=1.2.3.2 :asn=10 :loc=ca .seen=(2014, 2017) ]')
+            await core.nodes('[ inet:ipv4=1.2.3.3 :asn=20 ]')
+
+            tick14 = core.model.type('time').norm('2014')[0]
+            tick17 = core.model.type('time').norm('2017')[0]
+
+            q = 'inet:ipv4 | agg --by :asn --count --min .seen --max .seen'
+            msgs = await core.stormlist(q)
+            self.len(3, [m for m in msgs if m[0] == 'node'])
+            self.stormIsInPrint(f'10: count=2 min={tick14} max={tick17}', msgs)
+            self.stormIsInPrint('20: count=1 min=None max=None', msgs)
+
+            msgs = await core.stormlist('inet:ipv4 | agg --by :asn --by :loc --emit | spin')
+            rows = [m[1]['row'] for m in msgs if m[0] == 'agg:row']
+            self.len(3, rows)
+            self.isin({'by': (10, 'us'), 'count': 1}, rows)
+            self.isin({'by': (10, 'ca'), 'count': 1}, rows)
+            self.isin({'by': (20, None), 'count': 1}, rows)
+
+            q = '$rows = $lib.list() inet:ipv4 $v=$node.value() | agg --into $rows --sum :asn --sum $v | spin | return($rows)'
+            rows = await core.callStorm(q)
+            self.eq([{'by': (), 'sum': (40, 0x01020301 + 0x01020302 + 0x01020303)}], rows)
+
+            # a large number of groups are spooled to disk
+            with mock.patch('synapse.lib.spooled.Dict.__anit__.__defaults__', (None, 2)):
+                q = '$rows = $lib.list() inet:ipv4 $v=$node.value() | agg --by $v --count --max :asn --into $rows | spin | return($rows)'
+                rows = await core.callStorm(q)
+                self.eq([
+                    {'by': (0x01020301,), 'count': 1, 'max': 10},
+                    {'by': (0x01020302,), 'count': 1, 'max': 10},
+                    {'by': (0x01020303,), 'count': 1, 'max': 20},
+                ], sorted(rows, key=lambda r: r['by']))
+
+            self.len(0, await core.nodes('inet:ipv4=9.9.9.9 | agg --by :asn'))
+
+            # lists and dicts may be used to group nodes
+            q = '$rows = $lib.list() inet:ipv4 $d=$lib.dict(asn=:asn) | agg --by $d --count --into $rows | spin | return($rows)'
+            rows = await core.callStorm(q)
+            self.eq([
+                {'by': ({'asn': 10},), 'count': 2},
+                {'by': ({'asn': 20},), 'count': 1},
+            ], sorted(rows, key=lambda r: r['by'][0]['asn']))
+
+            with mock.patch('synapse.lib.spooled.Dict.__anit__.__defaults__', (None, 1)):
+                q = '$rows = $lib.list() inet:ipv4 $l=$lib.list(:asn) | agg --by $l --count --into $rows | spin | return($rows)'
+                rows = await core.callStorm(q)
+                self.eq([
+                    {'by': ((10,),), 'count': 2},
+                    {'by': ((20,),), 'count': 1},
+                ], sorted(rows, key=lambda r: r['by']))
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('inet:ipv4 $s=$lib.set(a) | agg --by $s')
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('inet:ipv4 | agg --into newp')
+
     async def test_scrape(self):
 
         async with self.getTestCore() as core:
@@ -480,6 +707,61 @@ class StormTest(s_t_utils.SynTest):
             q = 'tee'
             await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
 
+            # parallel tee
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --join { -> * } { <- * } { -> edge:refs:n2 :n1 -> * }'
+            nodes = await core.nodes(q)
+            self.len(4, nodes)
+            self.eq(nodes[3].ndef, ('inet:ipv4', 0x01020304))
+            self.eq({'inet:asn', 'inet:dns:a', 'media:news'}, {n.ndef[0] for n in nodes[:3]})
+
+            q = 'tee --parallel { inet:ipv4=1.2.3.4 } { inet:ipv4 -> * }'
+            nodes = await core.nodes(q)
+            self.eq({('inet:asn', 0), ('inet:ipv4', 0x01020304)}, {n.ndef for n in nodes})
+
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4=1.2.3.4 | tee --parallel { -> * } { [ :asn=newp ] }')
+
+    async def test_storm_parallel(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.0/28 ]')
+
+            q = 'inet:ipv4 | parallel --size 4 { [ +#foo ] }'
+            nodes = await core.nodes(q)
+            self.len(16, nodes)
+            self.true(all(n.tags.get('foo') is not None for n in nodes))
+            self.len(16, await core.nodes('inet:ipv4#foo'))
+
+            # ordered mode yields results in inbound order
+            q = 'inet:ipv4 | parallel --ordered --size 4 { $lib.time.sleep(0.01) }'
+            nodes = await core.nodes(q)
+            self.eq([n.ndef[1] for n in nodes], [0x01020300 + i for i in range(16)])
+
+            q = 'inet:ipv4 | parallel --ordered --size 4 { [ :asn=$node.value() ] -> inet:asn }'
+            nodes = await core.nodes(q)
+            self.eq([n.ndef[1] for n in nodes], [0x01020300 + i for i in range(16)])
+
+            nodes = await core.nodes('inet:ipv4 | parallel { +#foo } | limit 2')
+            self.len(2, nodes)
+
+            # pipelines may be used with path variables
+            q = 'inet:ipv4 $ip=$node.repr() | parallel --size 2 { -> inet:asn } | +{ $lib.print($ip) }'
+            msgs = await core.stormlist(q)
+            self.len(16, [m for m in msgs if m[0] == 'print'])
+
+            # no inbound nodes
+            self.len(0, await core.nodes('inet:ipv4=9.9.9.9 | parallel { [ +#bar ] }'))
+
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4 | parallel { [ :asn=newp ] }')
+
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4 | parallel --ordered { [ :asn=newp ] }')
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('inet:ipv4 | parallel --size 0 { }')
+
     async def test_storm_yieldvalu(self):
 
         async with self.getTestCore() as core:
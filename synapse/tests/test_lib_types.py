@@ -823,6 +823,55 @@ class TypesTest(s_t_utils.SynTest):
         # homoglyphs are also possible
         self.eq('is.ｂob.evil', tagtype.norm('is.\uff42ob.evil')[0])
 
+    async def test_type_normcache(self):
+
+        model = s_datamodel.Model()
+
+        # types only cache when enabled in the type info
+        self.none(model.type('str').getNormCacheStats())
+
+        tagtype = model.type('syn:tag')
+        self.eq(tagtype.getNormCacheStats(), {'size': 0, 'maxsize': 10000, 'hits': 0, 'misses': 0, 'rate': 0.0})
+
+        norm = tagtype.norm('FOO.BAR')
+        self.true(norm is tagtype.norm('FOO.BAR'))
+        self.eq('foo.bar', tagtype.norm('foo.bar')[0])
+
+        # errors are not cached
+        self.raises(s_exc.BadTypeValu, tagtype.norm, 'foo.')
+        self.raises(s_exc.BadTypeValu, tagtype.norm, 'foo.')
+
+        stats = tagtype.getNormCacheStats()
+        self.eq(stats['size'], 2)
+        self.eq(stats['hits'], 1)
+        self.eq(stats['misses'], 4)
+        self.eq(stats['rate'], 0.2)
+
+        # extended types inherit the setting and the size may be specified
+        tnfo = {'normcache': 2}
+        model.addType('test:normcache', 'str', {'lower': True}, tnfo)
+        ttyp = model.type('test:normcache')
+        ttyp.norm('A')
+        ttyp.norm('B')
+        ttyp.norm('C')
+        ttyp.norm('A')
+        self.eq(ttyp.getNormCacheStats()['size'], 2)
+        self.eq(ttyp.getNormCacheStats()['misses'], 4)
+        self.eq(ttyp.getNormCacheStats()['hits'], 0)
+
+        self.eq(model.getNormCacheStats()['syn:tag'], tagtype.getNormCacheStats())
+        self.nn(model.getNormCacheStats().get('test:normcache'))
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:fqdn=woot.com inet:dns:a=(woot.com, 1.2.3.4) ]')
+            self.len(1, await core.nodes('inet:dns:a -> inet:fqdn'))
+            self.len(1, await core.nodes('inet:fqdn=woot.com'))
+
+            stats = core.model.type('inet:fqdn').getNormCacheStats()
+            self.gt(stats['hits'], 0)
+            self.gt(stats['size'], 0)
+
     async def test_time(self):
 
         model = s_datamodel.Model()
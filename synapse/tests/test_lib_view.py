@@ -260,3 +260,49 @@ class ViewTest(s_t_utils.SynTest):
 
             with self.raises(s_exc.BadConfValu):
                 await core.stormlist('[test:str=foo3 :hehe=bar]', opts={'editformat': 'jsonl'})
+
+    async def test_view_merge_lifts(self):
+
+        async with self.getTestCore() as core:
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            vdef2 = await core.view.fork()
+            view2 = core.getView(vdef2.get('iden'))
+
+            # nodes which are present in both layers are only returned once
+            await view2.nodes('[ test:int=20 test:int=5 +#foo:score=20 ]')
+            await core.nodes('[ test:int=20 test:int=10 test:int=30 +#foo:score=10 ]')
+
+            nodes = await view2.nodes('test:int')
+            self.eq((5, 10, 20, 30), [n.ndef[1] for n in nodes])
+
+            nodes = await view2.nodes('test:int>=10')
+            self.eq((10, 20, 30), [n.ndef[1] for n in nodes])
+
+            nodes = await view2.nodes('#foo')
+            self.len(4, nodes)
+
+            nodes = await view2.nodes('#foo:score')
+            self.eq((10, 10, 20, 20), [n.getTagProp('foo', 'score') for n in nodes])
+
+            # values overridden in the top layer are sorted by their overridden value
+            await core.nodes('[ inet:ipv4=1.2.3.4 :asn=10 ]')
+            await core.nodes('[ inet:ipv4=5.6.7.8 :asn=20 ]')
+            await view2.nodes('inet:ipv4=1.2.3.4 [ :asn=30 ]')
+            await view2.nodes('[ inet:ipv4=9.9.9.9 :asn=5 ]')
+
+            nodes = await view2.nodes('inet:ipv4:asn>0')
+            self.eq((5, 20, 30), [n.get('asn') for n in nodes])
+
+            nodes = await view2.nodes('inet:ipv4:asn')
+            self.eq((5, 20, 30), [n.get('asn') for n in nodes])
+
+            nodes = await view2.nodes('inet:ipv4:asn=10')
+            self.len(0, nodes)
+
+            nodes = await core.nodes('inet:ipv4:asn>0')
+            self.eq((10, 20), [n.get('asn') for n in nodes])
+
+            await view2.fini()
+            await view2.delete()